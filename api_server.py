@@ -0,0 +1,281 @@
+# api_server.py
+"""
+스캐너/PLC 등 브라우저가 아닌 장비용 헤드리스 HTTP API (Streamlit 없이 실행)
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8600 --workers 2
+    (또는) python api_server.py --port 8600          (기본 127.0.0.1, 외부 장비용은 --host 0.0.0.0)
+
+접속정보는 Streamlit과 같은 .streamlit/secrets.toml을 읽습니다. (BARCODE_LABEL_SECRETS로 경로 변경 가능)
+모든 요청에 'Authorization: Bearer <[api] token>' 헤더가 필요합니다.
+[api] token 이 설정되지 않았으면 모든 요청을 401로 거부하고, python api_server.py 는 시작하지 않습니다.
+
+GET  /health                      상태/풀 통계
+GET  /products/{barcode}          바코드 → 제품 조회
+POST /products/lookup             {"barcodes": [...]} 일괄 조회
+POST /inbound                     {"items": [{product_code|barcode, storage_location, category, lot, expiration_date, version, quantity}]}
+POST /outbound                    {"handler": "...", "codes": ["880...", "1001", ...]}
+POST /labels/render               {"fields": {serial_number, product_code, ...}, "format": "png"|"zpl"|"tspl"}
+GET  /labels/{serial}?format=png  입고된 S/N 라벨 재출력
+"""
+import os
+import sys
+import json
+import hmac
+import asyncio
+import argparse
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytz
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from utils import runtime
+
+runtime.use_headless()
+
+from utils import db_manager
+from utils import db_engine
+from utils import barcode_generator
+from utils import label_cache
+from utils import inbound_manifest
+from utils import location_manager
+from utils import location_index
+from utils import product_index
+from utils import scan_batch
+from utils import serial_allocator
+from utils import sheets_mirror
+
+KST = pytz.timezone('Asia/Seoul')
+LABEL_MEDIA_TYPES = {"png": "image/png", "zpl": "text/plain", "tspl": "text/plain"}
+
+# DB 작업은 스레드 풀, 라벨 렌더링(CPU)은 프로세스 풀에서 실행해 이벤트 루프를 막지 않음
+_db_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("API_DB_THREADS", "16")), thread_name_prefix="api-db")
+_render_pool = None
+
+
+def _json(data, status_code=200):
+    body = json.dumps(data, ensure_ascii=False, default=str)
+    return Response(body, status_code=status_code, media_type="application/json")
+
+def _error(message, status_code=400):
+    return _json({"error": message}, status_code)
+
+async def _in_db_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_db_pool, func, *args)
+
+async def _in_render_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_render_pool, func, *args)
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _now_str():
+    return datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# --- 인증 ----------------------------------------------------------------
+def _api_token():
+    try:
+        return (runtime.secrets.get("api") or {}).get("token")
+    except Exception:
+        return None
+
+def _authorized(request):
+    token = _api_token()
+    if not token:
+        return False  # 토큰 미설정 시 입출고 API가 그대로 열리지 않도록 거부
+    header = request.headers.get("authorization", "")
+    # compare_digest는 ASCII가 아닌 str에 TypeError를 내므로 bytes로 비교
+    return header.startswith("Bearer ") and hmac.compare_digest(header[7:].encode("utf-8"), token.encode("utf-8"))
+
+def _endpoint(handler):
+    """토큰 확인 + 처리 중 예외를 500 JSON으로 변환"""
+    async def wrapped(request):
+        if not _authorized(request):
+            return _error("unauthorized", 401)
+        try:
+            return await handler(request)
+        except Exception as e:
+            runtime.error(f"API 처리 실패 ({request.url.path}): {e}")
+            return _error("internal error", 500)
+    return wrapped
+
+
+# --- 조회 ----------------------------------------------------------------
+async def health(request):
+    return _json({"status": "ok", "pools": db_engine.all_pool_status()})
+
+async def get_product(request):
+    barcode = request.path_params["barcode"]
+    info = await _in_db_pool(product_index.find_product_by_barcode, barcode)
+    if info is None:
+        return _error(f"unknown barcode: {barcode}", 404)
+    return _json(info)
+
+async def lookup_products(request):
+    body = await _read_json(request)
+    if not isinstance(body, dict) or not isinstance(body.get("barcodes"), list):
+        return _error("body must be {\"barcodes\": [...]}")
+    found = await _in_db_pool(product_index.find_products_by_barcodes, body["barcodes"])
+    return _json({
+        "products": {k: v for k, v in found.items() if v},
+        "missing": [k for k, v in found.items() if not v],
+    })
+
+
+# --- 입고 ----------------------------------------------------------------
+# JSON 필드명 → 매니페스트(한글) 헤더
+_MANIFEST_HEADERS = {field: header for header, field in inbound_manifest.MANIFEST_COLUMNS.items()}
+
+def _process_inbound(items):
+    """매니페스트 업로드와 같은 검증/저장 경로로 입고를 처리합니다. (스레드 풀에서 실행)"""
+    manifest = pd.DataFrame(items).rename(columns=_MANIFEST_HEADERS)
+    try:
+        valid_df, error_df = inbound_manifest.validate_manifest(
+            manifest, db_manager.load_product_data(), location_manager.get_location_options(),
+            lookup_codes=db_manager.find_products_by_codes,
+            lookup_barcodes=db_manager.find_products_by_barcodes,
+        )
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    if not error_df.empty:
+        # 매니페스트 행 번호(헤더 포함 2부터) → 요청 items 인덱스
+        errors = [{"index": int(row["행"]) - 2, "error": row["오류"]} for _, row in error_df.iterrows()]
+        return 422, {"error": "validation failed", "items": errors}
+
+    serials = serial_allocator.allocate_serials(len(valid_df))
+    if serials is None:
+        return 503, {"error": "serial allocation failed"}
+    received_at = _now_str()
+    inventory_rows, inout_rows, label_records = inbound_manifest.build_inbound_rows(valid_df, serials, received_at)
+    if not db_manager.insert_inbound_batch(inventory_rows, inout_rows):
+        return 503, {"error": "database write failed"}
+    location_index.record_inbound(inventory_rows)
+    sheets_mirror.mirror_inbound(inventory_rows, inout_rows)
+    return 200, {"received_at": received_at, "serials": list(serials), "labels": label_records}
+
+async def inbound(request):
+    body = await _read_json(request)
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        return _error("body must be {\"items\": [{...}, ...]}")
+    status_code, result = await _in_db_pool(_process_inbound, items)
+    return _json(result, status_code)
+
+
+# --- 출고 ----------------------------------------------------------------
+def _process_outbound(codes, handler):
+    items, duplicates, invalid, unknown = scan_batch.build_outbound_items(codes)
+    results = db_manager.insert_outbound_batch(items, handler, _now_str()) if items else []
+    # 페이지와 같이 DB 반영이 끝난 출고 건만 보관위치 점유 현황과 Google Sheets 미러에 반영
+    sheets_mirror.mirror_outbound([r["record"] for r in results if r["ok"]])
+    location_index.record_outbound(results)
+    for r in results:
+        r.pop("record", None)
+    return {
+        "results": results,
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "duplicates": duplicates,
+        "invalid": invalid,
+        "unknown": unknown,
+    }
+
+async def outbound(request):
+    body = await _read_json(request)
+    if not isinstance(body, dict) or not isinstance(body.get("codes"), list):
+        return _error("body must be {\"handler\": \"...\", \"codes\": [...]}")
+    handler = str(body.get("handler") or "").strip()
+    if not handler:
+        return _error("handler is required")
+    codes = [str(c).strip() for c in body["codes"] if str(c).strip()]
+    return _json(await _in_db_pool(_process_outbound, codes, handler))
+
+
+# --- 라벨 ----------------------------------------------------------------
+async def _render_label(label_args, fmt):
+    """라벨 캐시 확인 후 없으면 프로세스 풀에서 렌더링해 캐시에 저장합니다."""
+    cache = label_cache.get_label_cache()
+    key = label_cache.make_label_key(label_args, fmt)
+    data = await _in_db_pool(cache.get, key, fmt)
+    if data is None:
+        data = await _in_render_pool(label_cache.RENDERERS[fmt], label_args)
+        await _in_db_pool(cache.put, key, fmt, data)
+    return Response(data, media_type=LABEL_MEDIA_TYPES[fmt])
+
+async def render_label(request):
+    body = await _read_json(request)
+    fields = body.get("fields") if isinstance(body, dict) else None
+    fmt = (body or {}).get("format", "png") if isinstance(body, dict) else "png"
+    if not isinstance(fields, dict) or not fields.get("serial_number"):
+        return _error("body must be {\"fields\": {\"serial_number\": ..., ...}, \"format\": \"png\"}")
+    if fmt not in LABEL_MEDIA_TYPES:
+        return _error(f"unsupported format: {fmt}")
+    label_args = tuple(str(fields.get(f, "")) for f in barcode_generator.LABEL_FIELDS)
+    return await _render_label(label_args, fmt)
+
+async def reprint_label(request):
+    serial = request.path_params["serial"]
+    fmt = request.query_params.get("format", "png")
+    if fmt not in LABEL_MEDIA_TYPES:
+        return _error(f"unsupported format: {fmt}")
+    record = await _in_db_pool(db_manager.find_inventory_by_serial, serial)
+    if not record:
+        return _error(f"unknown serial: {serial}", 404)
+    label_args = (
+        record["serial_number"], record["product_code"], record["product_name"], record["lot"],
+        record["expiration_date"], record["version"], record["storage_location"], record["category"]
+    )
+    return await _render_label(label_args, fmt)
+
+
+# --- 앱 ------------------------------------------------------------------
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    global _render_pool
+    workers = int(os.environ.get("API_RENDER_PROCESSES", "0")) or None
+    _render_pool = ProcessPoolExecutor(max_workers=workers, initializer=barcode_generator._init_batch_worker)
+    try:
+        yield
+    finally:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _db_pool.shutdown(wait=False)
+
+app = Starlette(
+    routes=[
+        Route("/health", _endpoint(health), methods=["GET"]),
+        Route("/products/lookup", _endpoint(lookup_products), methods=["POST"]),
+        Route("/products/{barcode}", _endpoint(get_product), methods=["GET"]),
+        Route("/inbound", _endpoint(inbound), methods=["POST"]),
+        Route("/outbound", _endpoint(outbound), methods=["POST"]),
+        Route("/labels/render", _endpoint(render_label), methods=["POST"]),
+        Route("/labels/{serial}", _endpoint(reprint_label), methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="바코드 라벨 헤드리스 API 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="외부 장비에서 접속하려면 0.0.0.0")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 프로세스 수")
+    args = parser.parse_args(argv)
+
+    if not _api_token():
+        print("secrets.toml에 [api] token 이 설정되지 않아 API 서버를 시작하지 않습니다.", file=sys.stderr)
+        return 1
+
+    import uvicorn
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
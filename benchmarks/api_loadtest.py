@@ -0,0 +1,168 @@
+"""
+헤드리스 API(api_server.py) 부하 테스트 (표준 라이브러리만 사용)
+
+    python api_server.py --port 8600 &
+    python benchmarks/api_loadtest.py                                 # 모든 시나리오, 시나리오당 10초
+    python benchmarks/api_loadtest.py --scenario label_zpl -c 64 -d 30
+    python benchmarks/api_loadtest.py --token <api token> --output api_bench.json
+
+시나리오별 요청/초(req/s), 지연시간 p50/p95/p99, 상태 코드 분포를 출력하고 JSON으로 저장합니다.
+각 가상 클라이언트는 keep-alive 연결 하나로 요청을 연속으로 보냅니다. (스캐너/PLC 한 대에 해당)
+입고/출고 시나리오는 실제 DB에 기록하므로 기본 시나리오에 포함하지 않습니다.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from urllib.parse import urlsplit
+
+_LABEL_FIELDS = {
+    "serial_number": "1700000001",
+    "product_code": "EQ-0001",
+    "product_name": "이퀄베리 프로폴리스 앰플 세럼",
+    "lot": "L2401A",
+    "expiry": "2027-12-31",
+    "version": "R0",
+    "location": "A-01-01",
+    "category": "관리품",
+}
+
+# 이름 → (메서드, 경로, 본문 생성 함수(i) 또는 None)
+SCENARIOS = {
+    "health": ("GET", "/health", None),
+    "product_lookup": ("GET", "/products/8809000000001", None),
+    "bulk_lookup": ("POST", "/products/lookup",
+                    lambda i: {"barcodes": [f"88090000{n:05d}" for n in range(50)]}),
+    # 같은 라벨 반복 → 라벨 캐시 적중 경로
+    "label_zpl": ("POST", "/labels/render", lambda i: {"fields": _LABEL_FIELDS, "format": "zpl"}),
+    "label_png_cached": ("POST", "/labels/render", lambda i: {"fields": _LABEL_FIELDS, "format": "png"}),
+    # 매번 다른 S/N → 프로세스 풀 렌더링 경로
+    "label_png_render": ("POST", "/labels/render",
+                         lambda i: {"fields": {**_LABEL_FIELDS, "serial_number": str(1_800_000_000 + i)}, "format": "png"}),
+}
+DEFAULT_SCENARIOS = list(SCENARIOS)
+
+
+async def _request(reader, writer, host, method, path, body, token):
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+    headers = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    if payload:
+        headers += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+    if token:
+        headers.append(f"Authorization: Bearer {token}")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("ascii") + payload)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("연결이 끊어졌습니다.")
+    status = int(status_line.split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(url, scenario, deadline, counter, latencies, statuses, token):
+    method, path, make_body = SCENARIOS[scenario]
+    parts = urlsplit(url)
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        i = counter[0]
+        counter[0] += 1
+        started = time.perf_counter()
+        try:
+            status = await _request(reader, writer, parts.netloc, method, path,
+                                    make_body(i) if make_body else None, token)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status = "error"
+            writer.close()
+            writer = None
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+    if writer is not None:
+        writer.close()
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_scenario(url, scenario, concurrency, duration, token=None):
+    counter, latencies, statuses = [0], [], {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _client(url, scenario, deadline, counter, latencies, statuses, token) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    ms = lambda sec: round(sec * 1000, 2)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "duration_sec": round(elapsed, 2),
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": ms(statistics.fmean(latencies)) if latencies else 0.0,
+            "p50": ms(_percentile(latencies, 50)),
+            "p95": ms(_percentile(latencies, 95)),
+            "p99": ms(_percentile(latencies, 99)),
+            "max": ms(max(latencies)) if latencies else 0.0,
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="헤드리스 API 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8600", help="API 서버 주소")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="실행할 시나리오 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="동시 클라이언트 수")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="시나리오당 실행 시간(초)")
+    parser.add_argument("--token", help="[api] token (설정된 경우)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scenario in args.scenario or DEFAULT_SCENARIOS:
+        result = asyncio.run(run_scenario(args.url, scenario, args.concurrency, args.duration, args.token))
+        results.append(result)
+        lat = result["latency_ms"]
+        print(f"{scenario:18s} {result['requests_per_sec']:>9.1f} req/s  "
+              f"p50 {lat['p50']:>7.2f}ms  p95 {lat['p95']:>7.2f}ms  p99 {lat['p99']:>7.2f}ms  {result['status']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
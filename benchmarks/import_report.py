@@ -0,0 +1,149 @@
+"""
+모듈/페이지 import 시간 리포트 (콜드 스타트 비용 추적용)
+
+    python benchmarks/import_report.py                          # import_report.json 생성
+    python benchmarks/import_report.py --compare old.json       # 이전 결과와 비교
+    python benchmarks/import_report.py --repeat 5 --top 15
+
+대상마다 새 파이썬 프로세스에서 `python -X importtime`으로 import 하고 결과를 모읍니다. (매번 콜드 스타트)
+  - utils/*.py 모듈 각각
+  - app.py, pages/*.py: 스크립트는 실행하지 않고, 파일의 최상위 import 문만 모아서 import
+결과: 대상별 전체 import 시간(ms, repeat 회 중 최솟값)과 최상위 패키지별 시간(무거운 순)
+"""
+import os
+import re
+import ast
+import sys
+import glob
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from benchmarks.label_benchmark import _git_commit, compare
+
+# "import time:      1234 |      5678 |   package.module"  (self us | cumulative us | 모듈)
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def _script_imports(path):
+    """스크립트 파일의 최상위 import 문만 추출해 실행 가능한 코드로 반환합니다."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def targets():
+    """{대상 이름: import 코드}"""
+    result = {}
+    for path in sorted(glob.glob(os.path.join("utils", "*.py"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name != "__init__":
+            result[f"utils.{name}"] = f"import utils.{name}"
+    for path in ["app.py"] + sorted(glob.glob(os.path.join("pages", "*.py"))):
+        result[path] = _script_imports(path)
+    return result
+
+
+def _importtime(code):
+    """새 프로세스에서 code를 실행하고 [(모듈, self us)] 또는 (None, 오류 메시지)를 반환합니다."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit {proc.returncode}"
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((m.group(3), int(m.group(1))))
+    return rows, None
+
+_baseline = None
+
+def measure(code):
+    """
+    code를 import 하는 데 걸린 (전체 ms, {최상위 패키지: ms}) 를 반환합니다. 실패하면 (None, 오류 메시지).
+    인터프리터 시작 시 항상 로드되는 모듈(site, encodings 등)은 제외하고,
+    각 모듈의 self 시간을 최상위 패키지별로 합산합니다. (sqlalchemy 하위 모듈 → sqlalchemy)
+    """
+    global _baseline
+    if _baseline is None:
+        rows, _ = _importtime("pass")
+        _baseline = {module for module, _ in rows or []}
+
+    rows, err = _importtime(code)
+    if rows is None:
+        return None, err
+    packages = {}
+    for module, self_us in rows:
+        if module in _baseline:
+            continue
+        top = module.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+    total_ms = round(sum(packages.values()) / 1000, 1)
+    return total_ms, {k: round(v / 1000, 1) for k, v in packages.items()}
+
+
+def run(repeat=3, top=10):
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": repeat,
+        },
+        "total_ms": {},
+        "packages_ms": {},
+        "errors": {},
+    }
+    for name, code in targets().items():
+        best_total, best_packages = None, None
+        for _ in range(repeat):
+            total, packages = measure(code)
+            if total is None:
+                results["errors"][name] = packages
+                break
+            if best_total is None or total < best_total:
+                best_total, best_packages = total, packages
+        if best_total is None:
+            continue
+        results["total_ms"][name] = best_total
+        heaviest = sorted(best_packages.items(), key=lambda kv: -kv[1])[:top]
+        results["packages_ms"][name] = dict(heaviest)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈/페이지 import 시간 리포트")
+    parser.add_argument("--output", default="import_report.json", help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--repeat", type=int, default=3, help="대상별 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--top", type=int, default=8, help="대상별로 표시할 무거운 패키지 수")
+    args = parser.parse_args(argv)
+
+    results = run(repeat=args.repeat, top=args.top)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    for name, total in sorted(results["total_ms"].items(), key=lambda kv: -kv[1]):
+        heaviest = ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in results["packages_ms"][name].items())
+        print(f"{name:40s} {total:>8.1f} ms   [{heaviest}]")
+    for name, message in results["errors"].items():
+        print(f"{name:40s} import 실패: {message}")
+    print(f"결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), {k: v for k, v in results.items() if k != "packages_ms"})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
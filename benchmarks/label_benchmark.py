@@ -0,0 +1,185 @@
+"""
+라벨 생성 벤치마크 (Streamlit 서버 없이 실행)
+
+    python benchmarks/label_benchmark.py                      # bench_results.json 생성
+    python benchmarks/label_benchmark.py --quick              # 반복 횟수를 줄여 빠르게 확인
+    python benchmarks/label_benchmark.py --compare old.json   # 이전 결과와 비교
+
+측정 항목: 라벨 1장 지연시간, 배치 처리량(labels/sec), 제품명 길이별 wrap_text 비용, 최대 RSS
+결과는 커밋 해시와 함께 JSON으로 저장되어 커밋 간 회귀를 비교할 수 있습니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+# 저장소 루트 기준으로 실행 (fonts/NotoSansKR-Regular.ttf 상대경로 사용)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+import PIL
+from PIL import Image, ImageDraw, ImageFont
+from utils import barcode_generator
+
+FONT_PATH = os.path.join("fonts", "NotoSansKR-Regular.ttf")
+SAMPLE_NAME = "이퀄베리 프로폴리스 앰플 세럼 대용량 리필 기획세트"
+
+
+def _label_record(i, name=SAMPLE_NAME):
+    return {
+        "serial_number": 1_700_000_000 + i,
+        "product_code": "EQ-0001",
+        "product_name": name,
+        "lot": "L2401A",
+        "expiry": "2027-12-31",
+        "version": "R0",
+        "location": "A-01-01",
+        "category": "관리품",
+    }
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _rss_mb():
+    """현재까지의 최대 RSS (MB). Linux는 KB, macOS는 byte 단위로 보고됩니다."""
+    scale = 1 if sys.platform == "darwin" else 1024
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(self_rss / 2**20, 1), round(child_rss / 2**20, 1)
+
+
+def bench_single_label(iterations):
+    record = _label_record(0)
+    args = [record[f] for f in barcode_generator.LABEL_FIELDS]
+    barcode_generator.create_barcode_image(*args)  # 폰트 로드 등 워밍업
+
+    timings = []
+    for i in range(iterations):
+        args[0] = 1_700_000_000 + i
+        started = time.perf_counter()
+        barcode_generator.create_barcode_image(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    barcode_generator.create_barcode_image(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "max_ms": round(max(timings), 3),
+        "python_alloc_peak_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_batch(count, workers_list):
+    records = [_label_record(i) for i in range(count)]
+    results = {}
+    for workers in workers_list:
+        _, stats = barcode_generator.render_labels_batch(records, max_workers=workers)
+        results[f"workers_{workers or 'auto'}"] = stats
+    return results
+
+
+def bench_wrap_text(lengths, repeats):
+    try:
+        font = ImageFont.truetype(FONT_PATH, 26)
+    except OSError:
+        font = ImageFont.load_default()
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    max_width = barcode_generator.LABEL_WIDTH - 30 - draw.textlength("제품명: ", font=font)
+
+    results = {}
+    for length in lengths:
+        text = (SAMPLE_NAME * (length // len(SAMPLE_NAME) + 1))[:length]
+        barcode_generator.wrap_text(draw, text, font, max_width)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            barcode_generator.wrap_text(draw, text, font, max_width)
+        results[str(length)] = round((time.perf_counter() - started) / repeats * 1e6, 1)
+    return {"unit": "us_per_call", "by_length": results}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run(quick=False):
+    scale = 5 if quick else 1
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "cpu_count": os.cpu_count(),
+            "font": FONT_PATH if os.path.exists(FONT_PATH) else "default (폰트 파일 없음)",
+        },
+        "single_label": bench_single_label(200 // scale),
+        "batch": bench_batch(500 // scale, [1, None]),
+        "wrap_text": bench_wrap_text([10, 25, 50, 100, 200, 400], 200 // scale),
+    }
+    self_rss, child_rss = _rss_mb()
+    results["peak_rss_mb"] = {"main": self_rss, "workers": child_rss}
+    return results
+
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            yield from _flatten(v, key + ".")
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield key, v
+
+
+def compare(old, new):
+    """두 결과의 숫자 항목을 비교해 변화율(%)을 출력합니다."""
+    old_flat = dict(_flatten({k: v for k, v in old.items() if k != "meta"}))
+    print(f"비교: {old.get('meta', {}).get('commit')} → {new.get('meta', {}).get('commit')}")
+    for key, value in _flatten({k: v for k, v in new.items() if k != "meta"}):
+        if key in old_flat and old_flat[key]:
+            change = (value - old_flat[key]) / old_flat[key] * 100
+            print(f"  {key:45s} {old_flat[key]:>12} → {value:>12}  ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="라벨 생성 벤치마크")
+    parser.add_argument("--output", default="bench_results.json", help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 줄여 빠르게 실행")
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
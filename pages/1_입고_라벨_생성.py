@@ -6,6 +6,14 @@ import pytz
 
 from utils import db_manager
 from utils import barcode_generator  # 기존 파일 그대로 사용
+from utils import printer_manager
+from utils import label_cache
+from utils import inbound_manifest
+from utils import serial_allocator
+from utils import product_index
+from utils import sheets_mirror
+from utils import location_manager as lm
+from utils import location_index
 from utils import auth_manager  # 👈 임포트 추가
 
 
@@ -30,10 +38,9 @@ if product_df is None or product_df.empty:
 PRODUCTS = pd.Series(product_df.제품명.values, index=product_df.제품코드).to_dict()
 PRODUCT_CODES = list(PRODUCTS.keys())
 
-# (옵션) ERP 데이터에 '바코드' 컬럼이 있으면 간단 매핑도 사용 가능
-barcode_map = None
-if "바코드" in product_df.columns and "제품코드" in product_df.columns:
-    barcode_map = product_df.set_index("바코드")["제품코드"].to_dict()
+# 보관위치 목록 (구역 설정 기반) + 현재 점유 현황
+LOCATION_OPTIONS = lm.get_location_options()
+location_counts = location_index.get_location_occupancy().counts()
 
 # 2) 바코드 스캔: 콜백/세션 상태 -----------------------------------------
 def find_product_by_barcode():
@@ -42,13 +49,10 @@ def find_product_by_barcode():
     if not scanned:
         return
 
-    # A안) ERP DB 직접 조회 (권장)
-    info = db_manager.find_product_info_by_barcode(scanned)
-    if info and ("resource_code" in info or "제품코드" in info):
-        st.session_state.selected_product_code = info.get("resource_code") or info.get("제품코드")
-    # B안) 로컬 프레임 매핑 (대체용)
-    elif barcode_map and scanned in barcode_map:
-        st.session_state.selected_product_code = barcode_map[scanned]
+    # 프로세스 공용 바코드 인덱스(메모리) 조회, 없을 때만 ERP DB 조회
+    info = product_index.find_product_by_barcode(scanned)
+    if info and info.get("resource_code"):
+        st.session_state.selected_product_code = info["resource_code"]
     else:
         st.warning(f"'{scanned}' 에 해당하는 제품을 찾지 못했습니다.")
 
@@ -84,10 +88,16 @@ with st.form("inbound_form"):
         format_func=lambda x: f"{x} ({PRODUCTS.get(x, '알 수 없는 제품')})"
     )
 
-    # 보관위치: 자유 입력 (필요시 프리셋 selectbox로 교체 가능)
-    storage_location = st.text_input("보관위치 (예: A-01-01)")
+    # 보관위치: 구역 설정의 위치만 선택 가능, 재고가 가장 적은 위치를 기본 추천
+    suggested_location = lm.suggest_location(LOCATION_OPTIONS, location_counts)
+    storage_location = st.selectbox(
+        "보관위치 (기본값: 재고가 가장 적은 위치)",
+        options=LOCATION_OPTIONS,
+        index=LOCATION_OPTIONS.index(suggested_location) if suggested_location else None,
+        format_func=lambda loc: f"{loc} (재고 {location_counts.get(loc, 0)})"
+    )
 
-    category = st.selectbox("구분", ["관리품", "표준품", "벌크표준", "샘플재고"])
+    category = st.selectbox("구분", inbound_manifest.CATEGORIES)
 
     # 샘플재고: 고정값/비활성화
     expiration_date_obj = None  # 아래 로직에서 안전하게 사용하기 위해 기본값 지정
@@ -104,6 +114,15 @@ with st.form("inbound_form"):
         )
         version = st.text_input("버전(version)", value="R0")
 
+    # 라벨 프린터가 설정된 경우에만 바로 출력 옵션 표시
+    printer_cfg = printer_manager.get_printer_config()
+    direct_print = False
+    if printer_cfg:
+        direct_print = st.checkbox(
+            f"🖨️ 라벨 프린터로 바로 출력 ({printer_cfg['language'].upper()} → {printer_cfg['host']})",
+            value=True
+        )
+
     submitted = st.form_submit_button("라벨 생성 및 입고 처리")
 
 # 4) 처리 로직 -----------------------------------------------------------
@@ -112,7 +131,10 @@ if submitted:
         st.warning("제품코드와 보관위치는 필수입니다.")
         st.stop()
 
-    serial_number = int(datetime.now().timestamp())  # 예시 S/N (환경에 맞게 교체 가능)
+    # S/N: SCM DB 시퀀스에서 블록 단위로 예약한 번호를 발급 (세션/워커 간 중복 없음)
+    serial_number = serial_allocator.next_serial()
+    if serial_number is None:
+        st.stop()
     product_name = PRODUCTS.get(product_code, "알 수 없는 제품")
 
     # expiration_date, disposal_date 계산
@@ -132,23 +154,29 @@ if submitted:
     received_at_str = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
 
     # 라벨 이미지 생성/표시 (+ 다운로드)
-    label_img = barcode_generator.create_barcode_image(
+    label_args = (
         serial_number, product_code, product_name, lot_number,
         expiration_date_str, version, storage_location, category
     )
-    st.image(label_img, caption=f"라벨 (S/N: {serial_number})")
+    cache = label_cache.get_label_cache()
+    label_png = cache.get_or_render(label_args, "png")
+    st.image(label_png, caption=f"라벨 (S/N: {serial_number})")
 
-    buf = io.BytesIO()
-    label_img.save(buf, format="PNG")
     st.download_button(
         "🖨️ 라벨 이미지 다운로드 (인쇄용)",
-        buf.getvalue(),
+        label_png,
         file_name=f"label_{serial_number}.png",
         mime="image/png"
     )
+    st.download_button(
+        "📄 프린터 명령어(ZPL) 다운로드",
+        cache.get_or_render(label_args, "zpl"),
+        file_name=f"label_{serial_number}.zpl",
+        mime="text/plain"
+    )
 
     # DB INSERT (영문 스키마 파라미터)
-    inv_ok = db_manager.insert_inventory_record({
+    inventory_row = {
         "serial_number": serial_number,
         "category": category,
         "product_code": product_code,
@@ -159,9 +187,8 @@ if submitted:
         "storage_location": storage_location,
         "version": version,
         "received_at": received_at_str
-    })
-
-    inout_ok = db_manager.insert_inout_record({
+    }
+    inout_row = {
         "timestamp": received_at_str,
         "type": "입고",
         "serial_number": str(serial_number),
@@ -169,9 +196,126 @@ if submitted:
         "product_name": product_name,
         "quantity": 1,
         "handler": ""
-    })
-
-    if inv_ok and inout_ok:
+    }
+    # 재고/입출고 이력을 한 트랜잭션으로 저장 (일부만 저장되는 경우 없음)
+    if db_manager.insert_inbound_batch([inventory_row], [inout_row]):
+        location_index.record_inbound([inventory_row])
+        sheets_mirror.mirror_inbound([inventory_row], [inout_row])
         st.success("✅ 입고 완료! SCM DB에 저장되었습니다.")
+
+        # DB 저장이 끝난 S/N만 실물 라벨로 출력 (저장 실패 후 재시도 시 라벨이 중복 출력되지 않도록)
+        if direct_print and printer_manager.print_label(label_args, config=printer_cfg):
+            st.success(f"🖨️ 라벨을 프린터({printer_cfg['host']})로 전송했습니다.")
     else:
-        st.error("입고 처리 중 일부 단계에서 오류가 발생했습니다.")
+        st.error("입고 처리 중 오류가 발생했습니다. 라벨은 프린터로 출력하지 않았습니다.")
+
+# 5) 대량 입고 (CSV/Excel) -----------------------------------------------
+st.divider()
+with st.expander("📑 대량 입고 (CSV/Excel 업로드)"):
+    st.caption(
+        "양식 컬럼: 제품코드(또는 바코드), 보관위치, 구분, LOT, 유통기한(YYYY-MM-DD), 버전, "
+        f"수량(생략 시 1, 행당 최대 {inbound_manifest.MAX_QUANTITY})"
+    )
+    st.download_button(
+        "📥 업로드 양식(CSV) 다운로드",
+        inbound_manifest.manifest_template(),
+        file_name="inbound_manifest_template.csv",
+        mime="text/csv"
+    )
+    # 처리 완료 후 업로더 key를 바꿔 파일을 비움 (같은 목록을 다시 입고하지 않도록)
+    if "manifest_upload_id" not in st.session_state:
+        st.session_state.manifest_upload_id = 0
+    manifest_file = st.file_uploader(
+        "입고 목록 파일", type=["csv", "xlsx"], key=f"manifest_file_{st.session_state.manifest_upload_id}"
+    )
+
+    if manifest_file is None and "bulk_inbound_result" in st.session_state:
+        result = st.session_state.bulk_inbound_result
+        st.success(result["message"])
+        st.download_button(
+            "🖨️ 라벨 PDF 다운로드 (인쇄용)",
+            result["pdf"],
+            file_name=result["file_name"],
+            mime="application/pdf",
+            key="bulk_pdf_download"
+        )
+
+    if manifest_file is not None:
+        st.session_state.pop("bulk_inbound_result", None)
+        try:
+            manifest_df = inbound_manifest.read_manifest(manifest_file)
+            valid_df, error_df = inbound_manifest.validate_manifest(
+                manifest_df, product_df, LOCATION_OPTIONS,
+                lookup_codes=db_manager.find_products_by_codes,
+                lookup_barcodes=db_manager.find_products_by_barcodes,
+            )
+        except Exception as e:
+            st.error(f"입고 목록 파일 처리 실패: {e}")
+            valid_df, error_df = None, None
+
+        if error_df is not None and not error_df.empty:
+            st.error(f"검증 오류 {len(error_df)}건 — 오류를 수정한 뒤 다시 업로드하세요.")
+            st.dataframe(error_df, use_container_width=True, hide_index=True)
+        elif valid_df is not None and not valid_df.empty:
+            st.success(f"검증 완료: 라벨 {len(valid_df)}장 입고 예정")
+            st.dataframe(
+                valid_df[["product_code", "product_name", "category", "lot", "expiration_date", "version", "storage_location"]],
+                use_container_width=True, hide_index=True
+            )
+
+            if st.button(f"✅ 대량 입고 처리 ({len(valid_df)}건)", type="primary", key="bulk_inbound_btn"):
+                kst = pytz.timezone('Asia/Seoul')
+                received_at_str = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
+                serials = serial_allocator.allocate_serials(len(valid_df))
+                if serials is None:
+                    st.stop()
+
+                inventory_rows, inout_rows, label_records = inbound_manifest.build_inbound_rows(
+                    valid_df, serials, received_at_str
+                )
+                if db_manager.insert_inbound_batch(inventory_rows, inout_rows):
+                    location_index.record_inbound(inventory_rows)
+                    sheets_mirror.mirror_inbound(inventory_rows, inout_rows)
+                    with st.spinner("라벨 생성 중..."):
+                        images, stats = barcode_generator.render_labels_batch(label_records)
+                        pdf_buf = io.BytesIO()
+                        barcode_generator.save_labels_pdf(images, pdf_buf)
+                    # 결과는 세션에 보관하고 업로드 파일은 비운 뒤 다시 그림 (입고 버튼 재클릭으로 중복 입고 방지)
+                    st.session_state.bulk_inbound_result = {
+                        "message": (
+                            f"✅ 대량 입고 완료! {len(inventory_rows)}건 저장 "
+                            f"(라벨 {stats['count']}장, {stats['labels_per_sec']} labels/sec)"
+                        ),
+                        "pdf": pdf_buf.getvalue(),
+                        "file_name": f"labels_{serials[0]}_{serials[-1]}.pdf",
+                    }
+                    st.session_state.manifest_upload_id += 1
+                    st.rerun()
+
+# 6) 라벨 재출력 ---------------------------------------------------------
+st.divider()
+with st.expander("🔁 라벨 재출력 (기존 S/N)"):
+    reprint_serial = st.text_input("재출력할 일련번호(S/N)", key="reprint_serial").strip()
+    if reprint_serial:
+        record = db_manager.find_inventory_by_serial(reprint_serial)
+        if not record:
+            st.warning(f"'{reprint_serial}' 에 해당하는 입고 정보가 없습니다.")
+        else:
+            reprint_args = (
+                record["serial_number"], record["product_code"], record["product_name"], record["lot"],
+                record["expiration_date"], record["version"], record["storage_location"], record["category"]
+            )
+            # 같은 라벨은 캐시에서 바로 가져오므로 미리보기/재출력 시 다시 렌더링하지 않음
+            cache = label_cache.get_label_cache()
+            reprint_png = cache.get_or_render(reprint_args, "png")
+            st.image(reprint_png, caption=f"라벨 (S/N: {reprint_serial})")
+            st.download_button(
+                "🖨️ 라벨 이미지 다운로드 (재출력)",
+                reprint_png,
+                file_name=f"label_{reprint_serial}.png",
+                mime="image/png",
+                key="reprint_download"
+            )
+            if printer_cfg and st.button("🖨️ 라벨 프린터로 재출력", key="reprint_print"):
+                if printer_manager.print_label(reprint_args, config=printer_cfg):
+                    st.success(f"🖨️ 라벨을 프린터({printer_cfg['host']})로 전송했습니다.")
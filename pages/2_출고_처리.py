@@ -2,9 +2,11 @@ import streamlit as st
 from datetime import datetime
 import pytz
 import time
-from sqlalchemy import text
 
 from utils import db_manager
+from utils import scan_batch
+from utils import sheets_mirror
+from utils import location_index
 from utils import auth_manager  # 👈 임포트 추가
 
 st.set_page_config(page_title="출고 처리", page_icon="📤")
@@ -15,57 +17,60 @@ st.title("📤 출고 처리 (바코드 스캔 지원)")
 # 세션 초기화
 if "outbound_list" not in st.session_state:
     st.session_state.outbound_list = []  # [{type, code, product_code, product_name, quantity}]
-
-# 스캔 콜백
+if "outbound_codes" not in st.session_state:
+    st.session_state.outbound_codes = set()  # 목록에 있는 코드 (중복 확인용)
+
+def add_codes_to_outbound_list(codes):
+    """코드 묶음을 한 번에 분류/조회하여 출고 목록 앞쪽에 추가하고 결과를 알립니다."""
+    items, duplicates, invalid, unknown = scan_batch.build_outbound_items(
+        codes, st.session_state.outbound_codes
+    )
+    # 최근 스캔이 위로 오도록 역순으로 앞에 붙임
+    st.session_state.outbound_list[:0] = items[::-1]
+    st.session_state.outbound_codes.update(item["code"] for item in items)
+
+    if duplicates:
+        st.warning(f"이미 목록에 추가된 코드입니다: {', '.join(duplicates)}")
+    if unknown:
+        st.error(f"ERP DB에 등록되지 않은 제품 바코드입니다: {', '.join(unknown)}")
+    if invalid:
+        st.error(f"유효하지 않은 코드 형식입니다: {', '.join(invalid)}")
+    return items
+
+# 스캔 콜백 (한 건씩 Enter)
 def add_item_to_outbound_list():
     scanned = st.session_state.get("barcode_scan_input", "").strip()
-    if not scanned:
-        return
-
-    if any(item["code"] == scanned for item in st.session_state.outbound_list):
-        st.warning(f"이미 목록에 추가된 코드입니다: {scanned}")
-        st.session_state.barcode_scan_input = ""
-        return
-
-    item_to_add = None
-    # 제품 바코드(예: 88로 시작) → ERP 조회
-    if scanned.startswith("88"):
-        info = db_manager.find_product_info_by_barcode(scanned)
-        if info:
-            item_to_add = {
-                "type": "제품",
-                "code": scanned,
-                "product_code": info.get("resource_code", "N/A"),
-                "product_name": info.get("resource_name", "알 수 없는 제품"),
-                "quantity": 1
-            }
-        else:
-            st.error(f"ERP DB에 등록되지 않은 제품 바코드입니다: {scanned}")
-    # 숫자만 → 일련번호(S/N)
-    elif scanned.isdigit():
-        item_to_add = {
-            "type": "S/N",
-            "code": scanned,
-            "product_code": "N/A",
-            "product_name": f"일련번호-{scanned}",
-            "quantity": 1
-        }
-    else:
-        st.error(f"유효하지 않은 코드 형식입니다: {scanned}")
-
-    if item_to_add:
-        st.session_state.outbound_list.insert(0, item_to_add)
-
+    if scanned:
+        add_codes_to_outbound_list([scanned])
     st.session_state.barcode_scan_input = ""
 
+# 버퍼 스캔 콜백 (연속 스캔/붙여넣기 블록을 한 번에 처리)
+def add_buffered_items_to_outbound_list():
+    codes = scan_batch.split_codes(st.session_state.get("barcode_scan_buffer", ""))
+    if codes:
+        items = add_codes_to_outbound_list(codes)
+        st.success(f"{len(codes)}건 스캔 → {len(items)}건 추가")
+    st.session_state.barcode_scan_buffer = ""
+
 # 입력 UI
-st.info("바코드를 스캔하면 아래 '출고 목록'에 자동으로 추가됩니다.")
-st.text_input(
-    "스캔 입력",
-    key="barcode_scan_input",
-    on_change=add_item_to_outbound_list,
-    placeholder="여기에 바코드를 연속으로 스캔하세요 (Enter)"
+buffered = st.toggle(
+    "⚡ 버퍼 스캔 모드",
+    help="빠르게 연속 스캔하거나 코드 목록을 붙여넣은 뒤 한 번에 추가합니다. (스캔마다 화면을 다시 그리지 않음)"
 )
+if buffered:
+    st.info("스캔(또는 붙여넣기)을 모두 마친 뒤 '목록에 추가'를 누르세요. 줄바꿈/공백/쉼표로 구분됩니다.")
+    with st.form("scan_buffer_form"):
+        st.text_area("스캔 버퍼", key="barcode_scan_buffer", height=200,
+                     placeholder="880000000001\n1001\n1002 ...")
+        st.form_submit_button("목록에 추가", on_click=add_buffered_items_to_outbound_list)
+else:
+    st.info("바코드를 스캔하면 아래 '출고 목록'에 자동으로 추가됩니다.")
+    st.text_input(
+        "스캔 입력",
+        key="barcode_scan_input",
+        on_change=add_item_to_outbound_list,
+        placeholder="여기에 바코드를 연속으로 스캔하세요 (Enter)"
+    )
 st.divider()
 
 # 목록 UI
@@ -89,6 +94,7 @@ else:
             st.write("")
             if st.button("삭제", key=f"del_{item['code']}", type="secondary"):
                 st.session_state.outbound_list.pop(i)
+                st.session_state.outbound_codes.discard(item["code"])
                 st.rerun()
 
 # 최종 처리
@@ -111,35 +117,31 @@ if submitted:
 
     # 상태 테이블에 '출고됨' 표시를 하려면, 스키마에 해당 컬럼이 있어야 합니다.
     # 현재 영문 스키마에는 outbound/status 컬럼이 없으므로 '이력 기록만' 수행합니다.
+    # 전체 목록을 한 번의 S/N 검증 쿼리 + 한 번의 트랜잭션으로 기록합니다.
+    with st.spinner(f"{len(st.session_state.outbound_list)}건 출고 처리 중..."):
+        results = db_manager.insert_outbound_batch(st.session_state.outbound_list, handler, now_kst_str)
+
+    # DB 반영이 끝난 출고 건만 보관위치 점유 현황과 Google Sheets 미러에 반영
+    sheets_mirror.mirror_outbound([r["record"] for r in results if r["ok"]])
+    location_index.record_outbound(results)
+
+    success = sum(1 for r in results if r["ok"])
+    failed = [r for r in results if not r["ok"]]
+    if failed:
+        st.warning(f"일괄 출고 처리 완료! 성공: {success}건, 실패: {len(failed)}건 (실패 항목은 목록에 남겨둡니다)")
+        for r in failed:
+            st.caption(f"- {r['code']}: {r['reason']}")
+        # 성공한 항목만 목록에서 제거하고 실패 항목은 재처리할 수 있도록 유지
+        failed_codes = {r["code"] for r in failed}
+        st.session_state.outbound_list = [
+            item for item in st.session_state.outbound_list if item["code"] in failed_codes
+        ]
+        st.session_state.outbound_codes = failed_codes
+        st.stop()
 
-    success, fail = 0, 0
-    total = len(st.session_state.outbound_list)
-    progress = st.progress(0, text="출고 처리 시작...")
-
-    for idx, item in enumerate(st.session_state.outbound_list):
-        try:
-            # 이력 기록
-            ok = db_manager.insert_inout_record({
-                "timestamp": now_kst_str,
-                "type": "출고",
-                "serial_number": item["code"] if item["type"] == "S/N" else "N/A",
-                "product_code": item["product_code"],
-                "product_name": item["product_name"],
-                "quantity": int(item["quantity"]),
-                "handler": handler
-            })
-            success += 1 if ok else 0
-            fail += 0 if ok else 1
-        except Exception as e:
-            st.error(f"처리 실패: {item['code']} / {e}")
-            fail += 1
-
-        progress.progress((idx + 1) / total, text=f"({idx+1}/{total}) {item['product_name']} 처리 중...")
-        time.sleep(0.03)
-
-    progress.empty()
-    st.success(f"🚀 일괄 출고 처리 완료! 성공: {success}건, 실패: {fail}건")
+    st.success(f"🚀 일괄 출고 처리 완료! 성공: {success}건, 실패: 0건")
 
     st.session_state.outbound_list = []
+    st.session_state.outbound_codes = set()
     time.sleep(0.3)
     st.rerun()
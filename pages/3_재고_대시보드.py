@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
+import pytz
+from datetime import datetime, timedelta
 from utils import db_manager
+from utils import inbound_manifest
 from utils import auth_manager
 
 st.set_page_config(page_title="재고 대시보드", page_icon="📊", layout="wide")
@@ -8,38 +10,122 @@ st.set_page_config(page_title="재고 대시보드", page_icon="📊", layout="w
 auth_manager.require_auth()
 st.title("📊 재고 대시보드")
 
-engine = db_manager.connect_to_scm()
+engine = db_manager.connect_to_scm_read()  # 조회 전용 엔드포인트 (미설정 시 기본 SCM)
 if engine is None:
     st.error("SCM DB 연결 실패")
     st.stop()
 
-# 상태/이력 조회
-try:
-    df_inventory = pd.read_sql("SELECT * FROM `Retained_sample_status`", engine)
-except Exception as e:
-    st.error(f"재고 현황 로드 실패: {e}")
-    df_inventory = pd.DataFrame()
+PAGE_SIZES = [25, 50, 100, 200]
+KST = pytz.timezone('Asia/Seoul')  # 입출고 시각은 KST로 저장됨
 
-try:
-    df_history = pd.read_sql("SELECT * FROM `Retained_sample_in_out`", engine)
-except Exception as e:
-    st.error(f"입출고 기록 로드 실패: {e}")
-    df_history = pd.DataFrame()
+# 요약 (건수/최근 10건만 조회, SUMMARY_TTL 동안 모든 세션이 공유) -------------
+inventory_count = db_manager.count_inventory()
+recent_inout = db_manager.load_recent_inout(10)
+
+today = datetime.now(KST).date()
+today_counts = db_manager.count_inout_by_day(today.strftime("%Y-%m-%d"))
+m1, m2, m3 = st.columns(3)
+m1.metric("누적 입고 샘플", f"{inventory_count:,}건" if inventory_count is not None else "-")
+m2.metric("오늘 입고", f"{today_counts.get('입고', 0):,}건")
+m3.metric("오늘 출고", f"{today_counts.get('출고', 0):,}건")
+if not recent_inout.empty:
+    st.caption("최근 입출고 10건")
+    st.dataframe(recent_inout, use_container_width=True, hide_index=True)
+
+# 현재 재고 (쓰기 시점에 유지되는 요약 테이블 조회, 이력 전체 스캔 없음)
+s1, s2 = st.columns(2)
+with s1:
+    st.caption("제품별 현재 재고")
+    st.dataframe(db_manager.load_stock_summary("product"), use_container_width=True, hide_index=True, height=250)
+with s2:
+    st.caption("보관위치별 현재 재고")
+    st.dataframe(db_manager.load_stock_summary("location"), use_container_width=True, hide_index=True, height=250)
+
+st.caption(f"요약 데이터는 최대 {db_manager.SUMMARY_TTL}초 지연될 수 있습니다.")
+
+st.divider()
+
+# 필터 (DB에서 WHERE 조건으로 처리) ---------------------------------------
+with st.expander("🔎 검색 조건", expanded=True):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        f_product = st.text_input("제품 (코드 또는 이름 일부)")
+        f_category = st.multiselect("구분", inbound_manifest.CATEGORIES, help="재고 현황에만 적용")
+    with col2:
+        f_location = st.text_input("보관위치 (접두어, 예: A-01)", help="재고 현황에만 적용")
+        f_type = st.multiselect("입출고 유형", ["입고", "출고"], help="입출고 기록에만 적용")
+    with col3:
+        use_dates = st.checkbox("기간 지정")
+        date_range = st.date_input(
+            "기간 (입고일시 / 타임스탬프)",
+            value=(today - timedelta(days=30), today),
+            disabled=not use_dates
+        )
+        page_size = st.selectbox("페이지 크기", PAGE_SIZES, index=1)
+
+common_filters = {"product": f_product}
+if use_dates and isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+    common_filters["date_from"], common_filters["date_to"] = date_range
+# 테이블에 없는 컬럼의 필터는 query_page가 거부하므로 테이블별로 나눠 전달
+TABLE_FILTERS = {
+    "inventory": {**common_filters, "category": f_category, "location": f_location},
+    "inout": {**common_filters, "type": f_type},
+}
+
+def paged_table(table, title, sort_options, default_sort):
+    """키셋 페이지네이션 테이블: 현재 페이지만 DB에서 가져와 표시합니다."""
+    st.subheader(title)
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        sort_by = st.selectbox("정렬 기준", sort_options, index=sort_options.index(default_sort), key=f"{table}_sort")
+    with c2:
+        descending = st.toggle("내림차순", value=True, key=f"{table}_desc")
+
+    filters = TABLE_FILTERS[table]
+    # 조건이 바뀌면 첫 페이지로
+    signature = repr((filters, sort_by, descending, page_size))
+    state_key = f"{table}_cursors"
+    if st.session_state.get(f"{table}_signature") != signature:
+        st.session_state[f"{table}_signature"] = signature
+        st.session_state[state_key] = [None]
+    cursors = st.session_state[state_key]
+
+    df, next_cursor = db_manager.query_page(
+        table, filters=filters, sort_by=sort_by, descending=descending,
+        cursor=cursors[-1], limit=page_size
+    )
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    b1, b2, b3 = st.columns([1, 1, 6])
+    with b1:
+        if st.button("◀ 이전", key=f"{table}_prev", disabled=len(cursors) <= 1):
+            cursors.pop()
+            st.rerun()
+    with b2:
+        if st.button("다음 ▶", key=f"{table}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+    with b3:
+        st.caption(f"{len(cursors)} 페이지 · {len(df)}건 표시")
 
 # 재고 현황
-st.subheader("📦 재고 현황")
-# 컬럼이 존재하면 보기 좋게 정렬/선택
-inv_cols = [
-    "serial_number", "category", "product_code", "product_name", "lot",
-    "expiration_date", "disposal_date", "storage_location", "version", "received_at"
-]
-show_inv = [c for c in inv_cols if c in df_inventory.columns]
-st.dataframe(df_inventory[show_inv] if show_inv else df_inventory, use_container_width=True)
+paged_table(
+    "inventory", "📦 재고 현황",
+    ["received_at", "serial_number", "product_code", "storage_location", "expiration_date"],
+    "received_at"
+)
 
 st.divider()
 
 # 입출고 기록
-st.subheader("📜 입출고 기록")
-if "timestamp" in df_history.columns:
-    df_history = df_history.sort_values(by="timestamp", ascending=False)
-st.dataframe(df_history, use_container_width=True)
+paged_table(
+    "inout", "📜 입출고 기록",
+    ["timestamp", "id", "product_code", "serial_number"],
+    "timestamp"
+)
+
+# DB 커넥션 풀 상태
+with st.sidebar.expander("🔌 DB 커넥션 풀 상태"):
+    for name, status in db_manager.get_pool_stats().items():
+        st.caption(name)
+        st.json(status, expanded=False)
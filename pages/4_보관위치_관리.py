@@ -1,5 +1,8 @@
 import streamlit as st
+import altair as alt
+import pandas as pd
 from utils import location_manager as lm
+from utils import location_index
 from utils import auth_manager  # 👈 임포트 추가
 
 st.set_page_config(page_title="보관위치 관리", page_icon="⚙️")
@@ -23,13 +26,56 @@ else:
         with st.expander(f"**{details['name']} (코드: {code})**"):
             st.write(f"- **크기**: {details['rows']}행 x {details['columns']}열")
             if st.button(f"{details['name']} 삭제", key=f"delete_{code}", type="primary"):
-                del zones[code]
-                if lm.save_config(config):
+                # 잠금 상태에서 최신 설정에 적용하여 다른 세션의 변경을 덮어쓰지 않음
+                if lm.update_config(lambda cfg: cfg.setdefault("zones", {}).pop(code, None) is not None):
                     st.success(f"'{details['name']}' 구역이 삭제되었습니다.")
                     st.rerun()
                 else:
-                    # 삭제 실패 시 복원
-                    zones[code] = details
+                    st.error("이미 삭제되었거나 저장에 실패했습니다.")
+
+
+# --- 점유 현황 히트맵 ---
+st.divider()
+st.subheader("보관위치 점유 현황")
+
+occupancy = location_index.get_location_occupancy()
+if st.button("🔄 DB에서 다시 집계"):
+    occupancy.refresh(force=True)
+counts = occupancy.counts()
+grid = lm.occupancy_grid(config, counts)
+
+if not grid.empty:
+    # 구역별 요약 (전체 슬롯을 한 번에 집계)
+    summary = grid.groupby("구역").agg(
+        슬롯=("보관위치", "size"),
+        사용중=("재고", lambda s: int((s > 0).sum())),
+        재고=("재고", "sum"),
+        최대=("재고", "max"),
+    ).reset_index()
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+
+    # 히트맵은 선택한 구역만 그려 슬롯 수가 많아도 차트 크기를 일정하게 유지
+    zone_code = st.selectbox(
+        "구역 선택",
+        options=list(zones.keys()),
+        format_func=lambda code: f"{zones[code]['name']} ({code})"
+    )
+    zone_grid = grid[grid["구역"] == zone_code]
+    heatmap = alt.Chart(zone_grid).mark_rect(stroke="white").encode(
+        x=alt.X("열:O", title="열"),
+        y=alt.Y("행:O", title="행"),
+        color=alt.Color("재고:Q", scale=alt.Scale(scheme="orangered")),
+        tooltip=["보관위치", "재고"],
+    )
+    text_layer = heatmap.mark_text(fontSize=11).encode(text="재고:Q", color=alt.value("black"))
+    st.altair_chart(heatmap + text_layer, use_container_width=True)
+
+# 구역 설정에 없는 위치에 남아 있는 재고 (구역 삭제/자유 입력 등)
+orphans = {loc: n for loc, n in counts.items() if not lm.is_valid_location(config, loc)}
+if orphans:
+    st.warning(f"구역 설정에 없는 보관위치에 재고 {sum(orphans.values())}건이 있습니다.")
+    orphan_df = pd.DataFrame(list(orphans.items()), columns=["보관위치", "재고"])
+    st.dataframe(orphan_df.sort_values("재고", ascending=False), use_container_width=True, hide_index=True)
 
 
 # --- 새 구역 추가 ---
@@ -52,7 +98,14 @@ if submitted:
     elif new_code in zones:
         st.error(f"이미 사용 중인 구역 코드입니다: {new_code}")
     else:
-        zones[new_code] = {"name": new_name, "rows": new_rows, "columns": new_cols}
-        if lm.save_config(config):
+        def add_zone(cfg):
+            # 다른 세션이 그 사이 같은 코드를 추가했으면 저장하지 않음
+            if new_code in cfg.setdefault("zones", {}):
+                return False
+            cfg["zones"][new_code] = {"name": new_name, "rows": int(new_rows), "columns": int(new_cols)}
+
+        if lm.update_config(add_zone):
             st.success(f"새 구역 '{new_name}'이(가) 추가되었습니다!")
             st.rerun()
+        else:
+            st.error(f"구역을 추가하지 못했습니다. (다른 사용자가 이미 '{new_code}' 코드를 추가했을 수 있습니다)")
@@ -0,0 +1,167 @@
+"""
+파일(CSV/JSONL)의 라벨 레코드를 스트리밍으로 렌더링해 다중 페이지 PDF 또는 파일 디렉터리로 저장
+
+    python scripts/generate_labels.py shipment.csv -o labels.pdf
+    python scripts/generate_labels.py shipment.jsonl -o out_dir --format zpl
+    cat shipment.jsonl | python scripts/generate_labels.py - --input-format jsonl -o labels.pdf
+
+입력 컬럼(CSV 헤더 또는 JSON 키)은 라벨 필드명, DB 컬럼명, 한글 헤더를 모두 허용합니다.
+    serial_number|일련번호, product_code|제품코드, product_name|제품명, lot|LOT,
+    expiry|expiration_date|유통기한, version|버전, location|storage_location|보관위치, category|구분
+레코드를 한 줄씩 읽어 워커 풀에 넘기고, 완료된 라벨은 입력 순서대로 바로 출력에 기록합니다.
+동시에 처리 중인 라벨 수가 --window로 제한되므로 메모리 사용량은 입력 크기와 무관합니다.
+"""
+import os
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+import resource
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# 폰트 상대경로(fonts/...) 때문에 저장소 루트로 이동하므로, 입출력 경로는 실행 위치 기준으로 변환
+CALLER_CWD = os.getcwd()
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from utils import runtime
+
+# 라벨 렌더링만 하므로 DB 접속정보(secrets)는 읽지 않음
+runtime.use_headless(secrets={})
+
+from utils import barcode_generator
+from utils.pdf_writer import LabelPdfWriter
+
+# 입력 컬럼명 → 라벨 필드 (LABEL_FIELDS 자신은 그대로 매핑)
+FIELD_ALIASES = {
+    "일련번호": "serial_number",
+    "제품코드": "product_code",
+    "제품명": "product_name",
+    "LOT": "lot",
+    "expiration_date": "expiry",
+    "유통기한": "expiry",
+    "버전": "version",
+    "storage_location": "location",
+    "보관위치": "location",
+    "구분": "category",
+}
+FILE_FORMATS = {"png": "png", "zpl": "zpl", "tspl": "prn"}
+
+
+def _normalize(raw):
+    record = {}
+    for key, value in raw.items():
+        field = FIELD_ALIASES.get(str(key).strip(), str(key).strip())
+        if field in barcode_generator.LABEL_FIELDS:
+            record[field] = "" if value is None else str(value).strip()
+    return record
+
+def _open_text(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+    return open(path, encoding="utf-8-sig", newline="")
+
+def read_records(path, input_format=None):
+    """CSV/JSONL 파일을 한 줄씩 읽어 라벨 레코드 dict를 순서대로 내보냅니다. (파일 전체를 읽지 않음)"""
+    if input_format is None:
+        input_format = "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+    with _open_text(path) as f:
+        if input_format == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, _normalize(row)
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if line:
+                    yield line_no, _normalize(json.loads(line))
+
+
+def _render(record, fmt):
+    """워커에서 실행: PDF용은 회색조 이미지, 파일용은 인코딩된 바이트를 반환합니다."""
+    if fmt == "pdf":
+        return barcode_generator._render_label_record(record)
+    args = [record.get(field, "") for field in barcode_generator.LABEL_FIELDS]
+    if fmt == "zpl":
+        return barcode_generator.create_label_zpl(*args).encode("utf-8")
+    if fmt == "tspl":
+        return barcode_generator.create_label_tspl(*args).encode("utf-8")
+    buf = io.BytesIO()
+    barcode_generator.create_barcode_image(*args).convert("L").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _ordered_results(records, fmt, workers, window):
+    """
+    레코드를 워커 풀에 넘기고 결과를 입력 순서대로 내보냅니다.
+    미완료 작업을 최대 window개까지만 유지하여 입력이 아무리 커도 메모리가 일정합니다.
+    """
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=barcode_generator._init_batch_worker) as pool:
+        for line_no, record in records:
+            if not record.get("serial_number"):
+                print(f"[건너뜀] {line_no}행: serial_number 없음", file=sys.stderr)
+                continue
+            pending.append((record, pool.submit(_render, record, fmt)))
+            if len(pending) >= window:
+                done_record, future = pending.popleft()
+                yield done_record, future.result()
+        while pending:
+            done_record, future = pending.popleft()
+            yield done_record, future.result()
+
+
+def _safe_name(value):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 라벨 레코드 → PDF 또는 라벨 파일 (스트리밍)")
+    parser.add_argument("input", help="입력 파일 경로 (- 이면 표준 입력)")
+    parser.add_argument("-o", "--output", required=True, help="*.pdf 파일 또는 출력 디렉터리")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="입력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--format", choices=list(FILE_FORMATS), default="png",
+                        help="디렉터리 출력 시 파일 형식 (기본: png)")
+    parser.add_argument("--workers", type=int, default=None, help="렌더링 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--window", type=int, default=0, help="동시에 처리 중인 최대 라벨 수 (기본: 워커 수 x 4)")
+    args = parser.parse_args(argv)
+    if args.input != "-":
+        args.input = os.path.join(CALLER_CWD, args.input)
+    args.output = os.path.join(CALLER_CWD, args.output)
+
+    workers = args.workers or os.cpu_count() or 1
+    window = args.window or workers * 4
+    to_pdf = args.output.lower().endswith(".pdf")
+    fmt = "pdf" if to_pdf else args.format
+
+    records = read_records(args.input, args.input_format)
+    started = time.perf_counter()
+    count = 0
+
+    if to_pdf:
+        with open(args.output, "wb") as f, LabelPdfWriter(f) as pdf:
+            for _, image in _ordered_results(records, fmt, workers, window):
+                pdf.add_page(image)
+                count += 1
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        for record, data in _ordered_results(records, fmt, workers, window):
+            name = f"label_{_safe_name(record['serial_number'])}.{FILE_FORMATS[fmt]}"
+            with open(os.path.join(args.output, name), "wb") as f:
+                f.write(data)
+            count += 1
+
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"라벨 {count}장 → {args.output} ({elapsed:.1f}초, {rate:.1f} labels/sec, "
+          f"워커 {workers}개, 메인 프로세스 최대 RSS {peak_mb:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
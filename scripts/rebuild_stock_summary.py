@@ -0,0 +1,38 @@
+"""
+재고 요약 테이블(Retained_sample_stock_summary) 재계산
+
+    python scripts/rebuild_stock_summary.py
+
+입출고 이력 전체를 집계해 요약 테이블을 다시 채웁니다. (최초 도입 시 백필, 불일치 복구용)
+DB 접속정보는 Streamlit 앱과 같은 .streamlit/secrets.toml을 사용합니다.
+재계산 중 들어온 입출고는 누락될 수 있으므로 입출고가 없는 시간에 실행하세요.
+"""
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+from utils import runtime
+
+# Streamlit 없이 실행: .streamlit/secrets.toml을 직접 읽고 오류는 logging으로 보고
+runtime.use_headless()
+
+from utils import db_manager
+
+
+def main():
+    started = time.perf_counter()
+    if not db_manager.rebuild_stock_summary():
+        print("재고 요약 재계산 실패")
+        return 1
+
+    summary = db_manager.load_stock_summary("detail")
+    print(f"재고 요약 재계산 완료: {len(summary)}개 (제품/LOT/보관위치), {time.perf_counter() - started:.1f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
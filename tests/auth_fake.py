@@ -0,0 +1,108 @@
+"""
+Google ID 토큰 발급자를 흉내 내는 로컬 가짜 구현 (테스트용)
+
+auth_manager의 ID 토큰 검증/세션 쿠키 경로를 실제 Google 없이 실행해 볼 수 있도록
+RSA 키로 ID 토큰을 서명하고, 공개 인증서(kid → PEM)를 로컬 HTTP로 제공합니다.
+
+    issuer = FakeTokenIssuer(client_id="test-client")
+    issuer.start()                                  # http://127.0.0.1:<port>/certs
+    token = issuer.issue("user@example.com")
+    auth_manager.verify_id_token(token, "test-client", certs_url=issuer.certs_url)
+    issuer.stop()
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+
+
+class FakeTokenIssuer:
+    def __init__(self, client_id, issuer="https://accounts.google.com", key_id="fake-key-1", max_age=3600):
+        self.client_id = client_id
+        self.issuer = issuer
+        self.max_age = max_age
+        self.cert_requests = 0          # 인증서 요청 수 (캐시 확인용)
+        self._keys = {}                 # kid → PEM 개인키
+        self.key_id = None
+        self._server = None
+        self.rotate_key(key_id)
+
+    # --- 키 ---
+    def rotate_key(self, key_id):
+        """새 서명 키를 추가하고 이후 발급에 사용합니다. (이전 키도 인증서 목록에 유지)"""
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._keys[key_id] = key
+        self.key_id = key_id
+        return key_id
+
+    @property
+    def certs(self):
+        """{kid: 공개키 PEM} (Google certs 엔드포인트와 같은 형식)"""
+        return {
+            kid: key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode("ascii")
+            for kid, key in self._keys.items()
+        }
+
+    # --- 토큰 ---
+    def issue(self, email, lifetime=3600, now=None, **claims):
+        """ID 토큰을 발급합니다. claims로 aud/iss/email_verified 등을 덮어쓸 수 있습니다."""
+        now = int(now or time.time())
+        payload = {
+            "iss": self.issuer,
+            "aud": self.client_id,
+            "sub": str(abs(hash(email))),
+            "email": email,
+            "email_verified": True,
+            "iat": now,
+            "exp": now + lifetime,
+        }
+        payload.update(claims)
+        pem = self._keys[self.key_id].private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        signer = crypt.RSASigner.from_string(pem, key_id=self.key_id)
+        return jwt.encode(signer, payload).decode("ascii")
+
+    # --- 인증서 HTTP 서버 ---
+    @property
+    def certs_url(self):
+        if self._server is None:
+            raise RuntimeError("start()를 먼저 호출하세요.")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/certs"
+
+    def start(self, host="127.0.0.1", port=0):
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/certs":
+                    self.send_error(404)
+                    return
+                issuer.cert_requests += 1
+                body = json.dumps(issuer.certs).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={issuer.max_age}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,10 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from utils import runtime
+
+# 테스트는 Streamlit/secrets.toml 없이 헤드리스 백엔드로 실행
+runtime.use_headless(secrets={})
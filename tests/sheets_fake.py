@@ -0,0 +1,123 @@
+"""
+gspread 클라이언트를 흉내 내는 메모리 기반 가짜 구현 (테스트용)
+
+sheets_mirror 등 Google Sheets 연동 코드를 실제 API 없이 실행해 볼 수 있도록
+이 저장소에서 사용하는 메서드만 구현하고, 메서드별 API 호출 수를 기록합니다.
+
+    client = FakeClient()
+    mirror = SheetsMirror(lambda: client, "fake-id")
+    ...
+    client.open_by_key("fake-id").worksheet("재고_현황").get_all_values()
+"""
+import re
+import threading
+from collections import Counter
+
+import gspread
+from gspread.utils import a1_to_rowcol
+
+
+class FakeAPIError(Exception):
+    """가짜 API 오류 (fail_next로 주입)"""
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, sheet_id, title, rows=1000, cols=20):
+        self.spreadsheet = spreadsheet
+        self.spreadsheet_id = spreadsheet.id
+        self.id = sheet_id
+        self.title = title
+        self.row_count, self.col_count = int(rows), int(cols)
+        self.values = []
+
+    def _call(self, name):
+        self.spreadsheet.client._call(name)
+
+    def get_all_values(self):
+        self._call("get_all_values")
+        return [list(row) for row in self.values]
+
+    def col_values(self, col):
+        self._call("col_values")
+        return [row[col - 1] if col - 1 < len(row) else "" for row in self.values]
+
+    def append_row(self, row, **kwargs):
+        self._call("append_row")
+        self.values.append([str(v) for v in row])
+
+    def append_rows(self, rows, **kwargs):
+        self._call("append_rows")
+        self.values.extend([str(v) for v in row] for row in rows)
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update")
+        for item in data:
+            row, col = a1_to_rowcol(re.sub(r"^.*!", "", item["range"]))
+            while len(self.values) < row:
+                self.values.append([])
+            target = self.values[row - 1]
+            while len(target) < col:
+                target.append("")
+            target[col - 1] = str(item["values"][0][0])
+
+    def delete_rows(self, start, end=None):
+        self._call("delete_rows")
+        del self.values[start - 1:(end or start)]
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+        self._worksheets = {}
+        self._next_sheet_id = 1
+
+    def worksheet(self, title):
+        self.client._call("worksheet")
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.client._call("add_worksheet")
+        ws = FakeWorksheet(self, self._next_sheet_id, title, rows, cols)
+        self._next_sheet_id += 1
+        self._worksheets[title] = ws
+        return ws
+
+    def batch_update(self, body):
+        self.client._call("spreadsheet_batch_update")
+        by_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body.get("requests", []):
+            rng = request["deleteDimension"]["range"]
+            ws = by_id[rng["sheetId"]]
+            del ws.values[rng["startIndex"]:rng["endIndex"]]
+        return {}
+
+
+class FakeClient:
+    """gspread.Client 대체. calls에 메서드별 호출 수가 누적됩니다."""
+
+    def __init__(self):
+        self._spreadsheets = {}
+        self._lock = threading.Lock()
+        self._fail_remaining = 0
+        self.calls = Counter()
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+            if self._fail_remaining > 0:
+                self._fail_remaining -= 1
+                raise FakeAPIError(f"429 RESOURCE_EXHAUSTED (fake: {name})")
+
+    def fail_next(self, count=1):
+        """다음 count번의 API 호출을 실패시킵니다. (재시도/백오프 확인용)"""
+        with self._lock:
+            self._fail_remaining = count
+
+    def open_by_key(self, key):
+        self._call("open_by_key")
+        if key not in self._spreadsheets:
+            self._spreadsheets[key] = FakeSpreadsheet(self, key)
+        return self._spreadsheets[key]
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+from starlette.requests import Request
+
+try:
+    from starlette.testclient import TestClient
+except RuntimeError:  # httpx 미설치
+    TestClient = None
+
+import api_server
+from utils import runtime
+
+
+def _request(path="/health", authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization is not None else []
+    return Request({"type": "http", "method": "GET", "path": path, "headers": headers, "query_string": b""})
+
+
+def _call(handler, request):
+    response = asyncio.run(api_server._endpoint(handler)(request))
+    return response.status_code, json.loads(response.body)
+
+
+async def _ok(request):
+    return api_server._json({"status": "ok"})
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(api_server, "_api_token", lambda: "s3cret")
+    return "s3cret"
+
+
+def test_requests_are_rejected_without_configured_token(monkeypatch):
+    monkeypatch.setattr(runtime, "secrets", {})
+    assert api_server._api_token() is None
+    assert _call(_ok, _request())[0] == 401
+    assert _call(_ok, _request(authorization="Bearer "))[0] == 401
+
+
+def test_bearer_token_is_required(token):
+    assert _call(_ok, _request())[0] == 401
+    assert _call(_ok, _request(authorization="Bearer wrong"))[0] == 401
+    assert _call(_ok, _request(authorization=token))[0] == 401
+    assert _call(_ok, _request(authorization=f"Bearer {token}")) == (200, {"status": "ok"})
+
+
+def test_main_refuses_to_start_without_token(monkeypatch):
+    monkeypatch.setattr(api_server, "_api_token", lambda: None)
+    assert api_server.main([]) == 1
+
+
+def test_non_ascii_authorization_header_is_unauthorized(token):
+    request = Request({"type": "http", "method": "GET", "path": "/health", "query_string": b"",
+                       "headers": [(b"authorization", "Bearer 토큰".encode("utf-8"))]})
+    assert _call(_ok, request)[0] == 401
+
+
+# --- 엔드포인트 (db_manager 등 DB 경로는 대역으로 교체) -------------------------
+CATALOG = pd.DataFrame({"제품코드": ["EQ-0001"], "제품명": ["테스트 세럼"], "바코드": ["8800000000011"]})
+
+INBOUND_ITEM = {"product_code": "EQ-0001", "storage_location": "A-01-01", "category": "관리품",
+                "lot": "L2401A", "expiration_date": "2027-12-31", "version": "R0", "quantity": 2}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """DB/시트/보관위치 호출을 기록하는 대역"""
+    calls = {}
+
+    def record(name, result=None):
+        def stub(*args):
+            calls.setdefault(name, []).append(args)
+            return result(*args) if callable(result) else result
+        return stub
+
+    monkeypatch.setattr(api_server.db_manager, "load_product_data", lambda: CATALOG)
+    monkeypatch.setattr(api_server.db_manager, "find_products_by_codes", record("find_products_by_codes", ({}, [])))
+    monkeypatch.setattr(api_server.db_manager, "find_products_by_barcodes", record("find_products_by_barcodes", ({}, [])))
+    monkeypatch.setattr(api_server.location_manager, "get_location_options", lambda: ("A-01-01", "A-01-02"))
+    monkeypatch.setattr(api_server.serial_allocator, "allocate_serials", lambda n: list(range(5001, 5001 + n)))
+    monkeypatch.setattr(api_server.db_manager, "insert_inbound_batch", record("insert_inbound_batch", True))
+    monkeypatch.setattr(api_server.location_index, "record_inbound", record("record_inbound"))
+    monkeypatch.setattr(api_server.location_index, "record_outbound", record("record_outbound"))
+    monkeypatch.setattr(api_server.sheets_mirror, "mirror_inbound", record("mirror_inbound"))
+    monkeypatch.setattr(api_server.sheets_mirror, "mirror_outbound", record("mirror_outbound"))
+    return calls
+
+
+@pytest.fixture
+def http(token):
+    if TestClient is None:
+        pytest.skip("starlette.testclient에 필요한 httpx가 설치되지 않음")
+    return TestClient(api_server.app, headers={"Authorization": f"Bearer {token}"}, raise_server_exceptions=False)
+
+
+def test_inbound_writes_and_mirrors(http, calls):
+    response = http.post("/inbound", json={"items": [INBOUND_ITEM]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["serials"] == [5001, 5002]
+    assert [label["serial_number"] for label in body["labels"]] == [5001, 5002]
+
+    (inventory_rows, inout_rows), = calls["insert_inbound_batch"]
+    assert [row["storage_location"] for row in inventory_rows] == ["A-01-01", "A-01-01"]
+    assert calls["mirror_inbound"] == [(inventory_rows, inout_rows)]
+    assert calls["record_inbound"] == [(inventory_rows,)]
+
+
+def test_inbound_validation_errors(http, calls):
+    bad = dict(INBOUND_ITEM, storage_location="Z-09-09", quantity=1)
+    response = http.post("/inbound", json={"items": [INBOUND_ITEM, bad]})
+    assert response.status_code == 422
+    assert response.json()["items"] == [{"index": 1, "error": "등록되지 않은 보관위치"}]
+    assert "insert_inbound_batch" not in calls
+    assert "mirror_inbound" not in calls
+
+    assert http.post("/inbound", json={"items": []}).status_code == 400
+    assert http.post("/inbound", content=b"not json").status_code == 400
+
+
+def test_inbound_database_failure_is_not_mirrored(http, calls, monkeypatch):
+    monkeypatch.setattr(api_server.db_manager, "insert_inbound_batch", lambda *rows: False)
+    response = http.post("/inbound", json={"items": [INBOUND_ITEM]})
+    assert response.status_code == 503
+    assert "mirror_inbound" not in calls
+
+
+def test_outbound_mirrors_only_successful_rows(http, calls, monkeypatch):
+    shipped = {"timestamp": "2026-01-02 09:00:00", "type": "출고", "serial_number": "1001",
+               "product_code": "EQ-0001", "product_name": "테스트 세럼", "quantity": 1, "handler": "tester"}
+
+    def insert_outbound_batch(items, handler, timestamp):
+        assert handler == "tester"
+        return [
+            {"code": "1001", "ok": True, "reason": "", "storage_location": "A-01-01", "record": shipped},
+            {"code": "1002", "ok": False, "reason": "이미 출고된 일련번호"},
+        ]
+
+    monkeypatch.setattr(api_server.db_manager, "insert_outbound_batch", insert_outbound_batch)
+    response = http.post("/outbound", json={"handler": "tester", "codes": ["1001", "1002", "1001", "bad!"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 1
+    assert body["duplicates"] == ["1001"]
+    assert body["invalid"] == ["bad!"]
+    assert all("record" not in r for r in body["results"])
+    assert calls["mirror_outbound"] == [([shipped],)]
+
+
+def test_outbound_validation_errors(http, calls):
+    assert http.post("/outbound", json={"codes": ["1001"]}).status_code == 400
+    assert http.post("/outbound", json={"handler": "tester"}).status_code == 400
+
+
+def test_unexpected_error_returns_500(http, calls, monkeypatch):
+    def boom(*args):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(api_server.db_manager, "insert_outbound_batch", boom)
+    response = http.post("/outbound", json={"handler": "tester", "codes": ["1001"]})
+    assert response.status_code == 500
+    assert response.json() == {"error": "internal error"}
+
+
+def test_unauthorized_request_does_not_reach_handler(http, calls):
+    response = http.post("/inbound", json={"items": [INBOUND_ITEM]}, headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    assert "insert_inbound_batch" not in calls
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from auth_fake import FakeTokenIssuer
+from utils import auth_manager
+
+CLIENT_ID = "test-client"
+KEY = b"k" * 32
+
+
+@pytest.fixture
+def issuer():
+    issuer = FakeTokenIssuer(client_id=CLIENT_ID).start()
+    yield issuer
+    issuer.stop()
+
+
+def _verify(issuer, token, **kwargs):
+    return auth_manager.verify_id_token(token, CLIENT_ID, certs_url=issuer.certs_url, **kwargs)
+
+
+# --- ID 토큰 ---
+def test_valid_token_returns_claims(issuer):
+    claims = _verify(issuer, issuer.issue("user@example.com"))
+    assert claims["email"] == "user@example.com"
+    assert claims["aud"] == CLIENT_ID
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "other-client"},
+    {"iss": "https://evil.example.com"},
+    {"email_verified": False},
+])
+def test_rejects_wrong_claims(issuer, claims):
+    with pytest.raises(ValueError):
+        _verify(issuer, issuer.issue("user@example.com", **claims))
+
+
+def test_rejects_token_without_email(issuer):
+    with pytest.raises(ValueError):
+        _verify(issuer, issuer.issue(""))
+
+
+def test_rejects_expired_token(issuer):
+    token = issuer.issue("user@example.com", lifetime=60, now=time.time() - 3600)
+    with pytest.raises(ValueError):
+        _verify(issuer, token)
+
+
+@pytest.mark.parametrize("token", [None, "", "not-a-jwt", "a.b.c", 12345])
+def test_rejects_missing_or_malformed_token(issuer, token):
+    with pytest.raises(ValueError):
+        _verify(issuer, token)
+
+
+def test_rejects_forged_key_with_same_kid(issuer):
+    forger = FakeTokenIssuer(client_id=CLIENT_ID, key_id=issuer.key_id)
+    with pytest.raises(ValueError):
+        _verify(issuer, forger.issue("attacker@example.com"))
+
+
+def test_certs_are_cached_and_refetched_on_key_rotation(issuer):
+    _verify(issuer, issuer.issue("a@example.com"))
+    _verify(issuer, issuer.issue("b@example.com"))
+    assert issuer.cert_requests == 1
+
+    issuer.rotate_key("fake-key-2")
+    assert _verify(issuer, issuer.issue("c@example.com"))["email"] == "c@example.com"
+    assert issuer.cert_requests == 2
+    _verify(issuer, issuer.issue("d@example.com"))
+    assert issuer.cert_requests == 2
+
+
+# --- 세션 쿠키 ---
+def test_session_cookie_round_trip():
+    value = auth_manager.make_session_cookie("user@example.com", KEY, 3600)
+    assert auth_manager.read_session_cookie(value, KEY) == "user@example.com"
+    payload = auth_manager.decode_session_cookie(value, KEY)
+    assert payload["sid"] and payload["exp"] > time.time()
+
+
+def test_session_ids_are_unique():
+    first = auth_manager.decode_session_cookie(auth_manager.make_session_cookie("u@example.com", KEY, 60), KEY)
+    second = auth_manager.decode_session_cookie(auth_manager.make_session_cookie("u@example.com", KEY, 60), KEY)
+    assert first["sid"] != second["sid"]
+
+
+def test_session_cookie_expires():
+    value = auth_manager.make_session_cookie("user@example.com", KEY, 60, now=1000)
+    assert auth_manager.read_session_cookie(value, KEY, now=1059) == "user@example.com"
+    assert auth_manager.read_session_cookie(value, KEY, now=1061) is None
+
+
+def test_session_cookie_rejects_tampering():
+    value = auth_manager.make_session_cookie("user@example.com", KEY, 3600)
+    body, sig = value.split(".")
+    other = auth_manager.make_session_cookie("admin@example.com", KEY, 3600)
+    assert auth_manager.read_session_cookie(value, b"x" * 32) is None
+    assert auth_manager.read_session_cookie(other.split(".")[0] + "." + sig, KEY) is None
+    for bad in ("", "garbage", "a.b.c", value + "x", None, "한글.값"):
+        assert auth_manager.read_session_cookie(bad, KEY) is None
+
+
+def test_revoked_session_until_cookie_expiry():
+    revocations = auth_manager.SessionRevocations()
+    revocations.revoke("sid-1", expires=2000)
+    assert revocations.is_revoked("sid-1", now=1500)
+    assert not revocations.is_revoked("sid-2", now=1500)
+    assert not revocations.is_revoked("sid-1", now=2001)  # 쿠키가 이미 만료되어 목록에서 정리
+
+
+class _Store:
+    """다른 워커/재시작 전 프로세스가 기록한 폐기 목록 (db_manager 대신)"""
+
+    def __init__(self, revoked=(), available=True):
+        self.revoked = dict.fromkeys(revoked, 2000)
+        self.available = available
+
+    def revoke_session(self, session_id, expires):
+        self.revoked[session_id] = expires
+        return True
+
+    def is_session_revoked(self, session_id, now=None):
+        if not self.available:
+            return None
+        return session_id in self.revoked and self.revoked[session_id] >= now
+
+
+def test_revocation_is_written_to_store():
+    store = _Store()
+    auth_manager.SessionRevocations(store=store).revoke("sid-1", expires=2000)
+    assert store.revoked == {"sid-1": 2000}
+
+
+def test_revocation_from_other_process_is_honoured():
+    revocations = auth_manager.SessionRevocations(store=_Store(revoked=["sid-1"]))
+    assert revocations.is_revoked("sid-1", now=1500)
+    assert not revocations.is_revoked("sid-2", now=1500)
+
+
+def test_store_failure_falls_back_to_memory():
+    revocations = auth_manager.SessionRevocations(store=_Store(revoked=["sid-1"], available=False))
+    revocations.revoke("sid-2", expires=2000)
+    assert revocations.is_revoked("sid-2", now=1500)
+    assert not revocations.is_revoked("sid-1", now=1500)
+
+
+def test_session_lifetime_config():
+    assert auth_manager._session_max_age({}) == auth_manager.SESSION_DEFAULT_HOURS * 3600
+    assert auth_manager._session_max_age({"session_hours": 2}) == 7200
+    assert auth_manager._session_max_age({"session_days": 1}) == 86400
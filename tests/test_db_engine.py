@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from utils import db_engine
+
+
+def _engine(creator, **pool):
+    return create_engine("sqlite://", creator=creator, poolclass=db_engine.TimedQueuePool, **pool)
+
+
+def test_pool_exhaustion_counts_as_timeout():
+    engine = _engine(lambda: sqlite3.connect(":memory:", check_same_thread=False),
+                     pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+    try:
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    finally:
+        held.close()
+    status = db_engine.pool_status(engine)
+    assert status["timeouts"] == 1
+    assert status["connect_errors"] == 0
+    assert status["checkouts"] == 2
+
+
+def test_connect_failure_is_not_a_timeout():
+    def refuse():
+        raise sqlite3.OperationalError("connection refused")
+
+    engine = _engine(refuse, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with pytest.raises(exc.OperationalError):
+        engine.connect()
+    status = db_engine.pool_status(engine)
+    assert status["timeouts"] == 0
+    assert status["connect_errors"] == 1
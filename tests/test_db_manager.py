@@ -0,0 +1,169 @@
+import contextlib
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from utils import db_manager
+
+
+@pytest.fixture
+def erp(monkeypatch):
+    """MySQL 기본(_ci) collation처럼 대소문자를 구분하지 않는 sqlite ERP 테이블"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE boosters_items (
+                resource_code TEXT COLLATE NOCASE, resource_name TEXT, barcode TEXT COLLATE NOCASE,
+                is_delete INTEGER, brand_name TEXT
+            )
+        """))
+        conn.execute(text("""
+            INSERT INTO boosters_items VALUES
+                ('EQ-0001', '이퀄베리 세럼', 'ABC123', 0, '이퀄베리'),
+                ('XX-0001', '타 브랜드', '880001', 0, '기타'),
+                ('EQ-0002', '삭제된 제품', '880002', 1, '이퀄베리')
+        """))
+    monkeypatch.setattr(db_manager, "connect_to_erp_read", lambda: engine)
+    return engine
+
+
+def test_barcodes_are_keyed_by_caller_values(erp):
+    found, missing = db_manager.find_products_by_barcodes(["abc123", " ABC123 ", "880001", "880002", None, ""])
+    assert list(found) == ["abc123", " ABC123 ", "880001"]
+    assert found["abc123"]["resource_code"] == "EQ-0001"
+    assert missing == ["880002"]
+
+
+def test_codes_are_case_insensitive_and_brand_filtered(erp):
+    found, missing = db_manager.find_products_by_codes(["eq-0001", "XX-0001"])
+    assert found == {"eq-0001": {"resource_code": "EQ-0001", "resource_name": "이퀄베리 세럼", "barcode": "ABC123"}}
+    assert missing == ["XX-0001"]
+
+
+def test_chunked_lookup(erp):
+    found, missing = db_manager._find_products_by("barcode", ["x"] * 3 + ["abc123"] + ["y", "z"], chunk_size=2)
+    assert list(found) == ["abc123"]
+    assert missing == ["x", "y", "z"]
+
+
+class _Result:
+    def __init__(self, scalar=None):
+        self._scalar = scalar
+
+    def scalar(self):
+        return self._scalar
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
+class _RecordingEngine:
+    """실행된 SQL만 기록하는 MySQL 대역 (information_schema 조회 결과는 table_exists로 지정)"""
+
+    def __init__(self, table_exists):
+        self.table_exists = table_exists
+        self.statements = []
+
+    @contextlib.contextmanager
+    def connect(self):
+        yield self
+
+    begin = connect
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        if statement is db_manager.CREATE_STOCK_SUMMARY_SQL:
+            self.table_exists = True
+        if statement is db_manager._STOCK_TABLE_EXISTS_SQL:
+            return _Result(1 if self.table_exists else 0)
+        return _Result()
+
+
+@pytest.fixture
+def scm(monkeypatch):
+    engine = _RecordingEngine(table_exists=False)
+    monkeypatch.setattr(db_manager, "_stock_table_ready", False)
+    monkeypatch.setattr(db_manager, "connect_to_scm", lambda: engine)
+    monkeypatch.setattr(db_manager, "connect_to_scm_read", lambda: engine)
+    return engine
+
+
+INOUT_ROW = {"timestamp": "2026-01-02 09:00:00", "type": "입고", "serial_number": "N/A",
+             "product_code": "EQ-0001", "product_name": "테스트 세럼", "quantity": 3, "handler": "tester"}
+
+
+def test_first_write_creates_and_backfills_stock_summary(scm):
+    assert db_manager.insert_inout_record(INOUT_ROW)
+    statements = scm.statements
+    create = statements.index(db_manager.CREATE_STOCK_SUMMARY_SQL)
+    rebuild = statements.index(db_manager.REBUILD_STOCK_SQL)
+    insert = statements.index(db_manager.INSERT_INOUT_SQL)
+    # 생성 → 이력 백필 → 이번 쓰기 순서 (백필이 쓰기보다 먼저라 이번 증감은 한 번만 반영)
+    assert create < rebuild < insert
+    assert statements.count(db_manager.REBUILD_STOCK_SQL) == 1
+
+    # 이후 조회/쓰기에서는 다시 확인하거나 백필하지 않음
+    scm.statements.clear()
+    assert db_manager._ensure_stock_summary_ready()
+    assert db_manager.insert_inout_record(INOUT_ROW)
+    assert db_manager._STOCK_TABLE_EXISTS_SQL not in scm.statements
+    assert db_manager.REBUILD_STOCK_SQL not in scm.statements
+
+
+def test_existing_stock_summary_is_not_rebuilt(scm):
+    scm.table_exists = True
+    assert db_manager.insert_inout_record(INOUT_ROW)
+    assert db_manager.CREATE_STOCK_SUMMARY_SQL not in scm.statements
+    assert db_manager.REBUILD_STOCK_SQL not in scm.statements
+
+
+def test_rebuild_on_new_table_backfills_once(scm):
+    assert db_manager.rebuild_stock_summary()
+    assert scm.statements.count(db_manager.REBUILD_STOCK_SQL) == 1
+    assert db_manager.rebuild_stock_summary()
+    assert scm.statements.count(db_manager.REBUILD_STOCK_SQL) == 2
+
+
+def test_dashboard_summary_reads_count_and_latest_rows(monkeypatch):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE Retained_sample_in_out (
+                id INTEGER PRIMARY KEY, `timestamp` TEXT, `type` TEXT, serial_number TEXT,
+                product_code TEXT, product_name TEXT, quantity INTEGER, handler TEXT
+            )
+        """))
+        conn.execute(text("CREATE TABLE Retained_sample_status (serial_number TEXT PRIMARY KEY)"))
+        for n in range(1, 26):
+            conn.execute(text("INSERT INTO Retained_sample_in_out VALUES (:n, '2026-01-02', '입고', :s, 'EQ', 'x', 1, '')"),
+                         {"n": n, "s": str(n)})
+            conn.execute(text("INSERT INTO Retained_sample_status VALUES (:s)"), {"s": str(n)})
+    monkeypatch.setattr(db_manager, "connect_to_scm_read", lambda: engine)
+
+    assert db_manager.count_inventory.__wrapped__() == 25
+    recent = db_manager.load_recent_inout.__wrapped__(10)
+    assert recent["id"].tolist() == list(range(25, 15, -1))
+
+
+def test_session_revocations_are_shared_through_scm(monkeypatch):
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(db_manager, "_revocation_table_ready", False)
+    monkeypatch.setattr(db_manager, "connect_to_scm", lambda: engine)
+
+    assert db_manager.is_session_revoked("sid-1", now=1000) is False  # 테이블이 없으면 만들어서 조회
+    assert db_manager.revoke_session("sid-1", 2000, now=1000)
+    assert db_manager.revoke_session("sid-1", 2000, now=1000)  # 같은 세션을 다시 폐기해도 성공
+    assert db_manager.is_session_revoked("sid-1", now=1500) is True
+    assert db_manager.is_session_revoked("sid-1", now=2001) is False
+
+    # 다음 폐기 시 만료된 항목은 정리
+    assert db_manager.revoke_session("sid-2", 5000, now=3000)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT session_id FROM {db_manager.SESSION_REVOCATION_TABLE}")).scalars().all()
+    assert rows == ["sid-2"]
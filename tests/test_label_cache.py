@@ -0,0 +1,68 @@
+import os
+import logging
+
+from utils.label_cache import LabelCache, make_label_key
+
+LABEL_ARGS = ("1700000001", "EQ-0001", "테스트 세럼", "L2401A", "2027-12-31", "R0", "A-01-01", "관리품")
+
+
+def _disk_files(cache):
+    return sorted(os.path.basename(e[2]).split(".")[0] for e in cache._scan_disk())
+
+
+def _age(cache, key, fmt, seconds_ago):
+    path = cache._path(key, fmt)
+    mtime = os.path.getmtime(path) - seconds_ago
+    os.utime(path, (mtime, mtime))
+
+
+def test_disk_tier_round_trip(tmp_path):
+    cache = LabelCache(cache_dir=str(tmp_path))
+    key = make_label_key(LABEL_ARGS, "zpl")
+    cache.put(key, "zpl", b"^XA^XZ")
+
+    # 새 프로세스(빈 메모리)에서도 디스크에서 읽음
+    fresh = LabelCache(cache_dir=str(tmp_path))
+    assert fresh.get(key, "zpl") == b"^XA^XZ"
+    assert fresh.stats["disk_hits"] == 1
+    assert fresh.get(key, "zpl") == b"^XA^XZ"
+    assert fresh.stats["memory_hits"] == 1
+
+
+def test_disk_tier_prunes_oldest_files_by_count(tmp_path):
+    cache = LabelCache(cache_dir=str(tmp_path), max_disk_files=10)
+    keys = [f"{n:02d}" + "0" * 62 for n in range(10)]
+    for age, key in enumerate(keys):
+        cache.put(key, "zpl", b"x" * 10)
+        _age(cache, key, "zpl", 1000 - age)  # 앞쪽 키일수록 오래됨
+    assert cache.stats["disk_evictions"] == 0
+
+    cache.put("ff" + "0" * 62, "zpl", b"x" * 10)  # 11번째 → 9개(90%)까지 정리
+    assert len(_disk_files(cache)) == 9
+    assert keys[0] not in _disk_files(cache) and keys[1] not in _disk_files(cache)
+    assert cache.stats["disk_evictions"] == 2
+
+
+def test_disk_tier_prunes_by_bytes_and_keeps_recently_read(tmp_path):
+    cache = LabelCache(cache_dir=str(tmp_path), max_disk_bytes=1000)
+    old, recent = "aa" + "0" * 62, "bb" + "0" * 62
+    cache.put(old, "png", b"x" * 400)
+    cache.put(recent, "png", b"x" * 400)
+    _age(cache, old, "png", 100)
+    _age(cache, recent, "png", 200)
+
+    # 오래전에 저장했어도 방금 읽은 파일은 최근 사용으로 취급
+    LabelCache(cache_dir=str(tmp_path)).get(recent, "png")
+    cache.put("cc" + "0" * 62, "png", b"x" * 400)
+    assert _disk_files(cache) == sorted([recent, "cc" + "0" * 62])
+    assert cache._disk_usage == (2, 800)
+
+
+def test_disk_write_failure_is_logged(tmp_path, caplog):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = LabelCache(cache_dir=str(blocker))
+    with caplog.at_level(logging.WARNING, logger="barcode_label"):
+        cache.put("aa" + "0" * 62, "zpl", b"data")
+    assert "라벨 디스크 캐시 저장 실패" in caplog.text
+    assert cache.get("aa" + "0" * 62, "zpl") == b"data"  # 메모리 캐시는 유지
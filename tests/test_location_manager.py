@@ -0,0 +1,56 @@
+import pytest
+
+from utils import location_manager as lm
+
+
+@pytest.fixture(autouse=True)
+def config_file(tmp_path, monkeypatch):
+    """테스트마다 임시 디렉터리의 zone_config.json을 사용"""
+    monkeypatch.setattr(lm, "CONFIG_FILE", str(tmp_path / "zone_config.json"))
+    monkeypatch.setitem(lm._cache, "stamp", None)
+    monkeypatch.setitem(lm._options_cache, "version", None)
+    monkeypatch.setitem(lm._options_cache, "options", ())
+    return tmp_path / "zone_config.json"
+
+
+@pytest.mark.parametrize("location, expected", [
+    ("A-01-01", True),
+    ("B-05-03", True),
+    ("A-06-01", False),   # 행 범위 밖
+    ("C-01-01", False),   # 없는 구역
+    ("A-1-1", False),     # 0이 채워지지 않은 형식
+    ("A-001-01", False),
+    (" A-01-01", False),
+    ("A01-01", False),
+])
+def test_is_valid_location(location, expected):
+    assert lm.is_valid_location(lm.get_default_config(), location) is expected
+
+
+def test_unpadded_location_is_reported_outside_grid():
+    config = lm.get_default_config()
+    counts = {"A-01-01": 2, "A-1-1": 3}
+    grid = lm.occupancy_grid(config, counts)
+    orphans = {loc: n for loc, n in counts.items() if not lm.is_valid_location(config, loc)}
+    # 모든 재고가 히트맵 또는 미등록 위치 중 한 곳에는 나타남
+    assert grid["재고"].sum() + sum(orphans.values()) == 5
+    assert orphans == {"A-1-1": 3}
+
+
+def test_location_options_follow_config():
+    options = lm.get_location_options()
+    assert options[:3] == ("A-01-01", "A-01-02", "A-01-03")
+    assert len(options) == 30
+
+
+def test_location_options_survive_corrupt_config(config_file):
+    config_file.write_text("{broken", encoding="utf-8")
+    # 읽은 적이 없으면 기본 설정 목록
+    assert lm.get_location_options() == lm._location_options(lm._zone_specs(lm.get_default_config()))
+
+    config_file.write_text('{"zones": {"C": {"name": "C 구역", "rows": 1, "columns": 2}}}', encoding="utf-8")
+    assert lm.get_location_options() == ("C-01-01", "C-01-02")
+
+    config_file.write_text("{broken again", encoding="utf-8")
+    # 마지막으로 읽은 목록 유지
+    assert lm.get_location_options() == ("C-01-01", "C-01-02")
@@ -0,0 +1,78 @@
+import socketserver
+import threading
+
+import pytest
+
+from utils import printer_manager
+
+LABEL_ARGS = ("1700000001", "EQ-0001", "테스트 세럼", "L2401A", "2027-12-31", "R0", "A-01-01", "관리품")
+
+
+class _RecordingHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        chunks = []
+        while True:
+            data = self.request.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+        self.server.received.append(b"".join(chunks))
+
+
+@pytest.fixture
+def printer():
+    """9100 포트 프린터 대신 수신한 바이트를 기록하는 로컬 TCP 서버"""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RecordingHandler)
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _config(server, language="zpl"):
+    host, port = server.server_address
+    return {"host": host, "port": port, "language": language, "dpmm": 8, "timeout": 5.0}
+
+
+def _wait_received(server, count=1):
+    for _ in range(100):
+        if len(server.received) >= count:
+            return server.received
+        threading.Event().wait(0.02)
+    raise AssertionError("프린터 서버가 데이터를 받지 못했습니다.")
+
+
+def test_send_raw_delivers_all_bytes(printer):
+    host, port = printer.server_address
+    payload = "^XA^FDhello^FS^XZ" * 1000
+
+    sent = printer_manager.send_raw(payload, host, port)
+
+    assert sent == len(payload.encode("utf-8"))
+    assert _wait_received(printer) == [payload.encode("utf-8")]
+
+
+@pytest.mark.parametrize("language", ["zpl", "tspl"])
+def test_print_label_sends_built_payload(printer, language):
+    config = _config(printer, language)
+
+    assert printer_manager.print_label(LABEL_ARGS, copies=2, config=config) is True
+
+    expected = printer_manager.build_label_payload(LABEL_ARGS, language, 8, copies=2).encode("utf-8")
+    assert _wait_received(printer) == [expected]
+
+
+def test_print_label_reports_connection_failure(printer):
+    config = _config(printer)
+    printer.shutdown()
+    printer.server_close()
+
+    assert printer_manager.print_label(LABEL_ARGS, config=config) is False
+
+
+def test_build_label_payload_rejects_unknown_language():
+    with pytest.raises(ValueError):
+        printer_manager.build_label_payload(LABEL_ARGS, "epl")
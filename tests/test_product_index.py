@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from utils.product_index import ProductIndex
+
+CATALOG = pd.DataFrame({"제품코드": ["EQ-0001"], "제품명": ["테스트 세럼"], "바코드": ["8800000000011"]})
+EXTRA = {"8800000000099": {"resource_code": "XX-0001", "resource_name": "타 브랜드", "barcode": "8800000000099"}}
+
+
+class FlakyErp:
+    """down=True인 동안은 DB 오류(None)를 반환하는 일괄 조회 대역"""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    def bulk(self, keys):
+        self.calls += 1
+        if self.down:
+            return None
+        found = {k: EXTRA[k] for k in keys if k in EXTRA}
+        return found, [k for k in keys if k not in found]
+
+    def single(self, key):
+        self.calls += 1
+        if self.down:
+            raise RuntimeError("ERP down")
+        return EXTRA.get(key)
+
+
+@pytest.fixture
+def erp():
+    return FlakyErp()
+
+
+@pytest.fixture(params=["bulk", "single"])
+def index(request, erp):
+    bulk = erp.bulk if request.param == "bulk" else None
+    return ProductIndex(CATALOG, lambda: CATALOG, erp.single, bulk, ttl=3600, negative_ttl=300)
+
+
+def test_catalog_hit_needs_no_db(index, erp):
+    assert index.lookup(" 8800000000011 ") == {"resource_code": "EQ-0001", "resource_name": "테스트 세럼"}
+    assert erp.calls == 0
+
+
+def test_real_miss_is_negative_cached(index, erp):
+    assert index.lookup("8800000000000") is None
+    assert index.lookup("8800000000000") is None
+    assert erp.calls == 1
+    assert index.stats["negative_hits"] == 1
+
+
+def test_db_error_is_not_negative_cached(index, erp):
+    erp.down = True
+    assert index.lookup("8800000000099") is None
+    erp.down = False
+    # 장애가 끝나면 바로 다시 조회해 실제 제품을 찾음
+    assert index.lookup("8800000000099") == {"resource_code": "XX-0001", "resource_name": "타 브랜드"}
+    assert index.stats["negative_hits"] == 0
+
+
+def test_lookup_many_db_error_is_not_negative_cached(index, erp):
+    erp.down = True
+    assert index.lookup_many(["8800000000099"]) == {"8800000000099": None}
+    erp.down = False
+    assert index.lookup_many(["8800000000099"])["8800000000099"]["resource_code"] == "XX-0001"
+
+
+def test_negative_cache_is_bounded(erp):
+    index = ProductIndex(CATALOG, lambda: CATALOG, erp.single, erp.bulk, negative_max=3)
+    for n in range(10):
+        index.lookup(f"77{n}")
+    assert list(index._negative) == ["777", "778", "779"]
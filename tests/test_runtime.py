@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from utils import runtime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lazy_import_defers_loading(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    colorsys = runtime.lazy_import("colorsys")
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert "colorsys" in sys.modules
+
+
+def test_lazy_import_returns_loaded_module():
+    assert runtime.lazy_import("json") is sys.modules["json"]
+
+
+def test_lazy_import_unknown_module():
+    with pytest.raises(ModuleNotFoundError):
+        runtime.lazy_import("no_such_module_for_test")
+
+
+def test_lazy_import_first_access_from_many_threads():
+    # 새 인터프리터에서 pandas를 처음 로드하는 순간에 16개 스레드가 동시에 접근
+    script = textwrap.dedent("""
+        import threading
+        from utils import runtime
+
+        pd = runtime.lazy_import("pandas")
+        barrier = threading.Barrier(16)
+        errors = []
+
+        def worker():
+            barrier.wait()
+            try:
+                pd.DataFrame({"a": [1]})
+            except Exception as e:
+                errors.append(repr(e))
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,145 @@
+import pytest
+
+from sheets_fake import FakeClient
+from utils import sheets_mirror
+from utils.sheets_mirror import SheetsMirror, INVENTORY_SHEET, INOUT_SHEET
+
+
+def _inventory_row(serial):
+    return {
+        "serial_number": serial, "category": "관리품", "product_code": "EQ-0001", "product_name": "테스트 세럼",
+        "lot": "L2401A", "expiration_date": "2027-12-31", "disposal_date": "2028-12-31",
+        "storage_location": "A-01-01", "version": "R0", "received_at": "2026-01-02 09:00:00",
+    }
+
+
+def _inout_row(serial, type_="입고"):
+    return {"timestamp": "2026-01-02 09:00:00", "type": type_, "serial_number": serial,
+            "product_code": "EQ-0001", "product_name": "테스트 세럼", "quantity": 1, "handler": "tester"}
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def mirror(client, sleeps):
+    return SheetsMirror(lambda: client, "fake-id", flush_interval=0.0, max_retries=3,
+                        backoff_base=1.0, sleep=sleeps.append)
+
+
+def _values(client, sheet):
+    return client.open_by_key("fake-id").worksheet(sheet).get_all_values()
+
+
+def _drain_all(mirror):
+    """백그라운드 스레드 없이 대기열을 비울 때까지 반영합니다."""
+    while not mirror._queue.empty():
+        batch = [mirror._queue.get_nowait() for _ in range(mirror._queue.qsize())]
+        mirror._apply_with_retry(batch)
+        for _ in batch:
+            mirror._queue.task_done()
+
+
+def test_coalesces_batch_into_one_call_per_sheet(mirror, client):
+    mirror.enqueue_inventory([_inventory_row(s) for s in (101, 102, 103)])
+    mirror.enqueue_inout([_inout_row(s) for s in (101, 102, 103)])
+    mirror.enqueue_shipped(101, "2026-01-03 10:00:00", "a")
+    mirror.enqueue_shipped(101, "2026-01-03 11:00:00", "b")  # 같은 S/N은 마지막 값으로 합침
+    _drain_all(mirror)
+
+    assert client.calls["append_rows"] == 2
+    assert client.calls["batch_update"] == 1
+    assert client.calls["get_all_values"] == 1
+    assert mirror.stats["api_batches"] == 3
+    inventory = _values(client, INVENTORY_SHEET)
+    assert [row[0] for row in inventory[1:]] == ["101", "102", "103"]
+    assert inventory[1][10:] == ["출고됨", "2026-01-03 11:00:00", "b"]
+    assert len(_values(client, INOUT_SHEET)) == 4
+
+
+def test_retries_with_exponential_backoff(mirror, client, sleeps):
+    mirror.enqueue_inout([_inout_row(1)])
+    client.fail_next(2)
+    _drain_all(mirror)
+
+    assert mirror.stats["retries"] == 2
+    assert [int(delay) for delay in sleeps] == [1, 2]
+    assert all(delay <= base * 1.1 for delay, base in zip(sleeps, (1, 2)))
+    assert len(_values(client, INOUT_SHEET)) == 2
+    assert mirror.dead_letters == []
+
+
+def test_dead_letters_after_max_retries(mirror, client, sleeps):
+    mirror.enqueue_inventory([_inventory_row(7)])
+    client.fail_next(100)
+    _drain_all(mirror)
+
+    assert len(sleeps) == mirror.max_retries
+    assert mirror.stats["failed_events"] == 1
+    assert mirror.dead_letters[0][:2] == ("append", INVENTORY_SHEET)
+    assert mirror.dead_letters[0][2][0] == "7"
+    # dead letter가 된 append는 더 이상 반영 대기 중으로 보지 않음
+    assert not mirror._append_pending("7")
+
+
+def test_not_found_without_pending_append_is_dropped_at_once(mirror, client, sleeps):
+    mirror.enqueue_inventory([_inventory_row(1)])
+    _drain_all(mirror)
+    client.calls.clear()
+
+    mirror.enqueue_shipped(999, "2026-01-03 10:00:00", "a")  # 미러 도입 전 입고분 등
+    _drain_all(mirror)
+
+    assert sleeps == []
+    assert client.calls["get_all_values"] == 1
+    assert client.calls["batch_update"] == 0
+    assert mirror.stats["dropped_not_found"] == 1
+    assert mirror.stats["retries"] == 0
+    assert mirror.dead_letters == []
+
+
+def test_not_found_waits_for_pending_append(mirror, client, sleeps):
+    mirror.enqueue_inout([_inout_row(5)])
+    _drain_all(mirror)
+    # 출고 상태 update가 같은 S/N의 재고 append보다 먼저 반영되는 경우
+    mirror.enqueue_shipped(5, "2026-01-03 10:00:00", "a")
+    batch = [mirror._queue.get_nowait()]
+    mirror.enqueue_inventory([_inventory_row(5)])
+    with mirror._pending_lock:
+        assert mirror._pending_appends["5"] == 1
+    mirror._apply_with_retry(batch)
+    mirror._queue.task_done()
+
+    assert mirror.stats["deferred_updates"] == 1
+    assert sleeps == []
+    _drain_all(mirror)
+
+    inventory = _values(client, INVENTORY_SHEET)
+    assert inventory[1][0] == "5"
+    assert inventory[1][10] == "출고됨"
+    assert mirror.stats["dropped_not_found"] == 0
+    assert not mirror._append_pending("5")
+
+
+def test_background_worker_flushes(client):
+    mirror = SheetsMirror(lambda: client, "fake-id", flush_interval=0.05).start()
+    try:
+        mirror.enqueue_inventory([_inventory_row(s) for s in range(10)])
+        assert mirror.flush(timeout=5)
+    finally:
+        mirror.stop()
+    assert len(_values(client, INVENTORY_SHEET)) == 11
+    assert mirror.pending() == 0
+
+
+def test_mirror_helpers_are_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(sheets_mirror, "get_sheets_mirror", lambda: None)
+    sheets_mirror.mirror_inbound([_inventory_row(1)], [_inout_row(1)])
+    sheets_mirror.mirror_outbound([_inout_row(1, "출고")])
@@ -1,13 +1,45 @@
 # utils/auth_manager.py (새로 생성)
+import json
+import time
+import hmac
+import base64
+import hashlib
+import secrets
+import threading
+import urllib.request
+
 import streamlit as st
-import google_auth_oauthlib.flow
-from googleapiclient.discovery import build
+
+from utils import runtime
+# google_auth_oauthlib / google.auth는 로그인 처리 시에만 import (로그인된 세션의 페이지 로드 시간 단축)
 
 # --- 설정 ---
 SCOPES = ['openid', 'https://www.googleapis.com/auth/userinfo.email', 'https://www.googleapis.com/auth/userinfo.profile']
 
+# ID 토큰 서명 검증용 Google 공개 인증서 (kid → PEM). [google_auth] certs_url 로 변경 가능
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+CERTS_DEFAULT_MAX_AGE = 3600
+CLOCK_SKEW_SECONDS = 10
+
+# 로그인 세션 쿠키: 새로고침/새 세션에서 OAuth 왕복 없이 로그인 상태 복원
+# 한계:
+#  - Streamlit 스크립트는 응답 헤더를 설정할 수 없어 쿠키를 iframe 스크립트(document.cookie)로 씁니다.
+#    따라서 HttpOnly가 될 수 없고, 페이지에 XSS가 있으면 쿠키를 읽어 만료 전까지 재사용할 수 있습니다.
+#    이 위험을 줄이기 위해 수명을 근무 시간 정도로 짧게 둡니다.
+#  - 로그아웃한 세션 id는 SCM DB(auth_session_revocations)에 저장하여 다른 워커/재시작 후에도 거부합니다.
+#    DB 조회가 실패하면 이 프로세스의 메모리 목록만 확인하므로, 그동안 다른 워커에서는 남은 수명까지 유효할 수 있습니다.
+# ([google_auth] session_hours 로 변경, cookie_secret 을 바꾸면 모든 쿠키가 즉시 무효)
+SESSION_COOKIE = "barcode_label_session"
+SESSION_DEFAULT_HOURS = 8
+
+
+def _auth_config():
+    return st.secrets["google_auth"]
+
 def get_flow():
     """OAuth Flow 객체를 생성하여 반환합니다."""
+    import google_auth_oauthlib.flow
     # st.secrets에서 설정 로드
     client_config = {
         "web": {
@@ -24,6 +56,186 @@ def get_flow():
     flow.redirect_uri = st.secrets["google_auth"]["redirect_uri"]
     return flow
 
+
+# --- ID 토큰 로컬 검증 ---
+class GoogleCerts:
+    """
+    Google 공개 인증서를 Cache-Control max-age 동안 메모리에 보관합니다.
+    토큰의 kid가 캐시에 없으면(키 교체 직후) 한 번 다시 받아옵니다.
+    """
+
+    def __init__(self, url=GOOGLE_CERTS_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self._certs = {}
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as resp:
+            certs = json.loads(resp.read().decode("utf-8"))
+            max_age = CERTS_DEFAULT_MAX_AGE
+            for part in (resp.headers.get("Cache-Control") or "").split(","):
+                name, _, value = part.strip().partition("=")
+                if name == "max-age" and value.isdigit():
+                    max_age = int(value)
+        self._certs = certs
+        self._expires = time.monotonic() + max_age
+
+    def get(self, key_id=None):
+        """{kid: PEM} 를 반환합니다."""
+        with self._lock:
+            if time.monotonic() >= self._expires or (key_id and key_id not in self._certs):
+                self._fetch()
+            return self._certs
+
+@runtime.cache_resource
+def get_google_certs(url=GOOGLE_CERTS_URL):
+    """URL별 GoogleCerts 싱글톤 (모든 세션이 공유)"""
+    return GoogleCerts(url)
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def verify_id_token(id_token, client_id, certs_url=GOOGLE_CERTS_URL, issuers=GOOGLE_ISSUERS):
+    """
+    ID 토큰의 서명/만료/audience/issuer를 네트워크 호출 없이(인증서 캐시 사용) 검증하고 클레임을 반환합니다.
+    검증에 실패하면 ValueError를 발생시킵니다.
+    """
+    from google.auth import jwt
+
+    if not id_token or not isinstance(id_token, str):
+        raise ValueError("ID 토큰이 없습니다. (OAuth 응답에 id_token이 포함되지 않음)")
+    try:
+        header = json.loads(_b64decode(id_token.split(".")[0]))
+    except (ValueError, IndexError):
+        raise ValueError("ID 토큰 형식이 올바르지 않습니다.")
+    certs = get_google_certs(certs_url).get(header.get("kid"))
+    claims = jwt.decode(id_token, certs=certs, audience=client_id, clock_skew_in_seconds=CLOCK_SKEW_SECONDS)
+
+    if claims.get("iss") not in issuers:
+        raise ValueError(f"허용되지 않은 토큰 발급자입니다: {claims.get('iss')}")
+    if not claims.get("email") or claims.get("email_verified") is False:
+        raise ValueError("확인된 이메일이 없는 계정입니다.")
+    return claims
+
+
+# --- 세션 쿠키 ---
+def _cookie_key(config):
+    # cookie_secret이 없으면 client_secret에서 파생 (client_secret을 바꾸면 기존 쿠키는 모두 무효)
+    secret = config.get("cookie_secret") or ("session:" + config["client_secret"])
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+def _session_max_age(config):
+    if "session_days" in config:  # 이전 설정 호환
+        return int(float(config["session_days"]) * 86400)
+    return int(float(config.get("session_hours", SESSION_DEFAULT_HOURS)) * 3600)
+
+def make_session_cookie(email, key, max_age, now=None, session_id=None):
+    """'<payload>.<HMAC-SHA256>' 형식의 서명된 쿠키 값을 만듭니다. (payload: email, sid, exp)"""
+    payload = {
+        "email": email,
+        "sid": session_id or secrets.token_urlsafe(16),
+        "exp": int((now or time.time()) + max_age),
+    }
+    body = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).rstrip(b"=")
+    sig = base64.urlsafe_b64encode(hmac.new(key, body, hashlib.sha256).digest()).rstrip(b"=")
+    return (body + b"." + sig).decode("ascii")
+
+def decode_session_cookie(value, key, now=None):
+    """서명과 만료를 확인하고 payload(dict)를 반환합니다. 유효하지 않으면 None."""
+    try:
+        body, sig = value.encode("ascii").split(b".")
+        expected = base64.urlsafe_b64encode(hmac.new(key, body, hashlib.sha256).digest()).rstrip(b"=")
+        if not hmac.compare_digest(sig, expected):
+            return None
+        payload = json.loads(_b64decode(body.decode("ascii")))
+        if payload["exp"] < (now or time.time()) or not payload["email"]:
+            return None
+        return payload
+    except (ValueError, UnicodeError, KeyError, TypeError, AttributeError):
+        return None
+
+def read_session_cookie(value, key, now=None):
+    """서명과 만료를 확인하고 이메일을 반환합니다. 유효하지 않으면 None."""
+    payload = decode_session_cookie(value, key, now)
+    return payload["email"] if payload else None
+
+
+class SessionRevocations:
+    """
+    로그아웃한 세션 id → 쿠키 만료 시각
+    store(revoke_session / is_session_revoked 제공, 예: db_manager)가 있으면 함께 기록/조회하여
+    다른 워커와 재시작 후에도 폐기가 유지됩니다. 메모리 목록은 store 장애 시에도 이 프로세스에서는 거부하기 위함입니다.
+    만료 시각이 지난 항목은 쿠키 자체가 무효이므로 정리합니다.
+    """
+
+    def __init__(self, store=None):
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self._store = store
+
+    def revoke(self, session_id, expires):
+        if not session_id:
+            return
+        with self._lock:
+            self._revoked[session_id] = expires
+        if self._store is not None:
+            self._store.revoke_session(session_id, expires)
+
+    def is_revoked(self, session_id, now=None):
+        now = now or time.time()
+        with self._lock:
+            for sid in [sid for sid, exp in self._revoked.items() if exp < now]:
+                del self._revoked[sid]
+            if session_id in self._revoked:
+                return True
+        if not session_id or self._store is None:
+            return False
+        # 조회 실패(None)는 폐기되지 않은 것으로 봅니다. (DB 장애로 모든 사용자가 로그아웃되지 않도록)
+        return self._store.is_session_revoked(session_id, now) is True
+
+@runtime.cache_resource
+def get_session_revocations():
+    """프로세스 전체에서 공유하는 세션 폐기 목록 (SCM DB에 저장)"""
+    from utils import db_manager
+    return SessionRevocations(store=db_manager)
+
+def _queue_cookie(value, max_age):
+    """다음 렌더링에서 브라우저 쿠키를 설정/삭제하도록 예약합니다. (st.rerun 직후에도 유실되지 않도록)"""
+    st.session_state["_auth_cookie_update"] = (value, max_age)
+
+def _flush_cookie_update():
+    update = st.session_state.pop("_auth_cookie_update", None)
+    if update is None:
+        return
+    value, max_age = update
+    cookie = f"{SESSION_COOKIE}={value}; Path=/; Max-Age={max_age}; SameSite=Lax"
+    script = (f"<script>parent.document.cookie = {json.dumps(cookie)}"
+              f" + (parent.location.protocol === 'https:' ? '; Secure' : '');</script>")
+    # 같은 출처 iframe에서 부모 문서의 쿠키를 설정 (st.iframe이 없는 이전 버전은 components.html)
+    if hasattr(st, "iframe"):
+        st.iframe(script, height=1)
+    else:
+        import streamlit.components.v1 as components
+        components.html(script, height=0)
+
+def _restore_from_cookie():
+    """서명된 세션 쿠키가 유효하면 OAuth 없이 로그인 상태를 복원합니다."""
+    if st.session_state.get("_auth_logged_out"):
+        return False
+    value = st.context.cookies.get(SESSION_COOKIE)
+    if not value:
+        return False
+    payload = decode_session_cookie(value, _cookie_key(_auth_config()))
+    if not payload or get_session_revocations().is_revoked(payload.get("sid")):
+        return False
+    st.session_state['user_email'] = payload["email"]
+    st.session_state['is_logged_in'] = True
+    st.session_state['_auth_session'] = (payload.get("sid"), payload["exp"])
+    return True
+
+
 def _handle_login_flow():
     """로그인 프로세스(토큰 교환 등)를 처리합니다."""
     # URL에 code가 있으면(로그인 직후 리다이렉트) 토큰 교환 시도
@@ -33,16 +245,26 @@ def _handle_login_flow():
             flow = get_flow()
             flow.fetch_token(code=code)
             credentials = flow.credentials
-            
-            # 사용자 정보 가져오기
-            service = build('oauth2', 'v2', credentials=credentials)
-            user_info = service.userinfo().get().execute()
-            
+
+            # 사용자 정보: 토큰 응답의 ID 토큰을 로컬 검증 (discovery/userinfo 호출 없음)
+            config = _auth_config()
+            claims = verify_id_token(
+                credentials.id_token, config["client_id"],
+                certs_url=config.get("certs_url", GOOGLE_CERTS_URL),
+            )
+
             # 세션에 저장
             st.session_state['credentials'] = credentials
-            st.session_state['user_email'] = user_info.get('email')
+            st.session_state['user_email'] = claims['email']
             st.session_state['is_logged_in'] = True
-            
+            st.session_state.pop('_auth_logged_out', None)
+
+            max_age = _session_max_age(config)
+            session_id = secrets.token_urlsafe(16)
+            st.session_state['_auth_session'] = (session_id, int(time.time() + max_age))
+            _queue_cookie(make_session_cookie(claims['email'], _cookie_key(config), max_age,
+                                              session_id=session_id), max_age)
+
             # URL 파라미터 정리 및 리런
             st.query_params.clear()
             st.rerun()
@@ -67,7 +289,7 @@ def _handle_login_flow():
 def require_auth(is_home=False):
     """
     모든 페이지의 최상단에서 호출해야 하는 함수입니다.
-    - 로그인 상태: 사이드바에 로그아웃 버튼 표시 후 통과
+    - 로그인 상태(또는 유효한 세션 쿠키): 사이드바에 로그아웃 버튼 표시 후 통과
     - 비로그인 상태: 
         - is_home=True (메인): 로그인 버튼 표시
         - is_home=False (서브): 경고 메시지 표시 및 실행 중단
@@ -75,6 +297,11 @@ def require_auth(is_home=False):
     # 세션 초기화
     if "is_logged_in" not in st.session_state:
         st.session_state["is_logged_in"] = False
+    _flush_cookie_update()
+
+    # 0. 새 세션/새로고침: 세션 쿠키로 로그인 복원
+    if not st.session_state["is_logged_in"]:
+        _restore_from_cookie()
 
     # 1. 로그인 된 경우: 사이드바에 로그아웃 버튼 표시하고 함수 종료(통과)
     if st.session_state["is_logged_in"]:
@@ -83,6 +310,11 @@ def require_auth(is_home=False):
             st.session_state["is_logged_in"] = False
             st.session_state.pop('credentials', None)
             st.session_state.pop('user_email', None)
+            # 쿠키 값이 남아 있거나 복사되었어도 다시 쓸 수 없도록 세션 id를 폐기
+            get_session_revocations().revoke(*st.session_state.pop('_auth_session', (None, 0)))
+            # 이 세션은 (아직 남아 있는) 쿠키로 다시 로그인되지 않도록 표시하고 쿠키 삭제
+            st.session_state['_auth_logged_out'] = True
+            _queue_cookie("", 0)
             st.rerun()
         return  # 인증 통과, 페이지 내용 렌더링 진행
 
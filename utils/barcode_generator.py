@@ -1,10 +1,29 @@
 import os
-import streamlit as st
+import time
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
-import barcode
-from barcode.writer import ImageWriter
 
-@st.cache_data
+from utils import runtime
+from utils.code128 import draw_code128, module_count
+from utils.pdf_writer import LabelPdfWriter
+
+LABEL_WIDTH, LABEL_HEIGHT = 480, 320
+
+# create_barcode_image 인자 순서와 동일한 라벨 레코드 필드
+LABEL_FIELDS = (
+    "serial_number", "product_code", "product_name", "lot",
+    "expiry", "version", "location", "category",
+)
+
+# 라벨 레이아웃 버전: 배치/폰트 등 출력 결과가 바뀌면 올려서 라벨 캐시를 무효화
+LABEL_LAYOUT_VERSION = 1
+
+# 라벨에 사용하는 폰트 크기 (배치 워커 초기화 시 미리 로드)
+LABEL_FONT_SIZES = (26, 22, 18, 14)
+
+# 폰트 객체는 데이터가 아닌 리소스이므로 cache_resource로 한 번만 로드해 그대로 공유합니다.
+# (Streamlit의 cache_data는 반환값을 pickle로 복사하므로 폰트 객체에는 맞지 않음)
+@runtime.cache_resource
 def get_korean_font(size):
     """
     프로젝트에 포함된 한글 폰트를 로드합니다.
@@ -16,39 +35,66 @@ def get_korean_font(size):
         print(f"폰트 로드 성공: {font_path}")
         return font
     except Exception as e:
-        st.error(f"🚨 폰트 파일 로드 실패! 'fonts/NotoSansKR-Regular.ttf' 파일이 있는지 확인하세요. 오류: {e}")
+        runtime.error(f"🚨 폰트 파일 로드 실패! 'fonts/NotoSansKR-Regular.ttf' 파일이 있는지 확인하세요. 오류: {e}")
         return ImageFont.load_default()
 
+# 폰트 크기별 글자 폭 캐시: {size: {char: advance}}
+_glyph_advance_cache = {}
+
+def get_glyph_advance(font, char):
+    """글자 하나의 폭(advance)을 폰트 크기별 캐시에서 반환합니다."""
+    advances = _glyph_advance_cache.setdefault(getattr(font, "size", None), {})
+    width = advances.get(char)
+    if width is None:
+        width = advances[char] = font.getlength(char)
+    return width
+
+def _find_line_end(draw, text, start, font, max_width, min_end):
+    """
+    text[start:end]가 max_width 안에 들어가는 가장 큰 end(>= min_end)를 찾습니다.
+    캐시된 글자 폭 합으로 위치를 추정한 뒤, 실제 textlength로 경계만 보정합니다.
+    """
+    n = len(text)
+    end, acc = start, 0.0
+    while end < n:
+        acc += get_glyph_advance(font, text[end])
+        if acc > max_width:
+            break
+        end += 1
+    end = max(end, min_end)
+
+    # 커닝 등으로 추정값이 어긋난 경우 앞뒤로 보정
+    while end < n and draw.textlength(text[start:end + 1], font) <= max_width:
+        end += 1
+    while end > min_end and draw.textlength(text[start:end], font) > max_width:
+        end -= 1
+    return end
+
 def wrap_text(draw, text, font, max_width):
     """
     텍스트가 최대 너비를 초과하면 자동으로 줄바꿈하여 리스트로 반환합니다.
     공백 없는 긴 텍스트도 글자 단위로 잘라 처리합니다.
+    (글자 폭 캐시로 줄 끝을 찾으므로 텍스트 길이에 선형으로 동작합니다.)
     """
-    lines = []
-    
     if draw.textlength(text, font) <= max_width:
         return [text]
 
-    current_line = ""
-    for char in text:
-        if draw.textlength(current_line + char, font) <= max_width:
-            current_line += char
-        else:
-            lines.append(current_line)
-            current_line = char
-    
-    if current_line:
-        lines.append(current_line)
-        
+    lines = []
+    start, n = 0, len(text)
+    while start < n:
+        # 첫 줄은 빈 줄에서 시작, 이후 줄은 넘친 글자를 반드시 포함 (기존 동작과 동일한 줄바꿈)
+        min_end = start if not lines else start + 1
+        end = _find_line_end(draw, text, start, font, max_width, min_end)
+        if end == start:
+            lines.append("")
+            end = _find_line_end(draw, text, start, font, max_width, start + 1)
+        lines.append(text[start:end])
+        start = end
+
     return lines
 
 def create_barcode_image(serial_number, product_code, product_name, lot, expiry, version, location, category):
     """입력된 정보로 30x20mm 사이즈의 라벨 PIL Image 객체를 생성합니다."""
-    barcode_class = barcode.get_barcode_class('code128')
-    barcode_image = barcode_class(str(serial_number), writer=ImageWriter())
-    barcode_pil_img = barcode_image.render({'write_text': False})
-
-    LABEL_WIDTH, LABEL_HEIGHT = 480, 320
     label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
     draw = ImageDraw.Draw(label)
 
@@ -79,11 +125,185 @@ def create_barcode_image(serial_number, product_code, product_name, lot, expiry,
     draw.text((margin, y_pos), f"LOT: {lot} | 유통기한: {expiry}", fill="black", font=font_small); y_pos += 24 # 👇 줄 간격 조정
     draw.text((margin, y_pos), f"보관위치: {location} | 버전: {version}", fill="black", font=font_small)
 
-    barcode_pil_img = barcode_pil_img.resize((LABEL_WIDTH - 40, 80)) # 바코드 높이 소폭 조정
-    label.paste(barcode_pil_img, (10, LABEL_HEIGHT - 140)) # 바코드 위치 조정
+    # 바코드: 별도 이미지 렌더링/리사이즈 없이 정수 픽셀 모듈로 라벨에 직접 그림
+    draw_code128(draw, str(serial_number), (10, LABEL_HEIGHT - 140, LABEL_WIDTH - 30, LABEL_HEIGHT - 60))
     
     barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
     text_x = (LABEL_WIDTH - draw.textlength(barcode_text, font=font_tiny)) // 2
     draw.text((text_x, LABEL_HEIGHT - 35), barcode_text, fill="black", font=font_tiny)
     
     return label
+
+# =========================
+# 프린터 명령어(ZPL/TSPL) 출력
+# =========================
+# 라벨 레이아웃 좌표는 create_barcode_image와 같은 480x320 px (16 px/mm) 기준입니다.
+LABEL_PX_PER_MM = 16
+
+# 프린터에 다운로드된 한글 TTF 폰트 이름 (프린터 설정에 맞게 변경)
+ZPL_KOREAN_FONT = "E:NOTOSANSKR.TTF"
+TSPL_KOREAN_FONT = "NOTOSANSKR.TTF"
+
+def _estimate_text_width(text, size):
+    """프린터가 렌더링할 텍스트 폭을 대략 추정합니다. (한글/전각 1em, 그 외 0.55em)"""
+    return sum(size if ord(ch) >= 0x1100 else size * 0.55 for ch in text)
+
+def _printer_layout(serial_number, product_code, product_name, lot, expiry, version, location, category):
+    """
+    create_barcode_image와 같은 배치의 요소 목록을 반환합니다. (좌표 단위: px)
+    ("text", x, y, width, size, max_lines, align, 내용) / ("barcode", x0, y0, x1, y1, 데이터)
+    """
+    y_pos, margin = 10, 15
+    name_text = f"제품명: {product_name}"
+    name_lines = 1 if _estimate_text_width(name_text, 26) <= LABEL_WIDTH - margin * 2 else 2
+
+    elements = [("text", margin, y_pos, LABEL_WIDTH - margin * 2, 26, 2, "L", name_text)]
+    y_pos += 28 * name_lines + 8
+    elements.append(("text", margin, y_pos, LABEL_WIDTH - margin * 2, 22, 1, "L", f"구분: {category}")); y_pos += 28
+    elements.append(("text", margin, y_pos, LABEL_WIDTH - margin * 2, 18, 1, "L", f"LOT: {lot} | 유통기한: {expiry}")); y_pos += 24
+    elements.append(("text", margin, y_pos, LABEL_WIDTH - margin * 2, 18, 1, "L", f"보관위치: {location} | 버전: {version}"))
+    elements.append(("barcode", 10, LABEL_HEIGHT - 140, LABEL_WIDTH - 30, LABEL_HEIGHT - 60, str(serial_number)))
+    elements.append(("text", 0, LABEL_HEIGHT - 35, LABEL_WIDTH, 14, 1, "C", f"{product_code}-{lot}-{expiry}-{version}"))
+    return elements
+
+def _barcode_module_dots(data, width_dots):
+    """바코드 영역 폭에 들어가는 최대 정수 모듈 폭(dot)과 바코드 실제 폭을 계산합니다."""
+    modules = module_count(data, quiet_zone=0)
+    module = max(1, min(10, width_dots // modules))
+    return module, modules * module
+
+def _zpl_escape(text):
+    # ^FH\ 와 함께 사용: 제어문자(^, ~)와 이스케이프 문자(\)를 16진수로 변환
+    return text.replace("\\", "\\5C").replace("^", "\\5E").replace("~", "\\7E")
+
+def create_label_zpl(serial_number, product_code, product_name, lot, expiry, version, location, category,
+                     dpmm=8, font=ZPL_KOREAN_FONT, copies=1):
+    """
+    create_barcode_image와 같은 레이아웃의 라벨을 ZPL 명령어 문자열로 생성합니다.
+    텍스트와 바코드는 프린터가 직접 렌더링합니다. (dpmm: 8=203dpi, 12=300dpi)
+    """
+    scale = dpmm / LABEL_PX_PER_MM
+    d = lambda v: int(round(v * scale))
+
+    cmds = ["^XA", "^CI28", f"^PW{d(LABEL_WIDTH)}", f"^LL{d(LABEL_HEIGHT)}", "^LH0,0"]
+    for el in _printer_layout(serial_number, product_code, product_name, lot, expiry, version, location, category):
+        if el[0] == "text":
+            _, x, y, width, size, max_lines, align, content = el
+            cmds.append(
+                f"^FO{d(x)},{d(y)}^A@N,{d(size)},{d(size)},{font}"
+                f"^FB{d(width)},{max_lines},{d(28 - size) if max_lines > 1 else 0},{align}"
+                f"^FH\\^FD{_zpl_escape(content)}^FS"
+            )
+        else:
+            _, x0, y0, x1, y1, data = el
+            module, bar_width = _barcode_module_dots(data, d(x1 - x0))
+            x = d(x0) + (d(x1 - x0) - bar_width) // 2
+            cmds.append(f"^FO{x},{d(y0)}^BY{module}^BCN,{d(y1 - y0)},N,N,N,A^FD{data}^FS")
+    cmds.append(f"^PQ{int(copies)}")
+    cmds.append("^XZ")
+    return "\n".join(cmds) + "\n"
+
+def _tspl_escape(text):
+    # TSPL 문자열 안의 큰따옴표는 \["] 로 표기
+    return text.replace('"', '\\["]')
+
+def create_label_tspl(serial_number, product_code, product_name, lot, expiry, version, location, category,
+                      dpmm=8, font=TSPL_KOREAN_FONT, copies=1, gap_mm=2):
+    """
+    create_barcode_image와 같은 레이아웃의 라벨을 TSPL 명령어 문자열로 생성합니다.
+    TTF 폰트의 크기는 포인트 단위로 지정합니다. (dpmm: 8=203dpi, 12=300dpi)
+    """
+    scale = dpmm / LABEL_PX_PER_MM
+    d = lambda v: int(round(v * scale))
+    pt = lambda size: max(1, int(round(size / LABEL_PX_PER_MM * 72 / 25.4)))
+    align_code = {"L": 1, "C": 2, "R": 3}
+
+    cmds = [
+        f"SIZE {LABEL_WIDTH / LABEL_PX_PER_MM:g} mm,{LABEL_HEIGHT / LABEL_PX_PER_MM:g} mm",
+        f"GAP {gap_mm} mm,0 mm",
+        "DIRECTION 1",
+        "CODEPAGE UTF-8",
+        "CLS",
+    ]
+    for el in _printer_layout(serial_number, product_code, product_name, lot, expiry, version, location, category):
+        if el[0] == "text":
+            _, x, y, width, size, max_lines, align, content = el
+            height = 28 * max_lines if max_lines > 1 else size + 4
+            cmds.append(
+                f'BLOCK {d(x)},{d(y)},{d(width)},{d(height)},"{font}",0,{pt(size)},{pt(size)},'
+                f'{d(28 - size) if max_lines > 1 else 0},{align_code[align]},"{_tspl_escape(content)}"'
+            )
+        else:
+            _, x0, y0, x1, y1, data = el
+            module, bar_width = _barcode_module_dots(data, d(x1 - x0))
+            x = d(x0) + (d(x1 - x0) - bar_width) // 2
+            cmds.append(f'BARCODE {x},{d(y0)},"128",{d(y1 - y0)},0,0,{module},{module},"{data}"')
+    cmds.append(f"PRINT {int(copies)},1")
+    return "\r\n".join(cmds) + "\r\n"
+
+# =========================
+# 배치 라벨 생성
+# =========================
+def _init_batch_worker():
+    """프로세스 풀 워커 초기화: 폰트를 미리 로드해 라벨 간에 재사용합니다."""
+    for size in LABEL_FONT_SIZES:
+        get_korean_font(size)
+
+def _render_label_record(record):
+    """라벨 레코드(dict) 한 건을 렌더링합니다. 워커 간 전송량을 줄이기 위해 회색조(L)로 반환합니다."""
+    args = [record.get(field, "") for field in LABEL_FIELDS]
+    return create_barcode_image(*args).convert("L")
+
+def render_labels_batch(records, max_workers=None, chunksize=8):
+    """
+    여러 라벨 레코드를 프로세스 풀에서 한꺼번에 렌더링합니다.
+    records: LABEL_FIELDS 키를 가진 dict 목록
+    반환: (라벨 이미지 목록(입력 순서 유지), 통계 dict {count, elapsed_sec, labels_per_sec})
+    """
+    records = list(records)
+    started = time.perf_counter()
+
+    if not records:
+        images = []
+    elif max_workers == 1 or len(records) <= chunksize:
+        # 소량은 프로세스 생성 비용이 더 크므로 현재 프로세스에서 처리
+        _init_batch_worker()
+        images = [_render_label_record(r) for r in records]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker) as pool:
+            images = list(pool.map(_render_label_record, records, chunksize=chunksize))
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "count": len(images),
+        "elapsed_sec": round(elapsed, 3),
+        "labels_per_sec": round(len(images) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    return images, stats
+
+def tile_labels(images, columns=3, rows=8, gap=20, margin=40):
+    """
+    라벨 이미지들을 인쇄용 시트(columns x rows)에 바둑판식으로 배치합니다.
+    반환: 시트 이미지 목록 (라벨이 남으면 다음 시트로 넘어감)
+    """
+    per_sheet = columns * rows
+    sheet_w = margin * 2 + columns * LABEL_WIDTH + (columns - 1) * gap
+    sheet_h = margin * 2 + rows * LABEL_HEIGHT + (rows - 1) * gap
+
+    sheets = []
+    for start in range(0, len(images), per_sheet):
+        sheet = Image.new('L', (sheet_w, sheet_h), 'white')
+        for i, img in enumerate(images[start:start + per_sheet]):
+            r, c = divmod(i, columns)
+            x = margin + c * (LABEL_WIDTH + gap)
+            y = margin + r * (LABEL_HEIGHT + gap)
+            sheet.paste(img, (x, y))
+        sheets.append(sheet)
+    return sheets
+
+def save_labels_pdf(images, fp):
+    """라벨(또는 시트) 이미지 목록을 페이지당 한 장씩 다중 페이지 PDF로 저장합니다."""
+    with LabelPdfWriter(fp) as pdf:
+        for img in images:
+            pdf.add_page(img)
+    return fp
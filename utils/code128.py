@@ -0,0 +1,111 @@
+from PIL import Image, ImageDraw
+
+# Code128 심볼 패턴 (bar/space 폭을 번갈아 나열, 값 0~105 + STOP)
+_PATTERNS = (
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312", "132212", "221213",
+    "221312", "231212", "112232", "122132", "122231", "113222", "123122", "123221", "223211", "221132",
+    "221231", "213212", "223112", "312131", "311222", "321122", "321221", "312212", "322112", "322211",
+    "212123", "212321", "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121", "313121", "211331",
+    "231131", "213113", "213311", "213131", "311123", "311321", "331121", "312113", "312311", "332111",
+    "314111", "221411", "431111", "111224", "111422", "121124", "121421", "141122", "141221", "112214",
+    "112412", "122114", "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112", "421211", "212141",
+    "214121", "412121", "111143", "111341", "131141", "114113", "114311", "411113", "411311", "113141",
+    "114131", "311141", "411131", "211412", "211214", "211232",
+)
+_STOP = "2331112"
+
+CODE_B, CODE_C = 100, 99
+START_B, START_C = 104, 105
+
+# 규격상 최소 quiet zone (양쪽 각 10 모듈)
+QUIET_ZONE_MODULES = 10
+
+
+def _digit_run(data, i):
+    j = i
+    while j < len(data) and data[j].isdigit():
+        j += 1
+    return j - i
+
+
+def encode_values(data):
+    """
+    문자열을 Code128 심볼 값 목록(START ~ 체크섬, STOP 제외)으로 변환합니다.
+    숫자 4자리 이상 연속 구간은 Code C(2자리/심볼), 나머지는 Code B로 인코딩합니다.
+    """
+    data = str(data)
+    if not data:
+        raise ValueError("Code128로 인코딩할 데이터가 비어 있습니다.")
+    for ch in data:
+        if not 32 <= ord(ch) <= 126:
+            raise ValueError(f"Code128(B/C)로 인코딩할 수 없는 문자입니다: {ch!r}")
+
+    values, current, i = [], None, 0
+    while i < len(data):
+        run = _digit_run(data, i)
+        if run >= 4 or (run >= 2 and run == len(data) - i and current in (None, "C")):
+            # 홀수 자리면 첫 숫자는 Code B로 보내고 나머지를 Code C로 묶음
+            if run % 2 == 1:
+                if current != "B":
+                    values.append(START_B if current is None else CODE_B)
+                    current = "B"
+                values.append(ord(data[i]) - 32)
+                i += 1
+                run -= 1
+            if current != "C":
+                values.append(START_C if current is None else CODE_C)
+                current = "C"
+            for k in range(i, i + run, 2):
+                values.append(int(data[k:k + 2]))
+            i += run
+        else:
+            if current != "B":
+                values.append(START_B if current is None else CODE_B)
+                current = "B"
+            values.append(ord(data[i]) - 32)
+            i += 1
+
+    checksum = values[0] + sum(pos * v for pos, v in enumerate(values[1:], start=1))
+    values.append(checksum % 103)
+    return values
+
+
+def encode_modules(data):
+    """bar/space 폭(모듈 단위) 목록을 반환합니다. 첫 요소는 bar입니다."""
+    pattern = "".join(_PATTERNS[v] for v in encode_values(data)) + _STOP
+    return [int(w) for w in pattern]
+
+
+def module_count(data, quiet_zone=QUIET_ZONE_MODULES):
+    """quiet zone을 포함한 전체 바코드 폭(모듈 수)."""
+    return sum(encode_modules(data)) + quiet_zone * 2
+
+
+def draw_code128(draw, data, box, quiet_zone=QUIET_ZONE_MODULES, fill=0):
+    """
+    box=(x0, y0, x1, y1) 영역 안에 Code128 바를 직접 그립니다.
+    모듈 폭을 정수 픽셀로 맞춰 리샘플링 없이 경계가 선명한 바를 그리고, 영역 가운데에 정렬합니다.
+    반환: 사용한 모듈 폭(px)
+    """
+    widths = encode_modules(data)
+    x0, y0, x1, y1 = box
+    total = sum(widths) + quiet_zone * 2
+    module = (x1 - x0) // total
+    if module < 1:
+        raise ValueError(f"바코드 영역이 너무 좁습니다: {x1 - x0}px < {total} 모듈")
+
+    x = x0 + ((x1 - x0) - module * total) // 2 + quiet_zone * module
+    for idx, w in enumerate(widths):
+        if idx % 2 == 0:
+            draw.rectangle((x, y0, x + w * module - 1, y1 - 1), fill=fill)
+        x += w * module
+    return module
+
+
+def render_code128(data, width, height, quiet_zone=QUIET_ZONE_MODULES):
+    """Code128 바코드를 width x height 크기의 1-bit 이미지로 생성합니다."""
+    img = Image.new("1", (width, height), 1)
+    draw_code128(ImageDraw.Draw(img), data, (0, 0, width, height), quiet_zone=quiet_zone)
+    return img
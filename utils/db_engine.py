@@ -0,0 +1,157 @@
+import time
+import threading
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from utils import runtime
+
+# 커넥션 풀 기본값 (secrets.toml의 [db_pool] / [db_pool_<prefix>] 로 변경 가능)
+#   pool_recycle: MySQL wait_timeout(기본 8시간)보다 짧게 두어 끊긴 커넥션 재사용 방지
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "warmup": 2,
+}
+
+# 생성된 엔진 목록 (이름 → 엔진), 풀 통계 조회용
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    checkout 대기 시간(커넥션을 얻기까지 걸린 시간)을 누적 기록하는 QueuePool
+    timeouts는 풀 고갈(pool_timeout 초과)만 세고, DB 연결 실패 등 그 밖의 오류는 connect_errors로 따로 셉니다.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.wait_stats = {"checkouts": 0, "total_wait_sec": 0.0, "max_wait_sec": 0.0, "timeouts": 0,
+                           "connect_errors": 0}
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._wait_lock:
+                self.wait_stats["timeouts"] += 1
+            raise
+        except Exception:
+            with self._wait_lock:
+                self.wait_stats["connect_errors"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._wait_lock:
+                self.wait_stats["checkouts"] += 1
+                self.wait_stats["total_wait_sec"] += waited
+                self.wait_stats["max_wait_sec"] = max(self.wait_stats["max_wait_sec"], waited)
+
+
+def _secret_section(name):
+    try:
+        return dict(runtime.secrets.get(name) or {})
+    except Exception:
+        return {}
+
+def pool_settings(prefix):
+    """[db_pool] 공통 설정 위에 [db_pool_<prefix>] 설정을 덮어쓴 풀 설정을 반환합니다."""
+    settings = dict(POOL_DEFAULTS)
+    settings.update(_secret_section("db_pool"))
+    settings.update(_secret_section(f"db_pool_{prefix}"))
+    return settings
+
+def has_read_endpoint(prefix):
+    """읽기 전용 엔드포인트(db_server_<prefix>_read)가 설정되어 있는지 확인합니다."""
+    try:
+        return bool(runtime.secrets.get(f"db_server_{prefix}_read"))
+    except Exception:
+        return False
+
+def _conn_str(prefix, read_only):
+    def secret(key):
+        # 읽기 엔드포인트는 값이 없으면 기본(쓰기) 설정을 그대로 사용
+        if read_only and f"{key}_{prefix}_read" in runtime.secrets:
+            return runtime.secrets[f"{key}_{prefix}_read"]
+        return runtime.secrets[f"{key}_{prefix}"]
+
+    host = secret("db_server")
+    port = secret("db_port")
+    user = secret("db_user")
+    passwd = secret("db_password")
+    db = secret("db_name")
+    return f"mysql+pymysql://{user}:{passwd}@{host}:{port}/{db}"
+
+def warmup(engine, count):
+    """커넥션 count개를 미리 열어 풀에 넣어 둡니다. (첫 요청의 연결 지연 제거)"""
+    conns = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            conns.append(conn)
+    finally:
+        for conn in conns:
+            conn.close()
+    return len(conns)
+
+def create_db_engine(prefix, read_only=False):
+    """
+    secrets의 db_*_<prefix> 접속정보와 풀 설정으로 엔진을 만들고 워밍업합니다.
+    read_only=True면 db_server_<prefix>_read 등 읽기 엔드포인트로 연결합니다.
+    """
+    settings = pool_settings(prefix)
+    engine = create_engine(
+        _conn_str(prefix, read_only),
+        poolclass=TimedQueuePool,
+        pool_size=int(settings["pool_size"]),
+        max_overflow=int(settings["max_overflow"]),
+        pool_timeout=float(settings["pool_timeout"]),
+        pool_recycle=int(settings["pool_recycle"]),
+        pool_pre_ping=bool(settings["pool_pre_ping"]),
+    )
+
+    warm = min(int(settings["warmup"]), int(settings["pool_size"]))
+    if warm > 0:
+        try:
+            warmup(engine, warm)
+        except Exception as e:
+            # 워밍업 실패는 치명적이지 않음: 실제 요청 시 다시 연결 시도
+            runtime.logger.warning("DB 커넥션 워밍업 실패 (%s%s): %s", prefix, "_read" if read_only else "", e)
+
+    with _ENGINES_LOCK:
+        _ENGINES[f"{prefix}_read" if read_only else prefix] = engine
+    return engine
+
+def pool_status(engine):
+    """엔진 커넥션 풀의 현재 상태와 checkout 대기 통계를 반환합니다."""
+    pool = engine.pool
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+    wait = getattr(pool, "wait_stats", None)
+    if wait:
+        checkouts = wait["checkouts"]
+        status.update(
+            checkouts=checkouts,
+            timeouts=wait["timeouts"],
+            connect_errors=wait["connect_errors"],
+            avg_wait_ms=round(wait["total_wait_sec"] / checkouts * 1000, 2) if checkouts else 0.0,
+            max_wait_ms=round(wait["max_wait_sec"] * 1000, 2),
+        )
+    return status
+
+def all_pool_status():
+    """생성된 모든 엔진의 풀 상태를 {이름: 상태} 로 반환합니다."""
+    with _ENGINES_LOCK:
+        engines = dict(_ENGINES)
+    return {name: pool_status(engine) for name, engine in engines.items()}
@@ -1,34 +1,51 @@
-import streamlit as st
-import pandas as pd
-from sqlalchemy import create_engine, text
-import pymysql  # SQLAlchemy가 pymysql 드라이버를 로드할 수 있도록
+from __future__ import annotations
+
+import time
+import threading
+
+from sqlalchemy import text, bindparam
+
+from utils import runtime
+from utils import db_engine
+
+# pandas는 DataFrame을 반환하는 조회에서만 로드 (pymysql 드라이버는 엔진 생성 시 SQLAlchemy가 로드)
+pd = runtime.lazy_import("pandas")
 
 # =========================
 # ① ERP DB (제품 정보 조회)
 # =========================
-@st.cache_resource
+@runtime.cache_resource
 def connect_to_erp():
     try:
-        host = st.secrets["db_server_erp"]
-        port = st.secrets["db_port_erp"]
-        user = st.secrets["db_user_erp"]
-        passwd = st.secrets["db_password_erp"]
-        db = st.secrets["db_name_erp"]
-        conn_str = f"mysql+pymysql://{user}:{passwd}@{host}:{port}/{db}"
-        return create_engine(conn_str)
+        return db_engine.create_db_engine("erp")
     except Exception as e:
-        st.error(f"ERP DB 연결 실패: {e}")
+        runtime.error(f"ERP DB 연결 실패: {e}")
         return None
 
+@runtime.cache_resource
+def connect_to_erp_read():
+    """읽기 전용 ERP 엔진 (db_server_erp_read 미설정 시 기본 엔진 공유)"""
+    if not db_engine.has_read_endpoint("erp"):
+        return connect_to_erp()
+    try:
+        return db_engine.create_db_engine("erp", read_only=True)
+    except Exception as e:
+        runtime.error(f"ERP 읽기 DB 연결 실패: {e}")
+        return connect_to_erp()
+
 BRAND_FILTERS = ('이퀄베리', '마켓올슨', '브랜든')  # 필요시 수정
 
-@st.cache_data(ttl=3600)
+@runtime.cache_data(ttl=3600)
 def load_product_data() -> pd.DataFrame:
     """
     ERP DB의 boosters_items에서 제품 목록 반환
     반환 컬럼: ['제품코드','제품명','바코드']
     """
-    engine = connect_to_erp()
+    return fetch_product_catalog()
+
+def fetch_product_catalog() -> pd.DataFrame:
+    """load_product_data와 같은 제품 목록을 캐시 없이 ERP DB에서 바로 조회합니다. (바코드 인덱스 갱신용)"""
+    engine = connect_to_erp_read()
     if engine is None:
         return pd.DataFrame()
 
@@ -49,7 +66,7 @@ def load_product_data() -> pd.DataFrame:
             df = pd.read_sql(query, conn, params={"brands": BRAND_FILTERS})
         return df
     except Exception as e:
-        st.error(f"제품 목록 로드 실패: {e}")
+        runtime.error(f"제품 목록 로드 실패: {e}")
         return pd.DataFrame()
 
 def find_product_info_by_barcode(barcode_to_find: str):
@@ -60,7 +77,7 @@ def find_product_info_by_barcode(barcode_to_find: str):
     if not barcode_to_find:
         return None
 
-    engine = connect_to_erp()
+    engine = connect_to_erp_read()
     if engine is None:
         return None
 
@@ -78,26 +95,123 @@ def find_product_info_by_barcode(barcode_to_find: str):
             row = conn.execute(q, {"barcode": barcode_to_find}).mappings().first()
         return dict(row) if row else None
     except Exception as e:
-        st.error(f"ERP 바코드 조회 실패: {e}")
+        runtime.error(f"ERP 바코드 조회 실패: {e}")
         return None
 
+# 일괄 조회 시 IN 목록 한 번에 넣을 최대 개수 (쿼리 길이/플랜 안정성)
+ERP_IN_CHUNK_SIZE = 500
+
+_PRODUCTS_BY_SQL = {
+    # 바코드는 브랜드와 무관하게 조회 (find_product_info_by_barcode와 동일)
+    "barcode": text("""
+        SELECT resource_code, resource_name, barcode
+        FROM boosters_items
+        WHERE barcode IN :values
+          AND is_delete = 0
+        ORDER BY resource_code
+    """).bindparams(bindparam("values", expanding=True)),
+    # 제품코드는 load_product_data와 같은 브랜드만
+    "resource_code": text("""
+        SELECT resource_code, resource_name, barcode
+        FROM boosters_items
+        WHERE resource_code IN :values
+          AND is_delete = 0
+          AND brand_name IN :brands
+        ORDER BY resource_code
+    """).bindparams(bindparam("values", expanding=True), bindparam("brands", expanding=True)),
+}
+
+def _match_key(value):
+    """DB 비교와 같은 기준의 키: 앞뒤 공백 제거 + 대소문자 무시 (MySQL 기본 _ci collation)"""
+    return str(value).strip().lower()
+
+def _find_products_by(column, values, chunk_size=ERP_IN_CHUNK_SIZE):
+    originals = list(dict.fromkeys(v for v in values if v is not None and str(v).strip()))
+    if not originals:
+        return {}, []
+    # 조회는 공백만 제거한 값으로 (collation이 대소문자를 구분하는 DB에서도 입력 그대로 매칭되도록)
+    keys = list(dict.fromkeys(str(v).strip() for v in originals))
+
+    engine = connect_to_erp_read()
+    if engine is None:
+        return None
+
+    found = {}
+    try:
+        with engine.connect() as conn:
+            for start in range(0, len(keys), chunk_size):
+                params = {"values": keys[start:start + chunk_size]}
+                if column == "resource_code":
+                    params["brands"] = BRAND_FILTERS
+                for row in conn.execute(_PRODUCTS_BY_SQL[column], params).mappings():
+                    # 같은 키에 여러 행이면 첫 행 우선 (단건 조회의 LIMIT 1과 동일)
+                    found.setdefault(_match_key(row[column]), dict(row))
+    except Exception as e:
+        runtime.error(f"ERP 제품 일괄 조회 실패: {e}")
+        return None
+
+    # 결과는 DB 값이 아니라 호출 측이 넘긴 값을 키로 반환 (호출 측 매핑이 그대로 동작하도록)
+    result = {value: found[_match_key(value)] for value in originals if _match_key(value) in found}
+    missing = [value for value in originals if _match_key(value) not in found]
+    return result, missing
+
+def find_products_by_barcodes(barcodes):
+    """
+    바코드 목록을 IN 쿼리(ERP_IN_CHUNK_SIZE개 단위)로 한 번에 조회합니다.
+    반환: ({입력 바코드: {'resource_code', 'resource_name', 'barcode'}} 입력 순서, 미등록 바코드 목록)
+    DB 비교처럼 앞뒤 공백/대소문자는 무시하고, 키는 호출 측이 넘긴 값 그대로입니다.
+    DB 오류 시 None.
+    """
+    return _find_products_by("barcode", barcodes)
+
+def find_products_by_codes(codes):
+    """
+    제품코드 목록 일괄 조회 (load_product_data와 같은 브랜드만). 반환 형식은 find_products_by_barcodes와 같고 키가 제품코드입니다.
+    """
+    return _find_products_by("resource_code", codes)
+
 # =========================
 # ② SCM DB (입출고/재고 저장)
 # =========================
-@st.cache_resource
+@runtime.cache_resource
 def connect_to_scm():
     try:
-        host = st.secrets["db_server_scm"]
-        port = st.secrets["db_port_scm"]
-        user = st.secrets["db_user_scm"]
-        passwd = st.secrets["db_password_scm"]
-        db = st.secrets["db_name_scm"]
-        conn_str = f"mysql+pymysql://{user}:{passwd}@{host}:{port}/{db}"
-        return create_engine(conn_str)
+        return db_engine.create_db_engine("scm")
     except Exception as e:
-        st.error(f"SCM DB 연결 실패: {e}")
+        runtime.error(f"SCM DB 연결 실패: {e}")
         return None
 
+@runtime.cache_resource
+def connect_to_scm_read():
+    """읽기 전용 SCM 엔진 (대시보드 등 조회용, db_server_scm_read 미설정 시 기본 엔진 공유)"""
+    if not db_engine.has_read_endpoint("scm"):
+        return connect_to_scm()
+    try:
+        return db_engine.create_db_engine("scm", read_only=True)
+    except Exception as e:
+        runtime.error(f"SCM 읽기 DB 연결 실패: {e}")
+        return connect_to_scm()
+
+def get_pool_stats() -> dict:
+    """생성된 DB 엔진별 커넥션 풀 상태 (checked_out, overflow, 대기시간 등)"""
+    return db_engine.all_pool_status()
+
+INSERT_INVENTORY_SQL = text("""
+    INSERT INTO `Retained_sample_status`
+    (serial_number, category, product_code, product_name, lot,
+     expiration_date, disposal_date, storage_location, version, received_at)
+    VALUES
+    (:serial_number, :category, :product_code, :product_name, :lot,
+     :expiration_date, :disposal_date, :storage_location, :version, :received_at)
+""")
+
+INSERT_INOUT_SQL = text("""
+    INSERT INTO `Retained_sample_in_out`
+    (`timestamp`, `type`, serial_number, product_code, product_name, quantity, handler)
+    VALUES
+    (:timestamp, :type, :serial_number, :product_code, :product_name, :quantity, :handler)
+""")
+
 def insert_inventory_record(data: dict) -> bool:
     """
     data keys (영문 스키마):
@@ -108,23 +222,38 @@ def insert_inventory_record(data: dict) -> bool:
     if engine is None:
         return False
 
-    query = text("""
-        INSERT INTO `Retained_sample_status`
-        (serial_number, category, product_code, product_name, lot,
-         expiration_date, disposal_date, storage_location, version, received_at)
-        VALUES
-        (:serial_number, :category, :product_code, :product_name, :lot,
-         :expiration_date, :disposal_date, :storage_location, :version, :received_at)
-    """)
-
     try:
         with engine.begin() as conn:
-            conn.execute(query, data)
+            conn.execute(INSERT_INVENTORY_SQL, data)
         return True
     except Exception as e:
-        st.error(f"입고 데이터 DB 저장 실패: {e}")
+        runtime.error(f"입고 데이터 DB 저장 실패: {e}")
         return False
 
+def find_inventory_by_serial(serial_number):
+    """
+    Retained_sample_status에서 일련번호로 입고 정보 조회 (라벨 재출력용)
+    반환: 컬럼명 dict 또는 None
+    """
+    engine = connect_to_scm()
+    if engine is None:
+        return None
+
+    q = text("""
+        SELECT serial_number, category, product_code, product_name, lot,
+               expiration_date, disposal_date, storage_location, version, received_at
+        FROM `Retained_sample_status`
+        WHERE serial_number = :serial_number
+        LIMIT 1
+    """)
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(q, {"serial_number": str(serial_number)}).mappings().first()
+        return dict(row) if row else None
+    except Exception as e:
+        runtime.error(f"입고 정보 조회 실패: {e}")
+        return None
+
 def insert_inout_record(data: dict) -> bool:
     """
     data keys (영문 스키마):
@@ -134,17 +263,650 @@ def insert_inout_record(data: dict) -> bool:
     if engine is None:
         return False
 
-    query = text("""
-        INSERT INTO `Retained_sample_in_out`
-        (`timestamp`, `type`, serial_number, product_code, product_name, quantity, handler)
-        VALUES
-        (:timestamp, :type, :serial_number, :product_code, :product_name, :quantity, :handler)
+    try:
+        ensure_stock_summary_table(engine)
+        with engine.begin() as conn:
+            conn.execute(INSERT_INOUT_SQL, data)
+            apply_stock_movements(conn, [data])
+        return True
+    except Exception as e:
+        runtime.error(f"입출고 이력 DB 저장 실패: {e}")
+        return False
+
+def insert_inbound_batch(inventory_rows: list, inout_rows: list) -> bool:
+    """
+    대량 입고: Retained_sample_status / Retained_sample_in_out 행들을
+    하나의 트랜잭션에서 executemany로 저장합니다. (일부만 저장되는 경우 없음)
+    각 행의 key는 insert_inventory_record / insert_inout_record와 동일합니다.
+    """
+    if not inventory_rows and not inout_rows:
+        return True
+
+    engine = connect_to_scm()
+    if engine is None:
+        return False
+
+    try:
+        ensure_stock_summary_table(engine)
+        with engine.begin() as conn:
+            if inventory_rows:
+                conn.execute(INSERT_INVENTORY_SQL, inventory_rows)
+            if inout_rows:
+                conn.execute(INSERT_INOUT_SQL, inout_rows)
+                known = {
+                    str(r["serial_number"]): (r.get("lot"), r.get("storage_location"))
+                    for r in inventory_rows
+                }
+                apply_stock_movements(conn, inout_rows, known)
+        return True
+    except Exception as e:
+        runtime.error(f"대량 입고 DB 저장 실패 (전체 롤백됨): {e}")
+        return False
+
+# 출고 대상 S/N 검증 (출고 기록과 같은 트랜잭션 안에서 실행)
+# 1) 재고 행을 FOR UPDATE로 잠가 같은 S/N을 동시에 출고하려는 세션/API 요청을 직렬화
+_OUTBOUND_SERIAL_LOCK_SQL = text("""
+    SELECT serial_number, product_code, product_name, lot, storage_location
+    FROM `Retained_sample_status`
+    WHERE serial_number IN :serials
+    ORDER BY serial_number
+    FOR UPDATE
+""").bindparams(bindparam("serials", expanding=True))
+
+# 2) 기존 출고 이력: 잠금 읽기로 최신 커밋 데이터를 확인 (먼저 잠근 쪽이 커밋한 출고도 보임)
+_OUTBOUND_SHIPPED_SQL = text("""
+    SELECT DISTINCT serial_number
+    FROM `Retained_sample_in_out`
+    WHERE serial_number IN :serials AND `type` = '출고'
+    LOCK IN SHARE MODE
+""").bindparams(bindparam("serials", expanding=True))
+
+def insert_outbound_batch(items: list, handler: str, timestamp: str) -> list:
+    """
+    일괄 출고: 출고 목록 전체를 하나의 트랜잭션에서 검증(S/N 행 잠금) 후 executemany로 기록합니다.
+    items: 출고 페이지 목록 형식 [{type('제품'|'S/N'), code, product_code, product_name, quantity}]
+    반환: 입력 순서대로 [{"code", "ok", "reason"}] (성공 항목에는 기록된 행 "record" 포함)
+      - S/N 항목에는 재고 테이블의 보관위치 "storage_location"도 포함
+      - S/N은 재고에 없거나 이미 출고된 경우 실패 처리 (나머지 항목은 정상 기록)
+      - 같은 S/N을 동시에 출고하면 한쪽만 성공하고 다른 쪽은 "이미 출고된 일련번호"로 실패합니다.
+      - DB 저장 자체가 실패하면 전체 롤백되며 모든 항목이 실패로 표시됩니다.
+    """
+    results = [{"code": item["code"], "ok": False, "reason": ""} for item in items]
+    if not items:
+        return results
+
+    engine = connect_to_scm()
+    if engine is None:
+        for r in results:
+            r["reason"] = "SCM DB 연결 실패"
+        return results
+
+    serials = sorted({str(item["code"]) for item in items if item["type"] == "S/N"})
+    rows_to_insert, row_indices = [], []
+    stage = "S/N 검증 실패"
+    try:
+        ensure_stock_summary_table(engine)
+        with engine.begin() as conn:
+            found, shipped = {}, set()
+            if serials:
+                rows = conn.execute(_OUTBOUND_SERIAL_LOCK_SQL, {"serials": serials}).mappings().all()
+                found = {str(row["serial_number"]): row for row in rows}
+                shipped = {
+                    str(sn) for sn in conn.execute(_OUTBOUND_SHIPPED_SQL, {"serials": serials}).scalars()
+                }
+
+            for idx, item in enumerate(items):
+                record = {
+                    "timestamp": timestamp,
+                    "type": "출고",
+                    "serial_number": "N/A",
+                    "product_code": item["product_code"],
+                    "product_name": item["product_name"],
+                    "quantity": int(item["quantity"]),
+                    "handler": handler,
+                }
+                if item["type"] == "S/N":
+                    code = str(item["code"])
+                    status = found.get(code)
+                    if status is None:
+                        results[idx]["reason"] = "재고에 없는 일련번호"
+                        continue
+                    if code in shipped:
+                        results[idx]["reason"] = "이미 출고된 일련번호"
+                        continue
+                    # 같은 목록 안의 중복 S/N도 한 번만 출고
+                    shipped.add(code)
+                    results[idx]["storage_location"] = status["storage_location"]
+                    # S/N 출고는 재고 테이블의 실제 제품 정보로 기록
+                    record.update(
+                        serial_number=code,
+                        product_code=status["product_code"],
+                        product_name=status["product_name"],
+                        quantity=1,
+                    )
+                rows_to_insert.append(record)
+                row_indices.append(idx)
+
+            if rows_to_insert:
+                stage = "DB 저장 실패"
+                known = {sn: (row["lot"], row["storage_location"]) for sn, row in found.items()}
+                conn.execute(INSERT_INOUT_SQL, rows_to_insert)
+                apply_stock_movements(conn, rows_to_insert, known)
+    except Exception as e:
+        runtime.error(f"일괄 출고 처리 실패 (전체 롤백됨): {e}")
+        for idx, r in enumerate(results):
+            if not r["reason"] or idx in row_indices:
+                r["reason"] = stage
+        return results
+
+    for idx, record in zip(row_indices, rows_to_insert):
+        results[idx].update(ok=True, record=record)
+    return results
+
+# =========================
+# ③ 대시보드 조회 (서버 측 필터/정렬/키셋 페이지네이션)
+# =========================
+# table: 실제 테이블명, key: 유일 키(키셋 동률 정렬용), date: 기간 필터 컬럼
+TABLE_SPECS = {
+    "inventory": {
+        "table": "Retained_sample_status",
+        "key": "serial_number",
+        "date": "received_at",
+        "columns": [
+            "serial_number", "category", "product_code", "product_name", "lot",
+            "expiration_date", "disposal_date", "storage_location", "version", "received_at",
+        ],
+    },
+    "inout": {
+        "table": "Retained_sample_in_out",
+        "key": "id",  # 자동 증가 PK
+        "date": "timestamp",
+        "columns": [
+            "id", "timestamp", "type", "serial_number", "product_code", "product_name", "quantity", "handler",
+        ],
+    },
+}
+
+# 필터 이름 → 적용 컬럼 (해당 컬럼이 없는 테이블에는 사용할 수 없음)
+FILTER_COLUMNS = {
+    "product": "product_code",
+    "category": "category",
+    "location": "storage_location",
+    "type": "type",
+    "date_from": None,
+    "date_to": None,
+}
+
+def _build_filters(spec, filters):
+    """
+    필터 dict를 WHERE 조건 목록과 파라미터로 변환합니다. (허용된 컬럼만 사용)
+    테이블에 없는 컬럼의 필터나 알 수 없는 필터가 값과 함께 주어지면 ValueError를 발생시킵니다.
+    """
+    clauses, params = [], {}
+    filters = filters or {}
+    columns = spec["columns"]
+
+    for name, value in filters.items():
+        if name not in FILTER_COLUMNS:
+            raise ValueError(f"알 수 없는 필터입니다: {name}")
+        column = FILTER_COLUMNS[name]
+        if value and column is not None and column not in columns:
+            raise ValueError(f"'{name}' 필터는 {spec['table']} 테이블에 적용할 수 없습니다.")
+
+    product = (filters.get("product") or "").strip()
+    if product:
+        clauses.append("(product_code = :product OR product_name LIKE :product_like)")
+        params["product"] = product
+        params["product_like"] = f"%{product}%"
+
+    categories = filters.get("category")
+    if categories:
+        clauses.append("category IN :categories")
+        params["categories"] = list(categories)
+
+    location = (filters.get("location") or "").strip()
+    if location:
+        # 접두어 검색 (예: "A-01" → A-01-xx), 인덱스 사용 가능
+        clauses.append("storage_location LIKE :location")
+        params["location"] = location.replace("%", r"\%").replace("_", r"\_") + "%"
+
+    types = filters.get("type")
+    if types:
+        clauses.append("`type` IN :types")
+        params["types"] = list(types)
+
+    date_col = spec["date"]
+    if filters.get("date_from"):
+        clauses.append(f"`{date_col}` >= :date_from")
+        params["date_from"] = str(filters["date_from"])
+    if filters.get("date_to"):
+        # 종료일 당일 포함
+        clauses.append(f"`{date_col}` < DATE_ADD(:date_to, INTERVAL 1 DAY)")
+        params["date_to"] = str(filters["date_to"])
+
+    return clauses, params
+
+def to_sql_param(value):
+    """pandas/numpy 값을 DB 드라이버가 처리할 수 있는 파이썬 기본 타입으로 변환합니다."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+def _keyset_clause(sort_by, key, descending, cursor_is_null):
+    """
+    (정렬 컬럼, 키) 다음 페이지 조건. MySQL은 NULL을 가장 작은 값으로 정렬하므로
+    (내림차순: 맨 뒤, 오름차순: 맨 앞) 정렬 값이 NULL인 행은 IS NULL 분기로 따로 비교합니다.
+    ORDER BY는 그대로 두어 인덱스 정렬을 사용할 수 있습니다.
+    """
+    col, k = f"`{sort_by}`", f"`{key}`"
+    op = "<" if descending else ">"
+    if cursor_is_null:
+        null_branch = f"({col} IS NULL AND {k} {op} :cur_key)"
+        return null_branch if descending else f"({null_branch} OR {col} IS NOT NULL)"
+    clause = f"{col} {op} :cur_sort OR ({col} = :cur_sort AND {k} {op} :cur_key)"
+    return f"({clause} OR {col} IS NULL)" if descending else f"({clause})"
+
+def query_page(table: str, columns=None, filters=None, sort_by=None, descending=True,
+               cursor=None, limit=50):
+    """
+    대시보드용 페이지 조회. OFFSET 없이 (정렬 컬럼, 키) 기준 키셋 페이지네이션을 사용하므로
+    이력이 수백만 건이어도 페이지 조회 비용이 일정합니다.
+      table: "inventory" | "inout"
+      columns: 가져올 컬럼 목록 (None이면 전체 허용 컬럼)
+      filters: {"product", "category"[list], "location"(접두어), "type"[list], "date_from", "date_to"}
+               (category/location은 inventory, type은 inout에만 사용 가능 — 그 외에는 ValueError)
+      cursor: 이전 페이지 반환값 (첫 페이지는 None)
+    반환: (DataFrame, 다음 페이지 cursor 또는 None)
+    """
+    spec = TABLE_SPECS[table]
+    allowed = spec["columns"]
+    key = spec["key"]
+    sort_by = sort_by if sort_by in allowed else spec["date"]
+    limit = max(1, min(int(limit), 1000))
+
+    select_cols = [c for c in (columns or allowed) if c in allowed]
+    for c in (sort_by, key):
+        if c not in select_cols:
+            select_cols.append(c)
+
+    clauses, params = _build_filters(spec, filters)
+    if cursor is not None:
+        clauses.append(_keyset_clause(sort_by, key, descending, cursor[0] is None))
+        params["cur_sort"], params["cur_key"] = cursor
+
+    direction = "DESC" if descending else "ASC"
+    sql = (
+        f"SELECT {', '.join(f'`{c}`' for c in select_cols)} FROM `{spec['table']}`"
+        + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+        + f" ORDER BY `{sort_by}` {direction}, `{key}` {direction} LIMIT :limit_plus_one"
+    )
+    params["limit_plus_one"] = limit + 1
+
+    query = text(sql)
+    for name in ("categories", "types"):
+        if name in params:
+            query = query.bindparams(bindparam(name, expanding=True))
+
+    engine = connect_to_scm_read()
+    if engine is None:
+        return pd.DataFrame(columns=select_cols), None
+
+    try:
+        with engine.connect() as conn:
+            df = pd.read_sql(query, conn, params=params)
+    except Exception as e:
+        runtime.error(f"대시보드 조회 실패: {e}")
+        return pd.DataFrame(columns=select_cols), None
+
+    next_cursor = None
+    if len(df) > limit:
+        df = df.iloc[:limit]
+        last = df.iloc[-1]
+        sort_value = last[sort_by]
+        next_cursor = (None if pd.isna(sort_value) else to_sql_param(sort_value), to_sql_param(last[key]))
+    return df, next_cursor
+
+# 대시보드 요약 조회의 캐시 유지 시간(초): 이 시간 동안은 모든 세션이 같은 결과를 공유
+SUMMARY_TTL = 30
+
+# 대시보드 요약: 테이블 전체를 메모리에 올리지 않고 건수/최근 N건만 조회
+_INVENTORY_COUNT_SQL = text("SELECT COUNT(*) FROM `Retained_sample_status`")
+
+_RECENT_INOUT_SQL = text(f"""
+    SELECT {', '.join(f'`{c}`' for c in TABLE_SPECS['inout']['columns'])}
+    FROM `Retained_sample_in_out`
+    ORDER BY id DESC
+    LIMIT :limit
+""")
+
+@runtime.cache_data(ttl=SUMMARY_TTL)
+def count_inventory():
+    """누적 입고 샘플 수 (Retained_sample_status 행 수). 실패 시 None."""
+    engine = connect_to_scm_read()
+    if engine is None:
+        return None
+    try:
+        with engine.connect() as conn:
+            return int(conn.execute(_INVENTORY_COUNT_SQL).scalar() or 0)
+    except Exception as e:
+        runtime.error(f"재고 건수 조회 실패: {e}")
+        return None
+
+@runtime.cache_data(ttl=SUMMARY_TTL)
+def load_recent_inout(limit: int = 10) -> pd.DataFrame:
+    """최근 입출고 limit건 (PK 역순으로 인덱스에서 바로 읽음). 실패 시 빈 DataFrame."""
+    engine = connect_to_scm_read()
+    if engine is None:
+        return pd.DataFrame()
+    try:
+        with engine.connect() as conn:
+            return pd.read_sql(_RECENT_INOUT_SQL, conn, params={"limit": int(limit)})
+    except Exception as e:
+        runtime.error(f"최근 입출고 조회 실패: {e}")
+        return pd.DataFrame()
+
+# 날짜별 입고/출고 건수 (timestamp 인덱스 범위 조회, 이력 전체를 읽지 않음)
+_INOUT_DAY_COUNTS_SQL = text("""
+    SELECT `type`, COUNT(*) AS cnt
+    FROM `Retained_sample_in_out`
+    WHERE `timestamp` >= :day AND `timestamp` < DATE_ADD(:day, INTERVAL 1 DAY)
+    GROUP BY `type`
+""")
+
+@runtime.cache_data(ttl=SUMMARY_TTL)
+def count_inout_by_day(day: str) -> dict:
+    """day(YYYY-MM-DD, KST 기준 저장값)의 유형별 건수 {'입고': n, '출고': m}. 실패 시 빈 dict."""
+    engine = connect_to_scm_read()
+    if engine is None:
+        return {}
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(_INOUT_DAY_COUNTS_SQL, {"day": day}).all()
+        return {row[0]: int(row[1]) for row in rows}
+    except Exception as e:
+        runtime.error(f"일별 입출고 건수 조회 실패: {e}")
+        return {}
+
+# =========================
+# ④ 재고 요약 (쓰기 시점에 유지되는 집계 테이블)
+# =========================
+# 현재 재고 = 입고 수량 - 출고 수량, (제품코드, LOT, 보관위치) 단위로 유지합니다.
+# 제품 바코드로 출고된 이력(S/N 없음)은 LOT/보관위치를 알 수 없으므로 빈 문자열('')로 집계되고,
+# 조회 시에는 '미지정'으로 표시합니다.
+UNASSIGNED_LABEL = "미지정"
+STOCK_SUMMARY_TABLE = "Retained_sample_stock_summary"
+
+CREATE_STOCK_SUMMARY_SQL = text(f"""
+    CREATE TABLE IF NOT EXISTS `{STOCK_SUMMARY_TABLE}` (
+        product_code     VARCHAR(64)  NOT NULL,
+        lot              VARCHAR(64)  NOT NULL DEFAULT '',
+        storage_location VARCHAR(64)  NOT NULL DEFAULT '',
+        product_name     VARCHAR(255) NULL,
+        quantity         BIGINT       NOT NULL DEFAULT 0,
+        updated_at       TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (product_code, lot, storage_location),
+        KEY idx_location (storage_location)
+    )
+""")
+
+UPSERT_STOCK_SQL = text(f"""
+    INSERT INTO `{STOCK_SUMMARY_TABLE}` (product_code, lot, storage_location, product_name, quantity)
+    VALUES (:product_code, :lot, :storage_location, :product_name, :delta)
+    ON DUPLICATE KEY UPDATE
+        quantity = quantity + VALUES(quantity),
+        product_name = COALESCE(VALUES(product_name), product_name)
+""")
+
+_STOCK_LOCATION_BY_SERIAL_SQL = text("""
+    SELECT serial_number, lot, storage_location
+    FROM `Retained_sample_status`
+    WHERE serial_number IN :serials
+""").bindparams(bindparam("serials", expanding=True))
+
+REBUILD_STOCK_SQL = text(f"""
+    INSERT INTO `{STOCK_SUMMARY_TABLE}` (product_code, lot, storage_location, product_name, quantity)
+    SELECT
+        o.product_code,
+        COALESCE(s.lot, ''),
+        COALESCE(s.storage_location, ''),
+        MAX(o.product_name),
+        SUM(CASE o.`type` WHEN '입고' THEN o.quantity WHEN '출고' THEN -o.quantity ELSE 0 END)
+    FROM `Retained_sample_in_out` o
+    LEFT JOIN `Retained_sample_status` s
+        ON o.serial_number <> 'N/A' AND s.serial_number = o.serial_number
+    GROUP BY o.product_code, COALESCE(s.lot, ''), COALESCE(s.storage_location, '')
+""")
+
+DELETE_STOCK_SQL = text(f"DELETE FROM `{STOCK_SUMMARY_TABLE}`")
+
+_STOCK_TABLE_EXISTS_SQL = text("""
+    SELECT COUNT(*) FROM information_schema.tables
+    WHERE table_schema = DATABASE() AND table_name = :table
+""")
+
+_stock_table_ready = False
+_stock_table_lock = threading.Lock()
+
+def ensure_stock_summary_table(engine):
+    """
+    요약 테이블을 프로세스당 1회 준비합니다. 반환: 이번 호출에서 테이블을 새로 만들어 백필했는지 여부
+    테이블이 없으면 생성과 입출고 이력 백필을 한 단계로 실행하므로, 조회/쓰기 중 어느 쪽이 먼저 호출해도
+    요약 테이블이 배포 이후의 증감만 담는 일이 없습니다.
+    (DDL은 암묵적 커밋을 일으키므로 쓰기 트랜잭션 밖에서 호출)
+    """
+    global _stock_table_ready
+    if _stock_table_ready:
+        return False
+    with _stock_table_lock:
+        if _stock_table_ready:
+            return False
+        with engine.connect() as conn:
+            exists = conn.execute(_STOCK_TABLE_EXISTS_SQL, {"table": STOCK_SUMMARY_TABLE}).scalar()
+        if not exists:
+            with engine.begin() as conn:
+                conn.execute(CREATE_STOCK_SUMMARY_SQL)
+            # 다른 프로세스가 그 사이 증감을 반영했어도 이력 전체로 다시 계산
+            with engine.begin() as conn:
+                conn.execute(DELETE_STOCK_SQL)
+                conn.execute(REBUILD_STOCK_SQL)
+        _stock_table_ready = True
+        return not exists
+
+def _ensure_stock_summary_ready():
+    """조회 전 요약 테이블을 확인합니다. 없으면(새 DB) 입출고 이력으로 생성/백필합니다."""
+    if _stock_table_ready:
+        return True
+    engine = connect_to_scm()
+    if engine is None:
+        return False
+    try:
+        ensure_stock_summary_table(engine)
+        return True
+    except Exception as e:
+        runtime.error(f"재고 요약 테이블 준비 실패: {e}")
+        return False
+
+def apply_stock_movements(conn, inout_rows, known=None):
+    """
+    입출고 이력 행들을 재고 요약 증감으로 합산해 같은 트랜잭션(conn)에서 반영합니다.
+    known: {serial_number: (lot, storage_location)} — 없으면 S/N으로 한 번에 조회
+    """
+    known = dict(known or {})
+    missing = sorted({
+        str(r["serial_number"]) for r in inout_rows
+        if r.get("serial_number") not in (None, "", "N/A") and str(r["serial_number"]) not in known
+    })
+    if missing:
+        for row in conn.execute(_STOCK_LOCATION_BY_SERIAL_SQL, {"serials": missing}).mappings():
+            known[str(row["serial_number"])] = (row["lot"], row["storage_location"])
+
+    deltas = {}
+    for r in inout_rows:
+        sign = {"입고": 1, "출고": -1}.get(r.get("type"), 0)
+        if sign == 0:
+            continue
+        lot, location = known.get(str(r.get("serial_number")), (None, None))
+        key = (r["product_code"], lot or "", location or "")
+        entry = deltas.setdefault(key, {"product_name": r.get("product_name"), "delta": 0})
+        entry["delta"] += sign * int(r.get("quantity") or 0)
+
+    params = [
+        {"product_code": k[0], "lot": k[1], "storage_location": k[2], **v}
+        for k, v in deltas.items() if v["delta"] != 0
+    ]
+    if params:
+        conn.execute(UPSERT_STOCK_SQL, params)
+
+def rebuild_stock_summary() -> bool:
+    """입출고 이력 전체로 재고 요약 테이블을 다시 계산합니다. (백필/불일치 복구용)"""
+    engine = connect_to_scm()
+    if engine is None:
+        return False
+    try:
+        if ensure_stock_summary_table(engine):
+            return True  # 방금 생성하면서 백필함
+        with engine.begin() as conn:
+            conn.execute(DELETE_STOCK_SQL)
+            conn.execute(REBUILD_STOCK_SQL)
+        return True
+    except Exception as e:
+        runtime.error(f"재고 요약 재계산 실패: {e}")
+        return False
+
+def load_stock_summary(group_by: str = "product") -> pd.DataFrame:
+    """
+    재고 요약 조회 (이력 전체를 스캔하지 않고 요약 테이블만 사용)
+    group_by: "product" → 제품별, "location" → 보관위치별, "detail" → 제품/LOT/보관위치별
+    """
+    # LOT/보관위치를 알 수 없는 출고('')는 '미지정'으로 묶어 표시
+    lot = f"COALESCE(NULLIF(lot, ''), '{UNASSIGNED_LABEL}')"
+    location = f"COALESCE(NULLIF(storage_location, ''), '{UNASSIGNED_LABEL}')"
+    group_cols = {
+        "product": "product_code, MAX(product_name) AS product_name",
+        "location": f"{location} AS storage_location",
+        "detail": f"product_code, {lot} AS lot, {location} AS storage_location, MAX(product_name) AS product_name",
+    }[group_by]
+    group_keys = {
+        "product": "product_code",
+        "location": location,
+        "detail": f"product_code, {lot}, {location}",
+    }[group_by]
+    query = text(f"""
+        SELECT {group_cols}, SUM(quantity) AS quantity
+        FROM `{STOCK_SUMMARY_TABLE}`
+        GROUP BY {group_keys}
+        HAVING SUM(quantity) <> 0
+        ORDER BY quantity DESC
     """)
 
+    engine = connect_to_scm_read()
+    if engine is None or not _ensure_stock_summary_ready():
+        return pd.DataFrame()
+    try:
+        with engine.connect() as conn:
+            return pd.read_sql(query, conn)
+    except Exception as e:
+        runtime.error(f"재고 요약 조회 실패: {e}")
+        return pd.DataFrame()
+
+# =========================
+# ⑤ 보관위치 점유 현황
+# =========================
+# 보관위치별 현재 재고(S/N 기준, 출고 이력이 없는 일련번호) 수를 한 번의 GROUP BY로 집계
+LOCATION_OCCUPANCY_SQL = text("""
+    SELECT s.storage_location, COUNT(*) AS quantity
+    FROM `Retained_sample_status` s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM `Retained_sample_in_out` o
+        WHERE o.serial_number = s.serial_number AND o.`type` = '출고'
+    )
+    GROUP BY s.storage_location
+""")
+
+def load_location_occupancy():
+    """{보관위치: 현재 재고 수} 를 반환합니다. 실패 시 None."""
+    engine = connect_to_scm_read()
+    if engine is None:
+        return None
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(LOCATION_OCCUPANCY_SQL).all()
+        return {str(location): int(quantity) for location, quantity in rows if location}
+    except Exception as e:
+        runtime.error(f"보관위치 점유 현황 조회 실패: {e}")
+        return None
+
+# =========================
+# ⑥ 로그인 세션 폐기 목록 (로그아웃한 세션 쿠키를 모든 워커/재시작 후에도 거부)
+# =========================
+SESSION_REVOCATION_TABLE = "auth_session_revocations"
+
+CREATE_SESSION_REVOCATION_SQL = text(f"""
+    CREATE TABLE IF NOT EXISTS `{SESSION_REVOCATION_TABLE}` (
+        `session_id` VARCHAR(64) NOT NULL PRIMARY KEY,
+        `expires_at` BIGINT NOT NULL
+    )
+""")
+
+_DELETE_SESSION_REVOCATION_SQL = text(f"""
+    DELETE FROM `{SESSION_REVOCATION_TABLE}` WHERE `session_id` = :session_id OR `expires_at` < :now
+""")
+
+_INSERT_SESSION_REVOCATION_SQL = text(f"""
+    INSERT INTO `{SESSION_REVOCATION_TABLE}` (`session_id`, `expires_at`) VALUES (:session_id, :expires_at)
+""")
+
+_SESSION_REVOKED_SQL = text(f"""
+    SELECT 1 FROM `{SESSION_REVOCATION_TABLE}` WHERE `session_id` = :session_id AND `expires_at` >= :now
+""")
+
+_revocation_table_ready = False
+_revocation_table_lock = threading.Lock()
+
+def _ensure_revocation_table(engine):
+    """폐기 목록 테이블을 프로세스당 1회 생성합니다. (DDL은 쓰기 트랜잭션 밖에서 실행)"""
+    global _revocation_table_ready
+    if _revocation_table_ready:
+        return
+    with _revocation_table_lock:
+        if not _revocation_table_ready:
+            with engine.begin() as conn:
+                conn.execute(CREATE_SESSION_REVOCATION_SQL)
+            _revocation_table_ready = True
+
+def revoke_session(session_id: str, expires_at: int, now: float = None) -> bool:
+    """세션 id를 쿠키 만료 시각까지 폐기 처리합니다. (만료된 항목은 함께 정리) 성공 여부를 반환합니다."""
+    engine = connect_to_scm()
+    if engine is None:
+        return False
     try:
+        _ensure_revocation_table(engine)
         with engine.begin() as conn:
-            conn.execute(query, data)
+            conn.execute(_DELETE_SESSION_REVOCATION_SQL,
+                         {"session_id": session_id, "now": int(now or time.time())})
+            conn.execute(_INSERT_SESSION_REVOCATION_SQL,
+                         {"session_id": session_id, "expires_at": int(expires_at)})
         return True
     except Exception as e:
-        st.error(f"입출고 이력 DB 저장 실패: {e}")
+        runtime.error(f"세션 폐기 저장 실패: {e}")
         return False
+
+def is_session_revoked(session_id: str, now: float = None):
+    """
+    세션 id가 폐기되었는지 확인합니다. 조회 실패 시 None.
+    로그아웃 직후 다른 워커에서도 보여야 하므로 읽기 복제본이 아닌 기본(쓰기) 엔진에서 조회합니다.
+    """
+    engine = connect_to_scm()
+    if engine is None:
+        return None
+    try:
+        _ensure_revocation_table(engine)
+        with engine.connect() as conn:
+            row = conn.execute(_SESSION_REVOKED_SQL,
+                               {"session_id": session_id, "now": int(now or time.time())}).first()
+        return row is not None
+    except Exception as e:
+        runtime.error(f"세션 폐기 여부 조회 실패: {e}")
+        return None
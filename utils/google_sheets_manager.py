@@ -1,27 +1,28 @@
-import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
-import pandas as pd
+from utils import runtime
 
-@st.cache_resource
+# gspread/google-auth는 Sheets 연결 시점에 로드 (페이지 시작 시간 단축)
+gspread = runtime.lazy_import("gspread")
+
+@runtime.cache_resource
 def connect_to_google_sheets():
     """Google Sheets API에 연결하고 클라이언트 객체를 반환합니다."""
+    from google.oauth2.service_account import Credentials
     try:
         scopes = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-        creds = Credentials.from_service_account_info(st.secrets["google_sheets"], scopes=scopes)
+        creds = Credentials.from_service_account_info(runtime.secrets["google_sheets"], scopes=scopes)
         client = gspread.authorize(creds)
         return client
     except Exception as e:
-        st.error(f"Google Sheets 연결 실패: {e}. 'secrets.toml' 설정과 API 권한을 확인하세요.")
+        runtime.error(f"Google Sheets 연결 실패: {e}. 'secrets.toml' 설정과 API 권한을 확인하세요.")
         return None
 
 def get_spreadsheet(_client):
     """설정된 SPREADSHEET_ID로 스프레드시트 객체를 가져옵니다."""
     try:
-        spreadsheet = _client.open_by_key(st.secrets["google_sheets"]["spreadsheet_id"])
+        spreadsheet = _client.open_by_key(runtime.secrets["google_sheets"]["spreadsheet_id"])
         return spreadsheet
     except Exception as e:
-        st.error(f"스프레드시트를 열 수 없습니다: {e}. ID와 공유 설정을 확인하세요.")
+        runtime.error(f"스프레드시트를 열 수 없습니다: {e}. ID와 공유 설정을 확인하세요.")
         return None
 
 def get_worksheet(spreadsheet, sheet_name):
@@ -40,7 +41,7 @@ def get_worksheet(spreadsheet, sheet_name):
             worksheet.append_row(headers)
         return worksheet
     except Exception as e:
-        st.error(f"워크시트 '{sheet_name}' 처리 실패: {e}")
+        runtime.error(f"워크시트 '{sheet_name}' 처리 실패: {e}")
         return None
 
 def get_next_serial_number(worksheet):
@@ -51,38 +52,80 @@ def get_next_serial_number(worksheet):
         last_serial = max(numeric_serials) if numeric_serials else 0
         return last_serial + 1
     except Exception as e:
-        st.error(f"다음 일련번호 생성 실패: {e}")
+        runtime.error(f"다음 일련번호 생성 실패: {e}")
         return None
 
+def get_row_index(worksheet):
+    """
+    일련번호 → 행 번호 인덱스와 헤더 목록을 시트 전체 값 1회 조회로 만듭니다.
+    다른 사용자/워커가 정렬·삽입·삭제하면 행 번호가 바뀌므로 캐시하지 않고 쓰기 직전에 매번 새로 읽습니다.
+    반환: {"headers": [...], "rows": {serial: row}, "status": {row: 상태}}
+    """
+    values = worksheet.get_all_values()
+    headers = values[0] if values else []
+    status_col = headers.index("상태") if "상태" in headers else None
+    rows, status = {}, {}
+    for row_number, row in enumerate(values[1:], start=2):
+        serial = row[0].strip() if row else ""
+        if serial and serial not in rows:  # 중복 일련번호는 첫 행 우선 (find와 동일)
+            rows[serial] = row_number
+            if status_col is not None and status_col < len(row):
+                status[row_number] = row[status_col]
+    return {"headers": headers, "rows": rows, "status": status}
+
+def update_rows_by_serial(worksheet, updates):
+    """
+    여러 일련번호의 행을 한 번의 batch_update로 업데이트합니다.
+    updates: {일련번호: {헤더명: 값, ...}}
+    반환: {일련번호: "SUCCESS" | "NOT_FOUND" | "ALREADY_SHIPPED" | "ERROR"}
+    API 호출 수: 건수와 무관하게 행 인덱스 조회 1회 + batch_update 1회
+    """
+    results = {}
+    if not updates:
+        return results
+    try:
+        index = get_row_index(worksheet)
+        headers = index["headers"]
+        data = []
+        for serial, update_data in updates.items():
+            row_number = index["rows"].get(str(serial))
+            if row_number is None:
+                results[serial] = "NOT_FOUND"
+                continue
+            if index["status"].get(row_number) == "출고됨":
+                results[serial] = "ALREADY_SHIPPED"
+                continue
+            for col_name, value in update_data.items():
+                if col_name in headers:
+                    data.append({
+                        "range": gspread.utils.rowcol_to_a1(row_number, headers.index(col_name) + 1),
+                        "values": [[value]],
+                    })
+            results[serial] = "SUCCESS"
+
+        if data:
+            worksheet.batch_update(data, value_input_option="USER_ENTERED")
+        return results
+    except Exception as e:
+        runtime.error(f"행 일괄 업데이트 실패: {e}")
+        # 쓰기 전에 확정된 NOT_FOUND/ALREADY_SHIPPED 외에는 모두 실패 처리
+        return {
+            serial: results[serial] if results.get(serial) in ("NOT_FOUND", "ALREADY_SHIPPED") else "ERROR"
+            for serial in updates
+        }
+
 def add_row(worksheet, data):
     """워크시트에 새로운 행을 추가합니다."""
     try:
         worksheet.append_row(data)
         return True
     except Exception as e:
-        st.error(f"행 추가 실패: {e}")
+        runtime.error(f"행 추가 실패: {e}")
         return False
 
 def find_row_and_update(worksheet, serial_number, update_data):
-    """일련번호로 행을 찾아 데이터를 업데이트합니다."""
-    try:
-        cell = worksheet.find(str(serial_number), in_column=1)
-        if not cell: return "NOT_FOUND"
-        
-        row_index = cell.row
-        headers = worksheet.row_values(1)
-        
-        status_col_index = headers.index("상태") + 1
-        if worksheet.cell(row_index, status_col_index).value == "출고됨": return "ALREADY_SHIPPED"
-        
-        for col_name, value in update_data.items():
-            if col_name in headers:
-                col_index = headers.index(col_name) + 1
-                worksheet.update_cell(row_index, col_index, value)
-        return "SUCCESS"
-    except Exception as e:
-        st.error(f"행 업데이트 실패: {e}")
-        return "ERROR"
+    """일련번호로 행을 찾아 데이터를 업데이트합니다. (행 인덱스 조회 1회 + batch_update 1회)"""
+    return update_rows_by_serial(worksheet, {serial_number: update_data}).get(serial_number, "ERROR")
 
 def delete_rows_by_serial(worksheet, serials_to_delete):
     """'재고_현황' 시트에서 제공된 일련번호 목록에 해당하는 행들을 삭제합니다."""
@@ -110,5 +153,5 @@ def delete_rows_by_serial(worksheet, serials_to_delete):
         return True, len(rows_to_delete_indices)
 
     except Exception as e:
-        st.error(f"행 삭제 실패: {e}")
+        runtime.error(f"행 삭제 실패: {e}")
         return False, 0
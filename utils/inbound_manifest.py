@@ -0,0 +1,185 @@
+import io
+import pandas as pd
+
+# 입고 구분 (입고 페이지 selectbox와 동일)
+CATEGORIES = ["관리품", "표준품", "벌크표준", "샘플재고"]
+SAMPLE_CATEGORY = "샘플재고"
+
+# 매니페스트 헤더(한글) → 내부 컬럼명
+MANIFEST_COLUMNS = {
+    "제품코드": "product_code",
+    "바코드": "barcode",  # 선택: 제품코드 대신 제품 바코드로 지정 가능
+    "보관위치": "storage_location",
+    "구분": "category",
+    "LOT": "lot",
+    "유통기한": "expiration_date",
+    "버전": "version",
+    "수량": "quantity",
+}
+REQUIRED_COLUMNS = ["보관위치", "구분"]
+PRODUCT_COLUMNS = ["제품코드", "바코드"]  # 둘 중 하나는 있어야 함
+
+# 한 행의 최대 수량 (오타로 수천 장의 라벨/일련번호가 한 번에 발급되지 않도록)
+MAX_QUANTITY = 500
+
+# 폐기기한 = 유통기한 + 1년 (단건 입고와 동일)
+DISPOSAL_OFFSET = pd.Timedelta(days=365)
+
+
+def manifest_template() -> bytes:
+    """업로드용 CSV 양식(예시 1행 포함)을 반환합니다."""
+    sample = pd.DataFrame([{
+        "제품코드": "P0001", "보관위치": "A-01-01", "구분": "관리품",
+        "LOT": "L2401A", "유통기한": "2027-12-31", "버전": "R0", "수량": 1,
+    }])
+    return sample.to_csv(index=False).encode("utf-8-sig")
+
+
+def read_manifest(uploaded_file) -> pd.DataFrame:
+    """CSV(utf-8/utf-8-sig/cp949) 또는 Excel 파일을 문자열 DataFrame으로 읽습니다."""
+    name = getattr(uploaded_file, "name", "").lower()
+    if name.endswith((".xlsx", ".xls")):
+        return pd.read_excel(uploaded_file, dtype=str)
+
+    raw = uploaded_file.read() if hasattr(uploaded_file, "read") else uploaded_file
+    for encoding in ("utf-8-sig", "cp949"):
+        try:
+            return pd.read_csv(io.BytesIO(raw), dtype=str, encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("CSV 인코딩을 확인하세요. (UTF-8 또는 CP949)")
+
+
+def _lookup_missing(keys, lookup, field):
+    """카탈로그에 없는 키만 일괄 조회 함수로 해석 → {키: field 값}"""
+    keys = [k for k in pd.unique(keys) if pd.notna(k) and k != ""]
+    if not keys or lookup is None:
+        return {}
+    result = lookup(keys)
+    if result is None:
+        raise ValueError("ERP 제품 조회에 실패했습니다. 잠시 후 다시 시도하세요.")
+    return {key: info[field] for key, info in result[0].items()}
+
+def validate_manifest(df: pd.DataFrame, product_df: pd.DataFrame, valid_locations=None,
+                      lookup_codes=None, lookup_barcodes=None):
+    """
+    매니페스트 전체를 한 번에(벡터 연산) 검증합니다.
+    product_df: db_manager.load_product_data() 결과 (제품코드, 제품명, 바코드)
+    valid_locations: 허용 보관위치 목록 (location_manager.generate_location_options) — None이면 형식 검사 생략
+    lookup_codes / lookup_barcodes: 카탈로그에 없는 제품코드/바코드를 한 번에 조회하는 함수
+      (db_manager.find_products_by_codes / find_products_by_barcodes) — None이면 카탈로그만 사용
+    반환: (valid_df, error_df)
+      valid_df: 영문 컬럼 + product_name/disposal_date 채워짐, 수량만큼 행이 펼쳐진 상태
+      error_df: 원본 행 번호(행)와 오류 사유(오류)
+    """
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    missing_cols = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if not any(c in df.columns for c in PRODUCT_COLUMNS):
+        missing_cols.append("/".join(PRODUCT_COLUMNS))
+    if missing_cols:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing_cols)}")
+
+    for col in MANIFEST_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[list(MANIFEST_COLUMNS)].rename(columns=MANIFEST_COLUMNS)
+    df = df.apply(lambda s: s.astype("string").str.strip())
+    df["row_no"] = df.index + 2  # 헤더가 1행이므로 엑셀 기준 행 번호
+
+    # 제품코드가 비어 있으면 바코드로 제품코드 해석 (카탈로그 → 없는 것만 ERP 일괄 조회 1회)
+    has_barcode = df["barcode"].notna() & (df["barcode"] != "")
+    by_barcode = (df["product_code"].isna() | (df["product_code"] == "")) & has_barcode
+    if by_barcode.any():
+        barcode_map = {}
+        if "바코드" in product_df.columns:
+            barcodes = product_df[["바코드", "제품코드"]].dropna().drop_duplicates("바코드")
+            barcode_map = dict(zip(barcodes["바코드"].astype(str).str.strip(), barcodes["제품코드"]))
+        unresolved = df.loc[by_barcode, "barcode"]
+        barcode_map.update(_lookup_missing(unresolved[~unresolved.isin(set(barcode_map))], lookup_barcodes, "resource_code"))
+        df.loc[by_barcode, "product_code"] = df.loc[by_barcode, "barcode"].map(barcode_map)
+
+    # 제품명 매핑 (카탈로그와 한 번에 조인, 카탈로그에 없는 코드만 ERP 일괄 조회 1회)
+    catalog = product_df[["제품코드", "제품명"]].drop_duplicates("제품코드")
+    names = dict(zip(catalog["제품코드"], catalog["제품명"]))
+    unresolved = df["product_code"]
+    names.update(_lookup_missing(unresolved[~unresolved.isin(set(names))], lookup_codes, "resource_name"))
+    df["product_name"] = df["product_code"].map(names)
+
+    is_sample = df["category"] == SAMPLE_CATEGORY
+    expiry = pd.to_datetime(df["expiration_date"], errors="coerce")
+    quantity = pd.to_numeric(df["quantity"].fillna("1"), errors="coerce")
+
+    errors = pd.Series("", index=df.index, dtype="string")
+
+    def flag(mask, message):
+        nonlocal errors
+        mask = mask.fillna(True)
+        errors = errors.where(~mask, errors + message + "; ")
+
+    flag(by_barcode & df["product_code"].isna(), "ERP에 없는 바코드")
+    flag(~by_barcode & (df["product_code"].isna() | (df["product_code"] == "")), "제품코드 누락")
+    flag(df["product_name"].isna() & df["product_code"].notna(), "ERP에 없는 제품코드")
+    flag(df["storage_location"].isna() | (df["storage_location"] == ""), "보관위치 누락")
+    if valid_locations is not None:
+        has_location = df["storage_location"].notna() & (df["storage_location"] != "")
+        flag(has_location & ~df["storage_location"].isin(set(valid_locations)), "등록되지 않은 보관위치")
+    flag(~df["category"].isin(CATEGORIES), "구분 값 오류")
+    flag(~is_sample & (df["lot"].isna() | (df["lot"] == "")), "LOT 누락")
+    flag(~is_sample & expiry.isna(), "유통기한 형식 오류(YYYY-MM-DD)")
+    flag(quantity.isna() | (quantity < 1) | (quantity % 1 != 0), "수량 오류")
+    flag((quantity > MAX_QUANTITY).fillna(False), f"수량 상한({MAX_QUANTITY}) 초과")
+
+    has_error = errors != ""
+    error_df = pd.DataFrame({"행": df.loc[has_error, "row_no"], "오류": errors[has_error].str.rstrip("; ")})
+
+    valid = df[~has_error].copy()
+    v_sample = is_sample[~has_error]
+    v_expiry = expiry[~has_error]
+    valid["lot"] = valid["lot"].where(~v_sample, "SAMPLE")
+    valid["version"] = valid["version"].fillna("R0").where(~v_sample, "N/A")
+    valid["expiration_date"] = v_expiry.dt.strftime("%Y-%m-%d").where(~v_sample, "N/A")
+    valid["disposal_date"] = (v_expiry + DISPOSAL_OFFSET).dt.strftime("%Y-%m-%d").where(~v_sample, "N/A")
+    valid["quantity"] = quantity[~has_error].astype(int)
+
+    # 수량만큼 행을 펼쳐 라벨/일련번호 단위로 변환
+    valid = valid.loc[valid.index.repeat(valid["quantity"])].reset_index(drop=True)
+    return valid.drop(columns=["quantity"]), error_df.reset_index(drop=True)
+
+
+def build_inbound_rows(valid_df: pd.DataFrame, serials, received_at: str):
+    """
+    검증된 매니페스트와 일련번호 목록으로
+    (재고 행 목록, 입출고 이력 행 목록, 라벨 레코드 목록)을 만듭니다.
+    """
+    if len(serials) != len(valid_df):
+        raise ValueError("일련번호 개수가 입고 행 수와 다릅니다.")
+
+    df = valid_df.assign(serial_number=list(serials), received_at=received_at)
+    inventory_rows = df[[
+        "serial_number", "category", "product_code", "product_name", "lot",
+        "expiration_date", "disposal_date", "storage_location", "version", "received_at",
+    ]].to_dict("records")
+
+    inout_rows = pd.DataFrame({
+        "timestamp": received_at,
+        "type": "입고",
+        "serial_number": df["serial_number"].astype(str),
+        "product_code": df["product_code"],
+        "product_name": df["product_name"],
+        "quantity": 1,
+        "handler": "",
+    }).to_dict("records")
+
+    label_records = pd.DataFrame({
+        "serial_number": df["serial_number"],
+        "product_code": df["product_code"],
+        "product_name": df["product_name"],
+        "lot": df["lot"],
+        "expiry": df["expiration_date"],
+        "version": df["version"],
+        "location": df["storage_location"],
+        "category": df["category"],
+    }).to_dict("records")
+
+    return inventory_rows, inout_rows, label_records
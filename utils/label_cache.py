@@ -0,0 +1,231 @@
+import io
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils import runtime
+from utils import barcode_generator
+
+# 캐시 저장 위치와 메모리/디스크 한도 (secrets.toml의 [label_cache]로 변경 가능)
+DEFAULT_CACHE_DIR = ".label_cache"
+DEFAULT_MAX_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_DISK_FILES = 100000
+# 디스크 한도를 넘으면 이 비율 아래로 내려갈 때까지 오래된 파일부터 삭제 (매 저장마다 정리하지 않도록)
+DISK_PRUNE_TARGET = 0.9
+
+# 포맷별 파일 확장자
+FORMAT_EXTENSIONS = {"png": "png", "zpl": "zpl", "tspl": "prn"}
+
+
+def _render_png(label_args, **options):
+    buf = io.BytesIO()
+    barcode_generator.create_barcode_image(*label_args).save(buf, format="PNG")
+    return buf.getvalue()
+
+def _render_zpl(label_args, **options):
+    return barcode_generator.create_label_zpl(*label_args, **options).encode("utf-8")
+
+def _render_tspl(label_args, **options):
+    return barcode_generator.create_label_tspl(*label_args, **options).encode("utf-8")
+
+RENDERERS = {"png": _render_png, "zpl": _render_zpl, "tspl": _render_tspl}
+
+
+def make_label_key(label_args, fmt="png", **options):
+    """
+    라벨 필드 + 출력 포맷/옵션 + 레이아웃 버전으로 SHA-256 키를 만듭니다.
+    같은 내용의 라벨은 언제나 같은 키가 됩니다.
+    """
+    payload = {
+        "layout": barcode_generator.LABEL_LAYOUT_VERSION,
+        "format": fmt,
+        "fields": dict(zip(barcode_generator.LABEL_FIELDS, (str(v) for v in label_args))),
+        "options": options,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LabelCache:
+    """
+    렌더링된 라벨(PNG/ZPL/TSPL 바이트)의 2단 캐시입니다.
+    - 메모리: 바이트 크기 기준 LRU (max_memory_bytes 초과 시 오래된 항목부터 제거)
+    - 디스크: cache_dir/<키 앞 2자리>/<키>.<확장자> (프로세스 재시작 후에도 재사용)
+      max_disk_bytes / max_disk_files를 넘으면 마지막 사용(mtime)이 오래된 파일부터 삭제합니다.
+      여러 프로세스가 같은 디렉터리를 쓰므로 사용량은 추정치로 세다가, 정리할 때 디렉터리를 다시 읽어 맞춥니다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES, max_disk_files=DEFAULT_MAX_DISK_FILES):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_files = max_disk_files
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_usage = None  # (파일 수, 바이트) — 첫 저장 시 디렉터리를 읽어 초기화
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+    def _path(self, key, fmt):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{FORMAT_EXTENSIONS.get(fmt, fmt)}")
+
+    def _remember(self, key, data):
+        """메모리 LRU에 넣고 한도를 넘으면 오래된 항목부터 제거합니다. (lock 보유 상태에서 호출)"""
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def get(self, key, fmt):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return data
+
+        path = self._path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # 최근 사용 표시 (디스크 정리 시 오래된 순서 기준)
+        except OSError:
+            pass
+
+        with self._lock:
+            self._remember(key, data)
+            self.stats["disk_hits"] += 1
+        return data
+
+    def put(self, key, fmt, data):
+        with self._lock:
+            self._remember(key, data)
+
+        path = self._path(key, fmt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 임시 파일에 쓴 뒤 rename 하여 다른 프로세스가 덜 쓰인 파일을 읽지 않도록 함
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # 디스크 캐시 실패는 치명적이지 않으므로 메모리 캐시만 사용
+            runtime.logger.warning("라벨 디스크 캐시 저장 실패: %s", e)
+            return
+        self._track_disk(len(data))
+
+    def _scan_disk(self):
+        """캐시 디렉터리의 [(mtime, 크기, 경로)] 목록"""
+        entries = []
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except OSError:
+            return entries
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+        return entries
+
+    def _track_disk(self, size):
+        """저장한 파일을 사용량에 더하고, 한도를 넘으면 정리합니다. (같은 키 덮어쓰기도 더하지만 정리 시 바로잡힘)"""
+        if self._disk_usage is None:
+            entries = self._scan_disk()  # 방금 저장한 파일 포함
+            usage = (len(entries), sum(e[1] for e in entries))
+        with self._lock:
+            if self._disk_usage is None:
+                self._disk_usage = usage
+            else:
+                files, total = self._disk_usage
+                self._disk_usage = (files + 1, total + size)
+            files, total = self._disk_usage
+        if files > self.max_disk_files or total > self.max_disk_bytes:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """
+        디스크 사용량이 한도의 DISK_PRUNE_TARGET 비율 아래가 될 때까지 오래된 파일부터 삭제합니다.
+        다른 스레드가 정리 중이면 바로 반환합니다. 반환: 삭제한 파일 수
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            entries = sorted(self._scan_disk())
+            files, total = len(entries), sum(e[1] for e in entries)
+            max_files = int(self.max_disk_files * DISK_PRUNE_TARGET)
+            max_bytes = int(self.max_disk_bytes * DISK_PRUNE_TARGET)
+            removed = 0
+            for _, size, path in entries:
+                if files <= max_files and total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # 다른 프로세스가 먼저 삭제
+                except OSError as e:
+                    runtime.logger.warning("라벨 디스크 캐시 삭제 실패: %s", e)
+                    continue
+                files -= 1
+                total -= size
+                removed += 1
+            with self._lock:
+                self._disk_usage = (files, total)
+                self.stats["disk_evictions"] += removed
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def get_or_render(self, label_args, fmt="png", **options):
+        """캐시에 있으면 그대로, 없으면 렌더링 후 저장하여 라벨 바이트를 반환합니다."""
+        if fmt not in RENDERERS:
+            raise ValueError(f"지원하지 않는 라벨 포맷입니다: {fmt}")
+        key = make_label_key(label_args, fmt, **options)
+        data = self.get(key, fmt)
+        if data is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            data = RENDERERS[fmt](label_args, **options)
+            self.put(key, fmt, data)
+        return data
+
+    def memory_usage(self):
+        with self._lock:
+            return {"entries": len(self._memory), "bytes": self._memory_bytes}
+
+
+@runtime.cache_resource
+def get_label_cache():
+    """프로세스 전체에서 공유하는 라벨 캐시를 반환합니다."""
+    try:
+        cfg = runtime.secrets.get("label_cache") or {}
+    except Exception:
+        cfg = {}
+    return LabelCache(
+        cache_dir=cfg.get("dir", DEFAULT_CACHE_DIR),
+        max_memory_bytes=int(cfg.get("max_memory_mb", DEFAULT_MAX_MEMORY_BYTES // (1024 * 1024))) * 1024 * 1024,
+        max_disk_bytes=int(cfg.get("max_disk_mb", DEFAULT_MAX_DISK_BYTES // (1024 * 1024))) * 1024 * 1024,
+        max_disk_files=int(cfg.get("max_disk_files", DEFAULT_MAX_DISK_FILES)),
+    )
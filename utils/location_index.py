@@ -0,0 +1,87 @@
+import time
+import threading
+
+from utils import runtime
+from utils import db_manager
+
+# DB 재집계 주기(초): 다른 프로세스/직접 수정분을 반영하기 위한 주기적 동기화
+DEFAULT_TTL = 300
+
+
+class LocationOccupancy:
+    """
+    보관위치 → 현재 재고 수 인덱스 (프로세스 전체 공유)
+    - 처음과 ttl마다 db_manager.load_location_occupancy() 한 번의 GROUP BY 쿼리로 전체를 다시 만듭니다.
+    - 그 사이의 입고/출고는 add/remove로 메모리에서 바로 반영하므로 화면마다 DB를 집계하지 않습니다.
+    """
+
+    def __init__(self, load_counts, ttl=DEFAULT_TTL):
+        self._load_counts = load_counts
+        self.ttl = ttl
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.loaded_at = 0.0
+        self.stats = {"reloads": 0, "increments": 0}
+
+    def refresh(self, force=False):
+        """ttl이 지났으면(또는 force) DB에서 다시 집계합니다. 실패하면 기존 값을 유지합니다."""
+        if not force and self.loaded_at and time.monotonic() - self.loaded_at < self.ttl:
+            return False
+        counts = self._load_counts()
+        with self._lock:
+            self.loaded_at = time.monotonic()
+            if counts is None:
+                return False
+            self._counts = counts
+            self.stats["reloads"] += 1
+        return True
+
+    def _add(self, locations, sign):
+        with self._lock:
+            for location in locations:
+                if not location:
+                    continue
+                count = self._counts.get(location, 0) + sign
+                if count > 0:
+                    self._counts[location] = count
+                else:
+                    self._counts.pop(location, None)
+                self.stats["increments"] += 1
+
+    def add(self, locations):
+        """입고된 라벨의 보관위치 목록을 반영합니다."""
+        self._add(locations, 1)
+
+    def remove(self, locations):
+        """출고된 S/N의 보관위치 목록을 반영합니다."""
+        self._add(locations, -1)
+
+    def counts(self):
+        """{보관위치: 재고 수} 사본을 반환합니다."""
+        self.refresh()
+        with self._lock:
+            return dict(self._counts)
+
+    def count(self, location):
+        self.refresh()
+        return self._counts.get(location, 0)
+
+
+@runtime.cache_resource
+def get_location_occupancy():
+    """프로세스 전체에서 공유하는 보관위치 점유 인덱스를 반환합니다."""
+    try:
+        cfg = runtime.secrets.get("location_index") or {}
+    except Exception:
+        cfg = {}
+    return LocationOccupancy(db_manager.load_location_occupancy, ttl=int(cfg.get("ttl", DEFAULT_TTL)))
+
+def record_inbound(inventory_rows):
+    """입고 저장 후 호출: 재고 행들의 보관위치 점유 수를 올립니다."""
+    get_location_occupancy().add(row["storage_location"] for row in inventory_rows)
+
+def record_outbound(results):
+    """출고 저장 후 호출: insert_outbound_batch 결과 중 성공한 S/N의 보관위치 점유 수를 내립니다."""
+    get_location_occupancy().remove(
+        r["storage_location"] for r in results if r.get("ok") and r.get("storage_location")
+    )
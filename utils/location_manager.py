@@ -1,10 +1,32 @@
-import streamlit as st
+import copy
 import json
 import os
+import tempfile
+import threading
+import contextlib
+import functools
+
+from utils import runtime
+
+# 히트맵(occupancy_grid)에서만 사용
+np = runtime.lazy_import("numpy")
+pd = runtime.lazy_import("pandas")
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # 설정 파일 경로
 CONFIG_FILE = "zone_config.json"
 
+# 파싱된 설정 캐시: 파일 (inode, mtime_ns, size)가 바뀔 때만 다시 읽음
+_cache = {"stamp": None, "config": None, "version": 0}
+_cache_lock = threading.Lock()
+_write_lock = threading.Lock()
+_options_cache = {"version": None, "options": ()}
+
 def get_default_config():
     """기본 보관위치 설정을 반환합니다."""
     return {
@@ -14,37 +36,199 @@ def get_default_config():
         }
     }
 
-def load_config():
-    """zone_config.json 파일을 읽어 설정을 반환합니다. 파일이 없으면 기본값으로 새로 만듭니다."""
-    if not os.path.exists(CONFIG_FILE):
+def _read_config_file():
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _file_stamp():
+    """파일 변경 감지용 (inode, mtime_ns, size). rename으로 교체되면 inode가 바뀝니다. 파일이 없으면 None."""
+    try:
+        stat = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+@contextlib.contextmanager
+def _config_lock():
+    """
+    설정 파일 쓰기 잠금: 프로세스 안에서는 스레드 락, 프로세스 간에는 <CONFIG_FILE>.lock 파일 잠금.
+    """
+    with _write_lock:
+        with open(CONFIG_FILE + ".lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _write_config_file(config):
+    """임시 파일에 쓴 뒤 rename 하여, 다른 세션이 덜 쓰인 파일을 읽지 않도록 합니다."""
+    directory = os.path.dirname(os.path.abspath(CONFIG_FILE))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".zone_config.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _cached_config():
+    """파일의 mtime/size가 바뀌었을 때만 다시 읽어 파싱한 설정(공유 객체)을 반환합니다."""
+    stamp = _file_stamp()
+    if stamp is None:
         config = get_default_config()
         save_config(config)
-        return config
+        stamp = _file_stamp()
+        if stamp is None:
+            return config
+    if _cache["stamp"] == stamp:
+        return _cache["config"]
+
+    with _cache_lock:
+        if _cache["stamp"] != stamp:
+            config = _read_config_file()
+            _cache.update(stamp=stamp, config=config, version=_cache["version"] + 1)
+        return _cache["config"]
+
+def load_config():
+    """
+    보관위치 설정을 반환합니다. 파일이 없으면 기본값으로 새로 만듭니다.
+    파일이 바뀌지 않았으면 다시 읽지 않고 캐시된 설정의 사본을 돌려줍니다. (호출 측에서 수정해도 안전)
+    """
     try:
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return copy.deepcopy(_cached_config())
     except (IOError, json.JSONDecodeError):
-        st.error("보관위치 설정 파일을 읽는 데 실패했습니다. 기본 설정으로 복원합니다.")
+        runtime.error("보관위치 설정 파일을 읽는 데 실패했습니다. 기본 설정으로 복원합니다.")
         return get_default_config()
 
+def config_version():
+    """설정 파일이 다시 읽힐 때마다 증가하는 버전 번호"""
+    try:
+        _cached_config()
+    except (IOError, json.JSONDecodeError):
+        pass
+    return _cache["version"]
+
 def save_config(config):
-    """설정 내용을 zone_config.json 파일에 저장합니다."""
+    """설정 내용을 zone_config.json 파일에 원자적으로 저장합니다. (파일 잠금)"""
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        with _config_lock():
+            _write_config_file(config)
         return True
     except IOError:
-        st.error("보관위치 설정 파일을 저장하는 데 실패했습니다.")
+        runtime.error("보관위치 설정 파일을 저장하는 데 실패했습니다.")
         return False
 
+def update_config(mutate):
+    """
+    잠금을 잡은 상태에서 최신 설정을 읽어 mutate(config)를 적용하고 저장합니다.
+    여러 세션이 동시에 구역을 수정해도 서로의 변경을 덮어쓰지 않습니다.
+    mutate가 False를 반환하면 저장하지 않습니다. 반환: 저장 여부
+    """
+    try:
+        with _config_lock():
+            config = _read_config_file() if _file_stamp() is not None else get_default_config()
+            if mutate(config) is False:
+                return False
+            _write_config_file(config)
+        return True
+    except (IOError, json.JSONDecodeError):
+        runtime.error("보관위치 설정 파일을 저장하는 데 실패했습니다.")
+        return False
+
+def format_location(zone, row, column):
+    """('A', 1, 2) → 'A-01-02' (보관위치 표준 형식)"""
+    return f"{zone}-{row:02d}-{column:02d}"
+
+@functools.lru_cache(maxsize=8)
+def _location_options(zone_specs):
+    return tuple(
+        format_location(code, r, c)
+        for code, rows, columns in zone_specs
+        for r in range(1, rows + 1)
+        for c in range(1, columns + 1)
+    )
+
+def _zone_specs(config):
+    return tuple(
+        (code, details.get("rows", 1), details.get("columns", 1))
+        for code, details in config.get("zones", {}).items()
+    )
+
 def generate_location_options(config):
-    """설정 파일 기반으로 보관위치 드롭다운 목록을 생성합니다."""
-    options = []
-    zones = config.get("zones", {})
-    for code, details in zones.items():
+    """설정 파일 기반으로 보관위치 드롭다운 목록을 생성합니다. (같은 구역 구성이면 메모이즈된 결과 사용)"""
+    return list(_location_options(_zone_specs(config)))
+
+def get_location_options():
+    """
+    현재 설정 버전의 보관위치 목록 (읽기 전용 tuple, 설정이 바뀔 때만 다시 생성)
+    설정 파일을 읽지 못하면 마지막으로 읽은 목록(없으면 기본 설정 목록)을 반환합니다.
+    """
+    version = config_version()
+    if _options_cache["version"] != version:
+        try:
+            config = _cached_config()
+        except (IOError, json.JSONDecodeError):
+            runtime.error("보관위치 설정 파일을 읽는 데 실패했습니다. 마지막으로 읽은 보관위치 목록을 사용합니다.")
+            return _options_cache["options"] or _location_options(_zone_specs(get_default_config()))
+        _options_cache.update(version=version, options=_location_options(_zone_specs(config)))
+    return _options_cache["options"]
+
+def parse_location(location):
+    """'A-01-02' → ('A', 1, 2). 형식이 맞지 않으면 None."""
+    parts = str(location).strip().split("-")
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    return parts[0], int(parts[1]), int(parts[2])
+
+def is_valid_location(config, location):
+    """
+    설정된 구역/행/열 범위 안의 표준 형식('A-01-02') 보관위치인지 확인합니다.
+    'A-1-2'처럼 0이 채워지지 않은 값은 보관위치 목록·히트맵과 일치하지 않으므로 유효하지 않습니다.
+    """
+    parsed = parse_location(location)
+    if parsed is None or format_location(*parsed) != location:
+        return False
+    zone = config.get("zones", {}).get(parsed[0])
+    if zone is None:
+        return False
+    return 1 <= parsed[1] <= zone.get("rows", 1) and 1 <= parsed[2] <= zone.get("columns", 1)
+
+def suggest_location(options, counts):
+    """재고가 가장 적은 보관위치를 추천합니다. (동률이면 목록 순서상 앞쪽) 목록이 비면 None."""
+    if not options:
+        return None
+    return min(options, key=lambda loc: counts.get(loc, 0))
+
+def occupancy_grid(config, counts):
+    """
+    구역별 점유 현황을 히트맵용 DataFrame(구역, 행, 열, 보관위치, 재고)으로 반환합니다.
+    counts: {보관위치: 재고 수} — 그리드 밖의 위치는 제외됩니다.
+    """
+    frames = []
+    for code, details in config.get("zones", {}).items():
         rows = details.get("rows", 1)
         columns = details.get("columns", 1)
-        for r in range(1, rows + 1):
-            for c in range(1, columns + 1):
-                options.append(f"{code}-{r:02d}-{c:02d}")
-    return options
+        grid_rows = np.repeat(np.arange(1, rows + 1), columns)
+        grid_cols = np.tile(np.arange(1, columns + 1), rows)
+        locations = [format_location(code, r, c) for r, c in zip(grid_rows, grid_cols)]
+        frames.append(pd.DataFrame({
+            "구역": code,
+            "행": grid_rows,
+            "열": grid_cols,
+            "보관위치": locations,
+            "재고": [counts.get(loc, 0) for loc in locations],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["구역", "행", "열", "보관위치", "재고"])
+    return pd.concat(frames, ignore_index=True)
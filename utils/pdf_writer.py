@@ -0,0 +1,105 @@
+import zlib
+
+# 라벨 원본 해상도: 480x320 px = 30x20 mm  →  16 px/mm (≈ 406.4 dpi)
+LABEL_DPI = 406.4
+
+
+class LabelPdfWriter:
+    """
+    라벨 이미지를 한 장씩 페이지로 추가하는 최소 구현 PDF 작성기입니다.
+    - 페이지마다 바로 파일에 기록하므로 메모리 사용량이 페이지 수와 무관합니다.
+    - 이미지는 FlateDecode(무손실)로 저장하여 바코드 경계가 흐려지지 않습니다.
+
+    사용 예:
+        with open("labels.pdf", "wb") as f, LabelPdfWriter(f) as pdf:
+            pdf.add_page(label_img)
+    """
+
+    # 1: Catalog, 2: Pages (Kids 목록은 close 시점에 기록)
+    _CATALOG_ID, _PAGES_ID = 1, 2
+
+    def __init__(self, fp, dpi=LABEL_DPI):
+        self._fp = fp
+        self._dpi = dpi
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 3
+        self._pos = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _write(self, data):
+        self._fp.write(data)
+        self._pos += len(data)
+
+    def _alloc_id(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_obj(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._pos
+        self._write(f"{obj_id} 0 obj\n".encode("ascii"))
+        self._write(body.encode("ascii"))
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_page(self, image):
+        """PIL 이미지 한 장을 새 페이지로 추가합니다. (흑백/회색조는 L, 그 외는 RGB로 저장)"""
+        if image.mode in ("1", "L", "LA"):
+            image = image.convert("L")
+            colorspace = "/DeviceGray"
+        else:
+            image = image.convert("RGB")
+            colorspace = "/DeviceRGB"
+
+        width, height = image.size
+        page_w = width * 72.0 / self._dpi
+        page_h = height * 72.0 / self._dpi
+        data = zlib.compress(image.tobytes(), 6)
+
+        image_id, content_id, page_id = self._alloc_id(), self._alloc_id(), self._alloc_id()
+        self._write_obj(
+            image_id,
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode /Length {len(data)} >>",
+            data,
+        )
+        content = f"q {page_w:.3f} 0 0 {page_h:.3f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_obj(content_id, f"<< /Length {len(content)} >>", content)
+        self._write_obj(
+            page_id,
+            f"<< /Type /Page /Parent {self._PAGES_ID} 0 R /MediaBox [0 0 {page_w:.3f} {page_h:.3f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>",
+        )
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Pages/Catalog 객체와 xref 테이블을 기록하여 PDF를 마무리합니다."""
+        kids = " ".join(f"{pid} 0 R" for pid in self._page_ids)
+        self._write_obj(self._PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>")
+        self._write_obj(self._CATALOG_ID, f"<< /Type /Catalog /Pages {self._PAGES_ID} 0 R >>")
+
+        xref_pos = self._pos
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self._offsets.get(obj_id, 0):010d} 00000 n \n")
+        self._write("".join(lines).encode("ascii"))
+        self._write(
+            f"trailer\n<< /Size {size} /Root {self._CATALOG_ID} 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n".encode("ascii")
+        )
+        self._fp.flush()
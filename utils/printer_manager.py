@@ -0,0 +1,71 @@
+import socket
+
+from utils import runtime
+from utils import barcode_generator
+
+# 라벨 프린터 RAW 인쇄 포트 (JetDirect)
+DEFAULT_PRINTER_PORT = 9100
+
+# 지원하는 프린터 언어별 라벨 생성 함수
+LABEL_BUILDERS = {
+    "zpl": barcode_generator.create_label_zpl,
+    "tspl": barcode_generator.create_label_tspl,
+}
+
+def get_printer_config():
+    """
+    secrets.toml의 [label_printer] 설정을 반환합니다. 설정이 없으면 None.
+    예)
+      [label_printer]
+      host = "192.168.0.50"
+      port = 9100
+      language = "zpl"   # 또는 "tspl"
+      dpmm = 8           # 203dpi=8, 300dpi=12
+    """
+    try:
+        cfg = runtime.secrets.get("label_printer")
+    except Exception:
+        return None
+    if not cfg or not cfg.get("host"):
+        return None
+    return {
+        "host": cfg["host"],
+        "port": int(cfg.get("port", DEFAULT_PRINTER_PORT)),
+        "language": str(cfg.get("language", "zpl")).lower(),
+        "dpmm": int(cfg.get("dpmm", 8)),
+        "timeout": float(cfg.get("timeout", 5)),
+    }
+
+def build_label_payload(label_args, language="zpl", dpmm=8, copies=1):
+    """create_barcode_image와 같은 인자 목록으로 프린터 명령어 문자열을 생성합니다."""
+    builder = LABEL_BUILDERS.get(language)
+    if builder is None:
+        raise ValueError(f"지원하지 않는 프린터 언어입니다: {language}")
+    return builder(*label_args, dpmm=dpmm, copies=copies)
+
+def send_raw(payload, host, port=DEFAULT_PRINTER_PORT, timeout=5.0):
+    """
+    RAW TCP(기본 9100 포트)로 프린터에 명령어를 전송합니다.
+    로컬에서 socket 서버를 띄워 host="127.0.0.1"로 지정하면 실제 프린터 없이 확인할 수 있습니다.
+    반환: 전송한 바이트 수
+    """
+    data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(data)
+        # 전송 완료를 알려 프린터(또는 테스트 서버)가 수신을 마무리하도록 함
+        sock.shutdown(socket.SHUT_WR)
+    return len(data)
+
+def print_label(label_args, copies=1, config=None):
+    """설정된 라벨 프린터로 라벨을 바로 출력합니다. 성공 여부를 반환합니다."""
+    config = config or get_printer_config()
+    if config is None:
+        runtime.error("라벨 프린터 설정([label_printer])이 없습니다.")
+        return False
+    try:
+        payload = build_label_payload(label_args, config["language"], config["dpmm"], copies)
+        send_raw(payload, config["host"], config["port"], config["timeout"])
+        return True
+    except Exception as e:
+        runtime.error(f"라벨 프린터 전송 실패 ({config['host']}:{config['port']}): {e}")
+        return False
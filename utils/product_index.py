@@ -0,0 +1,233 @@
+import time
+import threading
+from collections import OrderedDict
+
+from utils import runtime
+from utils import db_manager
+
+# 카탈로그 재조회 주기(초)와 미등록 바코드 캐시 유지 시간(초)
+DEFAULT_TTL = 600
+DEFAULT_NEGATIVE_TTL = 300
+# 미등록 바코드 캐시 최대 항목 수 (잘못된 스캔이 계속 들어와도 메모리가 늘어나지 않도록)
+DEFAULT_NEGATIVE_MAX = 10000
+
+
+def _normalize(barcode):
+    return str(barcode).strip() if barcode is not None else ""
+
+
+class ProductIndex:
+    """
+    바코드 → 제품 정보 해시 인덱스 (프로세스 전체 공유)
+    - ERP 제품 목록(load_product_data와 동일)으로 만들어 스캔 조회를 메모리에서 처리합니다.
+    - ttl이 지나면 제품 목록을 다시 읽어 바뀐 항목만 인덱스에 반영합니다. (조회는 갱신 중에도 기존 인덱스 사용)
+    - 인덱스에 없는 바코드만 ERP DB로 조회하고, DB에도 없으면 negative_ttl 동안 다시 조회하지 않습니다.
+      (DB 오류는 미등록으로 캐시하지 않음: 일시 장애 동안 실제 제품이 '미등록'으로 고정되지 않도록)
+      (미등록 캐시는 최대 negative_max개, 넘치면 가장 오래된 항목부터 제거)
+    반환 형식은 db_manager.find_product_info_by_barcode와 같습니다: {'resource_code', 'resource_name'}
+    """
+
+    def __init__(self, initial_catalog, fetch_catalog, fallback_lookup, fallback_bulk_lookup=None,
+                 ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL, negative_max=DEFAULT_NEGATIVE_MAX):
+        self._fetch_catalog = fetch_catalog
+        self._fallback_lookup = fallback_lookup
+        self._fallback_bulk_lookup = fallback_bulk_lookup  # 바코드 목록 → (dict, missing) 또는 None
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_max = negative_max
+
+        self._index = {}       # 카탈로그 기반 인덱스
+        self._extra = {}       # 카탈로그 밖에서 DB 조회로 찾은 바코드 (갱신 시 초기화)
+        self._negative = OrderedDict()  # 미등록 바코드 → 만료 시각 (등록 순 = 만료 순)
+        self._negative_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.loaded_at = 0.0
+        self.stats = {"hits": 0, "negative_hits": 0, "db_lookups": 0, "refreshes": 0, "last_changes": 0}
+
+        if initial_catalog is not None and not initial_catalog.empty:
+            self._index = self._build(initial_catalog)
+            self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _build(catalog):
+        """제품 목록 DataFrame(제품코드, 제품명, 바코드)에서 바코드 인덱스를 만듭니다."""
+        if "바코드" not in catalog.columns:
+            return {}
+        index = {}
+        for code, name, barcode in zip(catalog["제품코드"], catalog["제품명"], catalog["바코드"]):
+            key = _normalize(barcode)
+            if key and key.lower() != "nan" and key not in index:  # 중복 바코드는 첫 행 우선 (LIMIT 1과 동일)
+                index[key] = {"resource_code": code, "resource_name": name}
+        return index
+
+    def _apply(self, new_index):
+        """새 카탈로그와의 차이(추가/변경/삭제)만 현재 인덱스에 반영하고 변경 건수를 반환합니다."""
+        changes = 0
+        for key in [k for k in self._index if k not in new_index]:
+            del self._index[key]
+            changes += 1
+        for key, info in new_index.items():
+            if self._index.get(key) != info:
+                self._index[key] = info
+                self._forget_missing(key)
+                changes += 1
+        return changes
+
+    def _remember_missing(self, key):
+        """미등록 바코드를 negative_ttl 동안 캐시합니다. (최대 negative_max개)"""
+        with self._negative_lock:
+            self._negative.pop(key, None)
+            self._negative[key] = time.monotonic() + self.negative_ttl
+            while len(self._negative) > self.negative_max:
+                self._negative.popitem(last=False)
+
+    def _forget_missing(self, key):
+        with self._negative_lock:
+            self._negative.pop(key, None)
+
+    def _prune_missing(self):
+        """만료된 미등록 항목을 앞에서부터 제거합니다."""
+        now = time.monotonic()
+        with self._negative_lock:
+            while self._negative and next(iter(self._negative.values())) <= now:
+                self._negative.popitem(last=False)
+
+    def refresh(self, force=False):
+        """ttl이 지났으면(또는 force) 카탈로그를 다시 읽어 인덱스를 갱신합니다. 동시에 한 스레드만 갱신합니다."""
+        if not force and time.monotonic() - self.loaded_at < self.ttl:
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            catalog = self._fetch_catalog()
+            if catalog is None or catalog.empty:
+                # 조회 실패 시 기존 인덱스를 유지하고, 매 조회마다 재시도하지 않도록 다음 주기까지 대기
+                self.loaded_at = time.monotonic()
+                return False
+            self.stats["last_changes"] = self._apply(self._build(catalog))
+            self._extra = {}
+            self._prune_missing()
+            self.loaded_at = time.monotonic()
+            self.stats["refreshes"] += 1
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def lookup(self, barcode):
+        """바코드로 제품 정보를 조회합니다. 없으면 None."""
+        key = _normalize(barcode)
+        if not key:
+            return None
+        self.refresh()
+
+        info = self._index.get(key) or self._extra.get(key)
+        if info is not None:
+            self.stats["hits"] += 1
+            return dict(info)
+
+        expires = self._negative.get(key)
+        if expires is not None:
+            if expires > time.monotonic():
+                self.stats["negative_hits"] += 1
+                return None
+            self._forget_missing(key)
+
+        # 인덱스에 없는 바코드만 DB 조회 (브랜드 필터 밖 제품 등)
+        found = self._fallback_many([key])
+        if found is None:
+            # DB 오류: 실제 제품일 수 있으므로 미등록으로 캐시하지 않고 다음 조회 때 다시 시도
+            return None
+        info = found.get(key)
+        if info:
+            self._extra[key] = {"resource_code": info.get("resource_code"), "resource_name": info.get("resource_name")}
+            return dict(self._extra[key])
+        self._remember_missing(key)
+        return None
+
+    def lookup_many(self, barcodes):
+        """
+        여러 바코드를 한 번에 조회합니다. 반환: {바코드: 제품 정보 또는 None} (입력 순서, 중복 제거)
+        인덱스에 없는 바코드만 모아 fallback_bulk_lookup(IN 쿼리) 한 번으로 조회합니다.
+        """
+        self.refresh()
+        now = time.monotonic()
+        results, misses = {}, []
+        for barcode in barcodes:
+            key = _normalize(barcode)
+            if not key or key in results:
+                continue
+            info = self._index.get(key) or self._extra.get(key)
+            if info is not None:
+                self.stats["hits"] += 1
+                results[key] = dict(info)
+            elif self._negative.get(key, 0) > now:
+                self.stats["negative_hits"] += 1
+                results[key] = None
+            else:
+                results[key] = None
+                misses.append(key)
+
+        if misses:
+            found = self._fallback_many(misses)
+            if found is None:
+                # DB 오류: 미등록으로 캐시하지 않고 다음 조회 때 다시 시도
+                return results
+            for key in misses:
+                info = found.get(key)
+                if info:
+                    self._extra[key] = {"resource_code": info.get("resource_code"), "resource_name": info.get("resource_name")}
+                    self._forget_missing(key)
+                    results[key] = dict(self._extra[key])
+                else:
+                    self._remember_missing(key)
+        return results
+
+    def _fallback_many(self, keys):
+        """
+        인덱스에 없는 바코드 목록 조회 → {바코드: 제품 정보} (DB 오류 시 None)
+        fallback_bulk_lookup은 오류 시 None을, fallback_lookup은 오류 시 예외를 내야 미등록과 구분됩니다.
+        """
+        if self._fallback_bulk_lookup is not None:
+            self.stats["db_lookups"] += 1
+            result = self._fallback_bulk_lookup(keys)
+            return None if result is None else result[0]
+        self.stats["db_lookups"] += len(keys)
+        found = {}
+        try:
+            for key in keys:
+                info = self._fallback_lookup(key)
+                if info:
+                    found[key] = info
+        except Exception as e:
+            runtime.error(f"ERP 바코드 조회 실패: {e}")
+            return None
+        return found
+
+    def __len__(self):
+        return len(self._index)
+
+
+@runtime.cache_resource
+def get_product_index():
+    """프로세스 전체에서 공유하는 바코드 인덱스를 반환합니다."""
+    try:
+        cfg = runtime.secrets.get("product_index") or {}
+    except Exception:
+        cfg = {}
+    return ProductIndex(
+        db_manager.load_product_data(),
+        db_manager.fetch_product_catalog,
+        db_manager.find_product_info_by_barcode,
+        db_manager.find_products_by_barcodes,
+        ttl=int(cfg.get("ttl", DEFAULT_TTL)),
+        negative_ttl=int(cfg.get("negative_ttl", DEFAULT_NEGATIVE_TTL)),
+        negative_max=int(cfg.get("negative_max", DEFAULT_NEGATIVE_MAX)),
+    )
+
+def find_product_by_barcode(barcode):
+    """스캔용 바코드 조회 (메모리 인덱스 우선, 없으면 ERP DB). 반환 형식은 find_product_info_by_barcode와 동일."""
+    return get_product_index().lookup(barcode)
+
+def find_products_by_barcodes(barcodes):
+    """여러 바코드 일괄 조회 → {바코드: 제품 정보 또는 None} (입력 순서)"""
+    return get_product_index().lookup_many(barcodes)
@@ -0,0 +1,261 @@
+"""
+utils 모듈이 Streamlit에 직접 의존하지 않도록 캐시/오류 보고/secrets 접근을 감싸는 실행 환경 계층
+
+- Streamlit 앱(기본): st.cache_resource / st.cache_data / st.error / st.secrets 를 그대로 사용
+- 헤드리스(API 서버, CLI 등): use_headless()를 먼저 호출하거나 BARCODE_LABEL_HEADLESS=1 로 실행
+    프로세스 메모리 캐시, logging 오류 보고, .streamlit/secrets.toml 직접 로드
+
+백엔드는 처음 사용할 때 결정되며, Streamlit은 그때 필요한 경우에만 import 됩니다.
+다른 환경(작업 큐, 테스트 등)에서는 cache_resource/cache_data/error/secrets를 가진 객체를
+set_backend()로 지정하거나, HeadlessBackend(memoize=..., error_reporter=...)로 일부만 바꿔 쓸 수 있습니다.
+add_error_hook()으로 등록한 함수는 백엔드와 관계없이 모든 오류 보고를 함께 받습니다. (알림/모니터링 연동)
+
+무거운 의존성은 lazy_import()로 모듈 변수만 만들어 두고 실제 사용 시점에 import 합니다.
+"""
+import os
+import sys
+import time
+import logging
+import functools
+import threading
+import importlib
+import importlib.util
+
+HEADLESS_ENV = "BARCODE_LABEL_HEADLESS"
+SECRETS_ENV = "BARCODE_LABEL_SECRETS"
+DEFAULT_SECRETS_PATH = os.path.join(".streamlit", "secrets.toml")
+
+logger = logging.getLogger("barcode_label")
+
+_backend = None
+_backend_lock = threading.Lock()
+_error_hooks = []
+
+
+class _LazyModule:
+    """
+    첫 속성 접근 시 모듈을 import 하고 이후에는 그 모듈로 위임하는 프록시입니다.
+    importlib.util.LazyLoader는 여러 스레드가 동시에 첫 접근하면 반쯤 초기화된 모듈을 보게 되므로
+    (Python 3.11에서 AttributeError) 실제 import는 잠금 안에서 한 번만 실행합니다.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    모듈을 바로 로드하지 않고, 속성에 처음 접근할 때 import 하는 모듈 프록시를 반환합니다.
+        pd = runtime.lazy_import("pandas")   # 여기서는 로드하지 않음
+        pd.DataFrame(...)                      # 이 시점에 로드 (여러 스레드가 동시에 접근해도 한 번만)
+    이미 로드된 모듈이면 그대로 반환합니다.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
+
+
+class StreamlitBackend:
+    """Streamlit 앱 안에서 실행될 때의 기본 백엔드"""
+
+    name = "streamlit"
+
+    def __init__(self):
+        import streamlit as st
+        self._st = st
+
+    def cache_resource(self, func):
+        return self._st.cache_resource(func)
+
+    def cache_data(self, func, ttl=None):
+        return self._st.cache_data(ttl=ttl)(func)
+
+    def error(self, message):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        # 백그라운드 스레드(Sheets 미러 워커 등)에는 표시할 화면이 없으므로 로그로 남김
+        if get_script_run_ctx(suppress_warning=True) is None:
+            logger.error(message)
+        else:
+            self._st.error(message)
+
+    @property
+    def secrets(self):
+        return self._st.secrets
+
+
+class HeadlessBackend:
+    """Streamlit 없이 실행될 때의 백엔드 (프로세스 메모리 캐시 + logging)"""
+
+    name = "headless"
+
+    def __init__(self, secrets=None, secrets_path=None, memoize=None, error_reporter=None):
+        if secrets is None:
+            secrets = self._load_secrets(secrets_path or os.environ.get(SECRETS_ENV) or DEFAULT_SECRETS_PATH)
+        self._secrets = secrets
+        self._memoize = memoize or _memoize                 # (func, ttl=None) → 캐시된 함수
+        self._error_reporter = error_reporter or logger.error
+
+    @staticmethod
+    def _load_secrets(path):
+        if not os.path.exists(path):
+            logger.warning("secrets 파일이 없습니다: %s", path)
+            return {}
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    def cache_resource(self, func):
+        return self._memoize(func)
+
+    def cache_data(self, func, ttl=None):
+        return self._memoize(func, ttl=ttl)
+
+    def error(self, message):
+        self._error_reporter(message)
+
+    @property
+    def secrets(self):
+        return self._secrets
+
+
+def _memoize(func, ttl=None):
+    """
+    인자별 결과를 프로세스 메모리에 캐시합니다. (같은 인자는 동시에 한 번만 계산)
+    ttl(초)이 지나면 다시 계산합니다. None 결과는 캐시하지 않아 실패 후 재시도가 가능합니다.
+    """
+    cache = {}
+    lock = threading.Lock()
+    key_locks = {}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        entry = cache.get(key)
+        if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+            return entry[0]
+        with lock:
+            key_lock = key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = cache.get(key)
+            if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+                return entry[0]
+            value = func(*args, **kwargs)
+            if value is not None:
+                cache[key] = (value, time.monotonic())
+            return value
+
+    wrapper.clear = cache.clear
+    return wrapper
+
+
+def set_backend(backend):
+    """실행 백엔드를 지정합니다. 이미 캐시 데코레이터가 초기화된 뒤에는 바꾸지 않는 것이 좋습니다."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    return backend
+
+def use_headless(secrets=None, secrets_path=None, **options):
+    """
+    Streamlit 없이 utils를 사용할 때 다른 utils를 사용하기 전에 호출합니다.
+    options: HeadlessBackend의 memoize / error_reporter
+    """
+    # 프로세스 풀 워커 등 자식 프로세스도 헤드리스로 동작하도록
+    os.environ.setdefault(HEADLESS_ENV, "1")
+    return set_backend(HeadlessBackend(secrets=secrets, secrets_path=secrets_path, **options))
+
+def add_error_hook(func):
+    """모든 오류 메시지를 추가로 전달받을 함수(message → None)를 등록합니다."""
+    _error_hooks.append(func)
+    return func
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                headless = os.environ.get(HEADLESS_ENV, "").lower() in ("1", "true", "yes")
+                _backend = HeadlessBackend() if headless else StreamlitBackend()
+    return _backend
+
+def is_headless():
+    return get_backend().name == "headless"
+
+
+def cache_resource(func):
+    """st.cache_resource 대체: 백엔드는 처음 호출될 때 결정됩니다."""
+    resolved = []
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not resolved:
+            resolved.append(get_backend().cache_resource(func))
+        return resolved[0](*args, **kwargs)
+
+    return wrapper
+
+def cache_data(func=None, *, ttl=None):
+    """st.cache_data 대체: @cache_data 또는 @cache_data(ttl=초) 형태로 사용합니다."""
+    if func is None:
+        return functools.partial(cache_data, ttl=ttl)
+    resolved = []
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not resolved:
+            resolved.append(get_backend().cache_data(func, ttl=ttl))
+        return resolved[0](*args, **kwargs)
+
+    return wrapper
+
+def error(message):
+    """사용자에게 오류를 알립니다. (Streamlit: st.error, 헤드리스: 로그)"""
+    get_backend().error(message)
+    for hook in _error_hooks:
+        try:
+            hook(message)
+        except Exception as e:
+            logger.warning("오류 훅 실행 실패: %s", e)
+
+
+class _Secrets:
+    """st.secrets와 같은 방식(get, [], in)으로 현재 백엔드의 secrets를 읽습니다."""
+
+    def get(self, key, default=None):
+        return get_backend().secrets.get(key, default)
+
+    def __getitem__(self, key):
+        return get_backend().secrets[key]
+
+    def __contains__(self, key):
+        return key in get_backend().secrets
+
+
+secrets = _Secrets()
@@ -0,0 +1,68 @@
+import re
+
+from utils import product_index
+
+# 제품 바코드(EAN-13 등)는 88로 시작, 그 외 숫자만 있는 코드는 일련번호(S/N)
+PRODUCT_BARCODE_PREFIX = "88"
+
+_SPLIT_RE = re.compile(r"[\s,;]+")
+
+
+def split_codes(text):
+    """스캐너 연속 입력/붙여넣기 블록을 코드 목록으로 나눕니다. (줄바꿈, 공백, 쉼표, 세미콜론 구분)"""
+    return [code for code in _SPLIT_RE.split(text or "") if code]
+
+def classify_code(code):
+    """코드 한 개의 유형: '제품' | 'S/N' | None(형식 오류)"""
+    if code.startswith(PRODUCT_BARCODE_PREFIX):
+        return "제품"
+    if code.isdigit():
+        return "S/N"
+    return None
+
+def build_outbound_items(codes, existing_codes=()):
+    """
+    스캔된 코드 묶음을 한 번에 분류해 출고 목록 항목으로 만듭니다.
+    - 중복은 set으로 제거 (기존 목록에 있는 코드 포함)
+    - 제품 바코드는 모아서 product_index 일괄 조회 1회로 해석
+    반환: (items, duplicates, invalid, unknown) — items는 스캔 순서
+    """
+    seen = set(existing_codes)
+    unique, duplicates, invalid = [], [], []
+    for code in codes:
+        if code in seen:
+            duplicates.append(code)
+            continue
+        seen.add(code)
+        kind = classify_code(code)
+        if kind is None:
+            invalid.append(code)
+        else:
+            unique.append((kind, code))
+
+    barcodes = [code for kind, code in unique if kind == "제품"]
+    products = product_index.find_products_by_barcodes(barcodes) if barcodes else {}
+
+    items, unknown = [], []
+    for kind, code in unique:
+        if kind == "제품":
+            info = products.get(code)
+            if not info:
+                unknown.append(code)
+                continue
+            items.append({
+                "type": "제품",
+                "code": code,
+                "product_code": info.get("resource_code", "N/A"),
+                "product_name": info.get("resource_name", "알 수 없는 제품"),
+                "quantity": 1
+            })
+        else:
+            items.append({
+                "type": "S/N",
+                "code": code,
+                "product_code": "N/A",
+                "product_name": f"일련번호-{code}",
+                "quantity": 1
+            })
+    return items, duplicates, invalid, unknown
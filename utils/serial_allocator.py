@@ -0,0 +1,160 @@
+import time
+import threading
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from utils import runtime
+from utils import db_manager
+
+# SCM DB의 일련번호 시퀀스 테이블 (없으면 최초 사용 시 생성)
+SEQUENCE_TABLE = "Retained_sample_serial_seq"
+SEQUENCE_NAME = "retained_sample"
+DEFAULT_BLOCK_SIZE = 50
+
+# 예약 트랜잭션이 데드락(1213)으로 롤백되면 잠시 후 다시 시도
+DEADLOCK_ERROR = 1213
+DEADLOCK_RETRIES = 3
+
+CREATE_SEQUENCE_SQL = text(f"""
+    CREATE TABLE IF NOT EXISTS `{SEQUENCE_TABLE}` (
+        name       VARCHAR(64) NOT NULL PRIMARY KEY,
+        next_value BIGINT UNSIGNED NOT NULL
+    )
+""")
+
+SELECT_SEQUENCE_SQL = text(f"""
+    SELECT next_value FROM `{SEQUENCE_TABLE}` WHERE name = :name
+""")
+
+SELECT_FOR_UPDATE_SQL = text(f"""
+    SELECT next_value FROM `{SEQUENCE_TABLE}` WHERE name = :name FOR UPDATE
+""")
+
+# 기존 일련번호(타임스탬프 기반)와 겹치지 않도록 현재 최대값 다음부터 시작
+SEED_SEQUENCE_SQL = text(f"""
+    INSERT IGNORE INTO `{SEQUENCE_TABLE}` (name, next_value)
+    SELECT :name, COALESCE(MAX(CAST(serial_number AS UNSIGNED)), 0) + 1
+    FROM `Retained_sample_status`
+""")
+
+ADVANCE_SEQUENCE_SQL = text(f"""
+    UPDATE `{SEQUENCE_TABLE}` SET next_value = next_value + :count WHERE name = :name
+""")
+
+
+class SerialAllocator:
+    """
+    hi-lo 방식 일련번호 발급기입니다.
+    - DB 시퀀스 행을 SELECT ... FOR UPDATE로 잠그고 block_size 만큼 한 번에 예약합니다.
+    - 예약한 블록 안에서는 DB 왕복 없이 메모리에서 번호를 발급합니다.
+    - 블록 예약이 DB 트랜잭션으로 직렬화되므로 여러 세션/워커 프로세스 간에도 중복이 없습니다.
+    (프로세스가 재시작되면 쓰지 않은 블록 잔여 번호는 건너뛰므로 번호에 공백이 생길 수 있습니다.)
+    """
+
+    def __init__(self, get_engine, name=SEQUENCE_NAME, block_size=DEFAULT_BLOCK_SIZE):
+        self._get_engine = get_engine
+        self.name = name
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0  # 예약 블록의 끝 (미포함)
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def _ensure_sequence(self, engine):
+        """
+        시퀀스 테이블/행을 최초 1회 준비합니다.
+        DDL은 MySQL에서 암묵적 커밋을 일으키고, 시드(INSERT IGNORE ... SELECT MAX)는 갭 락을 잡으므로
+        둘 다 예약 트랜잭션(SELECT ... FOR UPDATE)과 분리합니다.
+        """
+        with engine.begin() as conn:
+            conn.execute(CREATE_SEQUENCE_SQL)
+        with engine.begin() as conn:
+            # 이미 시드된 경우 INSERT ... SELECT(원본 테이블 공유 락)를 실행하지 않음
+            if conn.execute(SELECT_SEQUENCE_SQL, {"name": self.name}).first() is None:
+                conn.execute(SEED_SEQUENCE_SQL, {"name": self.name})
+        self._table_ready = True
+
+    def _reserve(self, count):
+        """DB에서 count개 번호를 예약하고 (시작, 끝) 범위를 반환합니다."""
+        engine = self._get_engine()
+        if engine is None:
+            raise RuntimeError("SCM DB 연결이 없습니다.")
+
+        for attempt in range(DEADLOCK_RETRIES + 1):
+            try:
+                if not self._table_ready:
+                    self._ensure_sequence(engine)
+                with engine.begin() as conn:
+                    row = conn.execute(SELECT_FOR_UPDATE_SQL, {"name": self.name}).first()
+                    if row is None:
+                        raise RuntimeError(f"일련번호 시퀀스 행이 없습니다: {self.name}")
+                    start = int(row[0])
+                    conn.execute(ADVANCE_SEQUENCE_SQL, {"name": self.name, "count": count})
+                return start, start + count
+            except DBAPIError as e:
+                if attempt == DEADLOCK_RETRIES or not _is_deadlock(e):
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+
+    def next_serial(self):
+        """일련번호 1개를 발급합니다."""
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve(self.block_size)
+            serial = self._next
+            self._next += 1
+            return serial
+
+    def allocate(self, count):
+        """
+        일련번호 count개를 연속 발급합니다.
+        남은 블록으로 부족하면 필요한 만큼을 한 번에 예약합니다. (대량 입고용)
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            if self._end - self._next >= count:
+                start = self._next
+                self._next += count
+                return list(range(start, start + count))
+
+            start, end = self._reserve(max(count, self.block_size))
+            serials = list(range(start, start + count))
+            # 이번에 쓰고 남은 번호는 다음 발급에 사용
+            self._next, self._end = start + count, end
+            return serials
+
+
+def _is_deadlock(error):
+    args = getattr(getattr(error, "orig", None), "args", None) or ()
+    return bool(args) and args[0] == DEADLOCK_ERROR
+
+
+@runtime.cache_resource
+def get_serial_allocator():
+    """프로세스 전체에서 공유하는 일련번호 발급기를 반환합니다."""
+    try:
+        cfg = runtime.secrets.get("serial_allocator") or {}
+    except Exception:
+        cfg = {}
+    return SerialAllocator(
+        db_manager.connect_to_scm,
+        name=cfg.get("name", SEQUENCE_NAME),
+        block_size=int(cfg.get("block_size", DEFAULT_BLOCK_SIZE)),
+    )
+
+def next_serial():
+    """일련번호 1개 발급. 실패 시 None."""
+    try:
+        return get_serial_allocator().next_serial()
+    except Exception as e:
+        runtime.error(f"일련번호 발급 실패: {e}")
+        return None
+
+def allocate_serials(count):
+    """일련번호 count개 연속 발급. 실패 시 None."""
+    try:
+        return get_serial_allocator().allocate(count)
+    except Exception as e:
+        runtime.error(f"일련번호 발급 실패: {e}")
+        return None
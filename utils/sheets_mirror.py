@@ -0,0 +1,272 @@
+import time
+import queue
+import random
+import threading
+from collections import Counter
+
+from utils import runtime
+from utils import google_sheets_manager as gsm
+
+INVENTORY_SHEET = "재고_현황"
+INOUT_SHEET = "입출고_기록"
+
+# 워커 설정 기본값 (secrets.toml의 [sheets_mirror]로 변경 가능)
+DEFAULT_FLUSH_INTERVAL = 2.0    # 이벤트를 모으는 최대 대기 시간(초)
+DEFAULT_MAX_BATCH = 500         # 한 번에 반영할 최대 이벤트 수
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0      # 재시도 대기: base * 2^n (+지터), 최대 60초
+MAX_BACKOFF = 60.0
+MAX_DEAD_LETTERS = 1000
+
+
+def inventory_sheet_row(row):
+    """Retained_sample_status 행(dict) → '재고_현황' 시트 행"""
+    return [
+        str(row["serial_number"]), row["category"], row["product_code"], row["product_name"], row["lot"],
+        row["expiration_date"], row["disposal_date"], row["storage_location"], row["version"],
+        row["received_at"], "재고", "", "",
+    ]
+
+def inout_sheet_row(row):
+    """Retained_sample_in_out 행(dict) → '입출고_기록' 시트 행"""
+    return [
+        row["timestamp"], row["type"], str(row["serial_number"]), row["product_code"],
+        row["product_name"], row["quantity"], row.get("handler", ""),
+    ]
+
+
+class SheetsMirror:
+    """
+    SCM DB 입출고를 Google Sheets에 비동기로 반영하는 write-behind 워커입니다.
+    - 페이지는 enqueue만 하고 바로 반환하므로 사용자 응답 시간이 Sheets API에 묶이지 않습니다.
+    - 워커는 flush_interval 동안 이벤트를 모아 시트별 append_rows 1회 + 출고 상태 batch_update 1회로 반영합니다.
+    - 실패하면 지수 백오프로 재시도하고, 끝내 실패한 이벤트는 dead_letters에 남깁니다.
+    - 시트에 없는 일련번호의 출고 상태 update는, 이 미러에 그 행의 append가 아직 대기 중일 때만
+      대기열 뒤로 다시 넣고 나머지는 재시도 없이 버립니다. (미러 도입 전 입고분 등)
+    - 워커 스레드에는 Streamlit 화면이 없으므로 오류는 logging으로 남깁니다.
+    client_factory: gspread 클라이언트를 반환하는 함수 (테스트는 tests/sheets_fake.FakeClient 사용)
+    """
+
+    def __init__(self, client_factory, spreadsheet_id, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_batch=DEFAULT_MAX_BATCH, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, sleep=time.sleep):
+        self._client_factory = client_factory
+        self._spreadsheet_id = spreadsheet_id
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._sleep = sleep
+
+        self._queue = queue.Queue()
+        self._worksheets = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.dead_letters = []
+        self._pending_appends = Counter()  # 재고 시트에 아직 append되지 않은 일련번호
+        self._pending_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "flushes": 0, "api_batches": 0, "retries": 0, "failed_events": 0,
+                      "deferred_updates": 0, "dropped_not_found": 0}
+
+    # --- 이벤트 등록 ---------------------------------------------------
+    def _put(self, event):
+        self._queue.put(event)
+        self.stats["enqueued"] += 1
+
+    def enqueue_inventory(self, rows):
+        for row in rows:
+            sheet_row = inventory_sheet_row(row)
+            with self._pending_lock:
+                self._pending_appends[sheet_row[0]] += 1
+            self._put(("append", INVENTORY_SHEET, sheet_row))
+
+    def enqueue_inout(self, rows):
+        for row in rows:
+            self._put(("append", INOUT_SHEET, inout_sheet_row(row)))
+
+    def enqueue_shipped(self, serial_number, shipped_at, handler):
+        self._put(("update", INVENTORY_SHEET, str(serial_number),
+                   {"상태": "출고됨", "출고일시": shipped_at, "출고담당자": handler}))
+
+    # --- 워커 ----------------------------------------------------------
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sheets-mirror", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """남은 이벤트를 반영한 뒤 워커를 종료합니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout=None):
+        """지금까지 등록된 이벤트가 모두 처리될 때까지 기다립니다."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._drain()
+            if batch:
+                try:
+                    self._apply_with_retry(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+    def _drain(self):
+        """첫 이벤트를 기다린 뒤 flush_interval 동안 들어온 이벤트를 최대 max_batch개까지 모읍니다."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                remaining = 0
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worksheet(self, name):
+        if name not in self._worksheets:
+            spreadsheet = self._client_factory().open_by_key(self._spreadsheet_id)
+            worksheet = gsm.get_worksheet(spreadsheet, name)
+            if worksheet is None:
+                raise RuntimeError(f"워크시트 '{name}'를 열 수 없습니다.")
+            self._worksheets[name] = worksheet
+        return self._worksheets[name]
+
+    def _apply_with_retry(self, batch):
+        appends, updates = self._coalesce(batch)
+        self.stats["flushes"] += 1
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                appends, updates = self._apply(appends, updates)
+                if not appends and not updates:
+                    return
+            except Exception as e:
+                runtime.logger.warning("Sheets 미러 반영 실패 (시도 %d): %s", attempt + 1, e)
+                self._worksheets.clear()  # 연결 문제일 수 있으므로 다음 시도에서 다시 엶
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                delay = min(MAX_BACKOFF, self.backoff_base * (2 ** attempt))
+                self._sleep(delay + random.uniform(0, delay * 0.1))
+
+        failed = [("append", s, r) for s, rows in appends.items() for r in rows]
+        failed += [("update", s, serial, data) for s, ups in updates.items() for serial, data in ups.items()]
+        self._appended(appends.get(INVENTORY_SHEET, []))  # 더 이상 반영 대기 중이 아님
+        self.stats["failed_events"] += len(failed)
+        self.dead_letters = (self.dead_letters + failed)[-MAX_DEAD_LETTERS:]
+        runtime.logger.error("Sheets 미러 반영 최종 실패: %d건을 dead_letters로 이동", len(failed))
+
+    def _appended(self, sheet_rows):
+        with self._pending_lock:
+            for row in sheet_rows:
+                self._pending_appends[row[0]] -= 1
+                if self._pending_appends[row[0]] <= 0:
+                    del self._pending_appends[row[0]]
+
+    def _append_pending(self, serial):
+        with self._pending_lock:
+            return serial in self._pending_appends
+
+    @staticmethod
+    def _coalesce(batch):
+        """같은 시트의 append는 하나로, 같은 일련번호의 update는 마지막 값으로 합칩니다."""
+        appends, updates = {}, {}
+        for event in batch:
+            if event[0] == "append":
+                appends.setdefault(event[1], []).append(event[2])
+            else:
+                updates.setdefault(event[1], {}).setdefault(event[2], {}).update(event[3])
+        return appends, updates
+
+    def _apply(self, appends, updates):
+        """반영하고 남은(실패한) 작업만 반환합니다. 시트 단위로 성공한 부분은 다시 보내지 않습니다."""
+        for sheet in list(appends):
+            worksheet = self._worksheet(sheet)
+            worksheet.append_rows(appends[sheet], value_input_option="USER_ENTERED")
+            self.stats["api_batches"] += 1
+            if sheet == INVENTORY_SHEET:
+                self._appended(appends[sheet])
+            del appends[sheet]
+
+        for sheet in list(updates):
+            worksheet = self._worksheet(sheet)
+            results = gsm.update_rows_by_serial(worksheet, updates[sheet])
+            self.stats["api_batches"] += 1
+            retry = {}
+            for serial, data in updates[sheet].items():
+                result = results.get(serial)
+                if result == "ERROR":
+                    retry[serial] = data
+                elif result == "NOT_FOUND":
+                    if self._append_pending(serial):
+                        # 행 append가 대기열 뒤쪽에 있으면 그 뒤에 다시 반영 (백오프 대기 없음)
+                        self._queue.put(("update", sheet, serial, data))
+                        self.stats["deferred_updates"] += 1
+                    else:
+                        self.stats["dropped_not_found"] += 1
+                        runtime.logger.warning("Sheets 미러: '%s' 시트에 일련번호 %s 행이 없어 상태 반영을 건너뜁니다.",
+                                               sheet, serial)
+            if retry:
+                updates[sheet] = retry
+            else:
+                del updates[sheet]
+        return appends, updates
+
+
+@runtime.cache_resource
+def get_sheets_mirror():
+    """
+    secrets.toml의 [sheets_mirror] enabled = true 일 때만 워커를 만들어 시작합니다. 아니면 None.
+    """
+    try:
+        cfg = runtime.secrets.get("sheets_mirror") or {}
+        if not cfg.get("enabled"):
+            return None
+        spreadsheet_id = runtime.secrets["google_sheets"]["spreadsheet_id"]
+    except Exception:
+        return None
+
+    client = gsm.connect_to_google_sheets()
+    if client is None:
+        return None
+    return SheetsMirror(
+        lambda: client,
+        spreadsheet_id,
+        flush_interval=float(cfg.get("flush_interval_sec", DEFAULT_FLUSH_INTERVAL)),
+        max_batch=int(cfg.get("max_batch", DEFAULT_MAX_BATCH)),
+        max_retries=int(cfg.get("max_retries", DEFAULT_MAX_RETRIES)),
+    ).start()
+
+def mirror_inbound(inventory_rows, inout_rows):
+    """입고 결과를 시트 반영 대기열에 넣습니다. (미러 비활성화 시 무시)"""
+    mirror = get_sheets_mirror()
+    if mirror is not None:
+        mirror.enqueue_inventory(inventory_rows)
+        mirror.enqueue_inout(inout_rows)
+
+def mirror_outbound(inout_rows):
+    """출고 이력과 S/N 출고 상태를 시트 반영 대기열에 넣습니다. (미러 비활성화 시 무시)"""
+    mirror = get_sheets_mirror()
+    if mirror is not None:
+        mirror.enqueue_inout(inout_rows)
+        for row in inout_rows:
+            if row.get("serial_number") not in (None, "", "N/A"):
+                mirror.enqueue_shipped(row["serial_number"], row["timestamp"], row.get("handler", ""))